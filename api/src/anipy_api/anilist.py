@@ -7,10 +7,11 @@ from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set
 
 import Levenshtein
 from anipy_api.anime import Anime
+from anipy_api.codec import FastJsonMixin
 from anipy_api.error import AniListError
 from anipy_api.provider import (FilterCapabilities, Filters, MediaType,
                                 ProviderSearchResult, Season)
-from dataclasses_json import DataClassJsonMixin, config
+from dataclasses_json import config
 from requests import Request, Session
 
 if TYPE_CHECKING:
@@ -77,13 +78,13 @@ class AniListSeasonEnum(Enum):
 
 
 @dataclass
-class Picture(DataClassJsonMixin):
+class Picture(FastJsonMixin):
     large: Optional[str] = None
     medium: Optional[str] = None
 
 
 @dataclass
-class AniListUser(DataClassJsonMixin):
+class AniListUser(FastJsonMixin):
     """A json-serializable class that holds user data.
 
     Attributes:
@@ -104,7 +105,7 @@ def notes_to_tags(notes: Optional[str]) -> List[str]:
 
 
 @dataclass
-class AniListMyListStatus(DataClassJsonMixin):
+class AniListMyListStatus(FastJsonMixin):
     """A json-serializable class that holds a user's list status. It
     accompanies [AniListAnime][anipy_api.mal.AniListAnime].
 
@@ -130,7 +131,7 @@ class AniListMyListStatus(DataClassJsonMixin):
 
 
 @dataclass
-class AniListAlternativeTitles(DataClassJsonMixin):
+class AniListAlternativeTitles(FastJsonMixin):
     """A json-serializable class that holds alternative anime titles.
 
     Attributes:
@@ -146,7 +147,7 @@ class AniListAlternativeTitles(DataClassJsonMixin):
 
 
 @dataclass
-class AniListStartSeason(DataClassJsonMixin):
+class AniListStartSeason(FastJsonMixin):
     """A json-serializable class that holds a season/year combination
     indicating the time this anime was aired in.
 
@@ -163,12 +164,12 @@ class AniListStartSeason(DataClassJsonMixin):
 
 
 @dataclass
-class Title(DataClassJsonMixin):
+class Title(FastJsonMixin):
     user_preferred: str
 
 
 @dataclass
-class AniListAnime(DataClassJsonMixin):
+class AniListAnime(FastJsonMixin):
     """A json-serializable class that holds information about an anime and the
     user's list status if the anime is in their list.
 
@@ -200,18 +201,18 @@ class AniListAnime(DataClassJsonMixin):
 
 
 @dataclass
-class AniListPaging(DataClassJsonMixin):
+class AniListPaging(FastJsonMixin):
     current_page: int
     has_next_page: bool
 
 
 # @dataclass
-# class AniListResourceNode(DataClassJsonMixin):
+# class AniListResourceNode(FastJsonMixin):
 #     node: AniListAnime
 
 
 @dataclass
-class AniListPagingResource(DataClassJsonMixin):
+class AniListPagingResource(FastJsonMixin):
     page_info: AniListPaging
     media: List[AniListAnime]
 
@@ -1,13 +1,15 @@
-from typing import TYPE_CHECKING, List, Optional, Set, Union
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Set, Union
 
 from anipy_api.error import ProviderNotAvailableError
-from anipy_api.provider import Episode, list_providers
+from anipy_api.provider import Episode, LanguageTypeEnum, list_providers
+from anipy_api.provider.cache import bypass_cache
+from anipy_api.provider.utils import TTLCache
 
 if TYPE_CHECKING:
     from anipy_api.locallist import LocalListEntry
-    from anipy_api.provider import (BaseProvider, LanguageTypeEnum,
-                                    ProviderInfoResult, ProviderSearchResult,
-                                    ProviderStream)
+    from anipy_api.provider import (BaseProvider, ProviderInfoResult,
+                                    ProviderSearchResult, ProviderStream)
 
 
 class Anime:
@@ -20,13 +22,32 @@ class Anime:
         identifier: The identifier of the Anime
         languages: Supported Language types of the Anime
 
+    The results of [get_info][anipy_api.anime.Anime.get_info] and
+    [get_episodes][anipy_api.anime.Anime.get_episodes] are memoized in a
+    cache that is shared by all Anime objects, it keeps the `CACHE_SIZE`
+    most recently used results for `CACHE_TTL` seconds. Use
+    [refresh][anipy_api.anime.Anime.refresh] to drop the results of a anime,
+    the next results are then fetched past the provider's
+    [ResponseCache][anipy_api.provider.cache.ResponseCache] too.
+
     Attributes:
         provider: The from which the Anime comes from
         name: The name of the Anime
         identifier: The identifier of the Anime
         languages: Set of supported Language types of the Anime
+        CACHE_SIZE: Maximum amount of memoized results
+        CACHE_TTL: Seconds after which memoized results expire
     """
 
+    CACHE_SIZE = 256
+    CACHE_TTL = 10 * 60
+
+    _cache = TTLCache(CACHE_SIZE, CACHE_TTL)
+    # Keys of results that were refreshed, they are fetched past
+    # the response cache the next time
+    _refreshed: Set[tuple] = set()
+    _refreshed_lock = Lock()
+
     @staticmethod
     def from_search_result(
         provider: "BaseProvider", result: "ProviderSearchResult"
@@ -84,7 +105,11 @@ class Anime:
         Returns:
             List of Episodes
         """
-        return self.provider.get_episodes(self.identifier, lang)
+        episodes = self._cached(
+            self._cache_key("episodes", lang),
+            lambda: self.provider.get_episodes(self.identifier, lang),
+        )
+        return list(episodes)
 
     def get_info(self) -> "ProviderInfoResult":
         """Get information about the Anime.
@@ -92,7 +117,46 @@ class Anime:
         Returns:
             ProviderInfoResult object
         """
-        return self.provider.get_info(self.identifier)
+        return self._cached(
+            self._cache_key("info"), lambda: self.provider.get_info(self.identifier)
+        )
+
+    def refresh(self):
+        """Drop the memoized info and episode lists of this Anime, the next
+        calls of [get_info][anipy_api.anime.Anime.get_info] and
+        [get_episodes][anipy_api.anime.Anime.get_episodes] ask the provider
+        again, bypassing its
+        [ResponseCache][anipy_api.provider.cache.ResponseCache]."""
+        prefix = self._cache_key()
+        self._cache.invalidate(lambda key: key[: len(prefix)] == prefix)
+        with self._refreshed_lock:
+            self._refreshed.add(self._cache_key("info"))
+            self._refreshed.update(
+                self._cache_key("episodes", lang) for lang in LanguageTypeEnum
+            )
+
+    def _cached(self, key: tuple, func: Callable[[], Any]) -> Any:
+        def fetch():
+            with self._refreshed_lock:
+                refreshed = key in self._refreshed
+            if not refreshed:
+                return func()
+
+            with bypass_cache():
+                value = func()
+            with self._refreshed_lock:
+                self._refreshed.discard(key)
+            return value
+
+        return self._cache.get_or_set(key, fetch)
+
+    @classmethod
+    def clear_cache(cls):
+        """Drop the memoized results of all Anime objects."""
+        cls._cache.clear()
+
+    def _cache_key(self, *parts) -> tuple:
+        return (self.provider.NAME, self.provider.BASE_URL, self.identifier, *parts)
 
     def get_video(
         self,
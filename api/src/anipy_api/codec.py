@@ -0,0 +1,227 @@
+"""Fast json (de)serialization for the json-serializable dataclasses.
+
+The dataclasses of anipy-api use `dataclasses_json`, which inspects the
+type hints of a class every time a object is (de)serialized. The
+[FastJsonMixin][anipy_api.codec.FastJsonMixin] inspects them once per class
+and builds a encoder and decoder from them, the json it reads and writes is
+the same as the one of `dataclasses_json`. If `orjson` is installed it is
+used to parse json.
+"""
+
+import dataclasses
+import json
+import typing
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple, Type, TypeVar, Union
+
+from dataclasses_json import DataClassJsonMixin
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+A = TypeVar("A", bound="FastJsonMixin")
+
+Encoder = Callable[[Any], Any]
+Decoder = Callable[[Any], Any]
+
+_MISSING = dataclasses.MISSING
+_codecs: Dict[type, Tuple[Encoder, Decoder]] = {}
+
+
+def loads(s: Union[str, bytes]) -> Any:
+    """Parse json, with `orjson` if it is installed.
+
+    Args:
+        s: The json string
+
+    Returns:
+        The parsed json
+    """
+    if orjson is not None:
+        return orjson.loads(s)
+    return json.loads(s)
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _optional(func: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    def wrapper(value: Any) -> Any:
+        return None if value is None else func(value)
+
+    return wrapper
+
+
+def _compile_type(tp: Any) -> Tuple[Encoder, Decoder]:
+    origin = typing.get_origin(tp)
+    args = typing.get_args(tp)
+
+    if origin is Union:
+        non_none = [a for a in args if a is not type(None)]
+        if len(non_none) == 1:
+            enc, dec = _compile_type(non_none[0])
+            return _optional(enc), _optional(dec)
+        # Unions of primitives (e.g. Episode) are passed through
+        return _identity, _identity
+
+    if origin in (list, set, frozenset):
+        enc, dec = _compile_type(args[0]) if args else (_identity, _identity)
+        container = origin
+
+        def encode_seq(value: Any) -> Any:
+            return [enc(v) for v in value]
+
+        def decode_seq(value: Any) -> Any:
+            return container(dec(v) for v in value)
+
+        return encode_seq, decode_seq
+
+    if origin is dict:
+        key_type, value_type = args if args else (str, Any)
+        enc, dec = _compile_type(value_type)
+        key_dec = key_type if key_type in (int, float) else _identity
+
+        def encode_dict(value: Any) -> Any:
+            return {str(k): enc(v) for k, v in value.items()}
+
+        def decode_dict(value: Any) -> Any:
+            return {key_dec(k): dec(v) for k, v in value.items()}
+
+        return encode_dict, decode_dict
+
+    if isinstance(tp, type) and issubclass(tp, Enum):
+        members = tp._value2member_map_
+
+        def encode_enum(value: Any) -> Any:
+            return value.value
+
+        def decode_enum(value: Any) -> Any:
+            try:
+                return members[value]
+            except (KeyError, TypeError):
+                return tp(value)
+
+        return encode_enum, decode_enum
+
+    if dataclasses.is_dataclass(tp):
+        # Looked up on use, the class may not be compiled yet
+        def encode_dataclass(value: Any) -> Any:
+            return _get_codec(tp)[0](value)
+
+        def decode_dataclass(value: Any) -> Any:
+            return _get_codec(tp)[1](value)
+
+        return encode_dataclass, decode_dataclass
+
+    if tp in (int, float, str):
+
+        def coerce(value: Any, tp=tp) -> Any:
+            return value if isinstance(value, tp) else tp(value)
+
+        return _identity, coerce
+
+    return _identity, _identity
+
+
+def _compile_dataclass(cls: type) -> Tuple[Encoder, Decoder]:
+    hints = typing.get_type_hints(cls)
+    fields = []
+
+    for f in dataclasses.fields(cls):
+        if not f.init:
+            continue
+
+        meta = f.metadata.get("dataclasses_json", {})
+        letter_case = meta.get("letter_case")
+        key = letter_case(f.name) if letter_case is not None else f.name
+
+        enc, dec = _compile_type(hints[f.name])
+        enc = meta.get("encoder", enc)
+        dec = meta.get("decoder", dec)
+
+        if f.default is not _MISSING:
+            default: Callable[[], Any] = lambda d=f.default: d
+        elif f.default_factory is not _MISSING:
+            default = f.default_factory
+        else:
+            default = None
+
+        fields.append((f.name, key, enc, dec, default))
+
+    def encode(obj: Any) -> Dict[str, Any]:
+        return {key: enc(getattr(obj, name)) for name, key, enc, _, _ in fields}
+
+    def decode(kvs: Dict[str, Any]) -> Any:
+        kwargs = {}
+        for name, key, _, dec, default in fields:
+            if name in kvs:
+                # Like dataclasses_json, the field name is accepted too and
+                # it wins over the encoded name (e.g. LocalList.update)
+                kwargs[name] = dec(kvs[name])
+            elif key in kvs:
+                kwargs[name] = dec(kvs[key])
+            elif default is not None:
+                kwargs[name] = default()
+            else:
+                raise KeyError(name)
+
+        return cls(**kwargs)
+
+    return encode, decode
+
+
+def _get_codec(cls: type) -> Tuple[Encoder, Decoder]:
+    codec = _codecs.get(cls)
+    if codec is None:
+        codec = _codecs[cls] = _compile_dataclass(cls)
+    return codec
+
+
+class FastJsonMixin(DataClassJsonMixin):
+    """A drop-in replacement for `dataclasses_json.DataClassJsonMixin`.
+
+    `from_json`, `to_json`, `from_dict` and `to_dict(encode_json=True)` use
+    a encoder and decoder that are built once per class, everything
+    else (e.g. `schema`) is handled by `dataclasses_json`.
+    """
+
+    def to_json(self, **kw: Any) -> str:
+        if kw:
+            return super().to_json(**kw)
+        return json.dumps(_get_codec(type(self))[0](self))
+
+    def to_dict(self, encode_json: bool = False) -> Dict[str, Any]:
+        if not encode_json:
+            return super().to_dict(encode_json=encode_json)
+        return _get_codec(type(self))[0](self)
+
+    @classmethod
+    def from_json(
+        cls: Type[A],
+        s: Union[str, bytes, bytearray],
+        *,
+        parse_float: Optional[Callable[[str], Any]] = None,
+        parse_int: Optional[Callable[[str], Any]] = None,
+        parse_constant: Optional[Callable[[str], Any]] = None,
+        infer_missing: bool = False,
+        **kw: Any,
+    ) -> A:
+        if parse_float or parse_int or parse_constant or infer_missing or kw:
+            return super().from_json(
+                s,
+                parse_float=parse_float,
+                parse_int=parse_int,
+                parse_constant=parse_constant,
+                infer_missing=infer_missing,
+                **kw,
+            )
+        return _get_codec(cls)[1](loads(s))
+
+    @classmethod
+    def from_dict(cls: Type[A], kvs: Any, *, infer_missing: bool = False) -> A:
+        if infer_missing:
+            return super().from_dict(kvs, infer_missing=infer_missing)
+        return _get_codec(cls)[1](kvs)
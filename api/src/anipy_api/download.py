@@ -1,16 +1,28 @@
+import hashlib
 import json
 import os
 import shutil
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+import zlib
+from collections import defaultdict
+from concurrent.futures import (FIRST_COMPLETED, Future, ThreadPoolExecutor,
+                                as_completed, wait)
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from itertools import count
 from pathlib import Path
-from typing import Optional, Protocol
-from urllib.parse import urljoin
+from queue import PriorityQueue
+from threading import Condition, Event, Lock, Thread
+from typing import (Any, Callable, ContextManager, Dict, Iterator, List,
+                    Optional, Protocol, Set, TextIO, Tuple)
+from urllib.parse import urljoin, urlparse
 
 import m3u8
 import requests
-from anipy_api.error import DownloadError
+from anipy_api.error import ArgumentError, DownloadError
 from anipy_api.provider import ProviderStream
+from anipy_api.tracing import Span, current_span, span, traced
 from ffmpeg import FFmpeg, Progress
 from requests.adapters import HTTPAdapter, Retry
 
@@ -51,6 +63,461 @@ class PostDownloadCallback(Protocol):
         ...
 
 
+class SegmentManifest:
+    """A manifest of the merged segments of a m3u8/hls download, it is
+    used by [m3u8_download][anipy_api.download.Downloader.m3u8_download] to
+    resume downloads.
+
+    Segments are appended to the partial output file in playlist order, so
+    the manifest describes the prefix of that file. It is an append-only
+    file, the first line holds the segment count and the identity of the
+    stream (a hash of its segment urls) and every following line is a json
+    object describing one merged segment (index, size and crc32 checksum).
+    Lines that can not be parsed (e.g. because the process got killed
+    during a write) are ignored.
+    """
+
+    def __init__(self, file: Path, segment_count: int, stream_id: str = ""):
+        """__init__ of SegmentManifest
+
+        Args:
+            file: Path of the manifest file
+            segment_count: Amount of segments in the playlist, if the stored
+                manifest does not match the count it gets discarded
+            stream_id: Identity of the stream, e.g. from
+                [stream_id][anipy_api.download.SegmentManifest.stream_id],
+                if the stored manifest belongs to another stream it gets
+                discarded
+        """
+        self.file = file
+        self.segment_count = segment_count
+        self.stream_id = stream_id
+        self._entries: List[Tuple[int, int]] = []
+        self._fp: Optional[TextIO] = None
+
+        self._load()
+
+    def _load(self):
+        if not self.file.is_file():
+            return
+
+        with self.file.open("r", encoding="utf-8") as fp:
+            header = fp.readline()
+            try:
+                header = json.loads(header)
+                count, stream_id = header["segments"], header.get("stream", "")
+            except (ValueError, KeyError, TypeError, AttributeError):
+                return
+
+            if count != self.segment_count or stream_id != self.stream_id:
+                return
+
+            for line in fp:
+                try:
+                    entry = json.loads(line)
+                    if entry["i"] != len(self._entries):
+                        break
+                    self._entries.append((entry["size"], entry["crc"]))
+                except (ValueError, KeyError, TypeError):
+                    break
+
+    @staticmethod
+    def stream_id(segment_urls: List[str]) -> str:
+        """Get the identity of a stream from its segment urls.
+
+        The query strings are left out, as they often hold tokens that
+        change every time the playlist is fetched, while the paths
+        differ between streams and qualities.
+
+        Args:
+            segment_urls: The absolute urls of all segments
+
+        Returns:
+            A hash of the segment urls
+        """
+        digest = hashlib.sha256()
+        for url in segment_urls:
+            digest.update(urlparse(url).path.encode() + b"\n")
+        return digest.hexdigest()
+
+    def resume(self, output: Path) -> int:
+        """Check the partial output file against the manifest and truncate it
+        to the last intact segment.
+
+        Args:
+            output: Path of the partial output file
+
+        Returns:
+            The amount of segments that are already merged into the output
+        """
+        if not output.is_file():
+            self._entries = []
+            return 0
+
+        valid = 0
+        offset = 0
+        with output.open("r+b") as fp:
+            for size, crc in self._entries:
+                data = fp.read(size)
+                if len(data) != size or zlib.crc32(data) != crc:
+                    break
+                valid += 1
+                offset += size
+
+            fp.truncate(offset)
+
+        del self._entries[valid:]
+        return valid
+
+    def add(self, content: bytes):
+        """Record the next merged segment.
+
+        Args:
+            content: Content of the segment
+        """
+        entry = (len(content), zlib.crc32(content))
+        self._entries.append(entry)
+        if self._fp is not None:
+            self._fp.write(self._dump_entry(len(self._entries) - 1, *entry))
+            self._fp.flush()
+
+    def delete(self):
+        """Delete the manifest file."""
+        self.file.unlink(missing_ok=True)
+
+    @staticmethod
+    def _dump_entry(index: int, size: int, crc: int) -> str:
+        return json.dumps({"i": index, "size": size, "crc": crc}) + "\n"
+
+    def __enter__(self) -> "SegmentManifest":
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        self._fp = self.file.open("w", encoding="utf-8")
+        self._fp.write(
+            json.dumps({"segments": self.segment_count, "stream": self.stream_id})
+            + "\n"
+        )
+        for i, entry in enumerate(self._entries):
+            self._fp.write(self._dump_entry(i, *entry))
+        self._fp.flush()
+        return self
+
+    def __exit__(self, *_: Any):
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+
+
+class RangeManifest:
+    """A manifest of the byte ranges of a parallel mp4 download, it is used by
+    [mp4_download][anipy_api.download.Downloader.mp4_download] to resume
+    downloads.
+
+    Every range is stored as `[start, position, end]`, where position is the
+    next byte that still has to be downloaded and end is inclusive.
+    """
+
+    WRITE_INTERVAL = 1.0
+
+    def __init__(self, file: Path, total: int):
+        """__init__ of RangeManifest
+
+        Args:
+            file: Path of the manifest file
+            total: Size of the download, if the stored manifest does not
+                match the size it gets discarded
+        """
+        self.file = file
+        self.total = total
+        self.ranges: List[List[int]] = []
+
+        self._lock = Lock()
+        self._last_write = 0.0
+
+        self._load()
+
+    def _load(self):
+        if not self.file.is_file():
+            return
+
+        try:
+            data = json.loads(self.file.read_text())
+            if data["total"] != self.total:
+                return
+            ranges = [[int(i) for i in r] for r in data["ranges"]]
+        except (ValueError, KeyError, TypeError):
+            return
+
+        valid = all(
+            len(r) == 3 and 0 <= r[0] <= r[1] <= r[2] + 1 <= self.total
+            for r in ranges
+        )
+        if valid:
+            self.ranges = ranges
+
+    def split(self, start: int, parts: int, min_size: int):
+        """Split the bytes from start to the end of the download into ranges.
+
+        Args:
+            start: The first byte that has to be downloaded
+            parts: The maximum amount of ranges
+            min_size: The minimum size of a range
+        """
+        remaining = self.total - start
+        if remaining <= 0:
+            self.ranges = []
+            self.write()
+            return
+
+        parts = max(min(parts, remaining // min_size), 1)
+        size = -(-remaining // parts)
+        self.ranges = [
+            [i, i, min(i + size, self.total) - 1]
+            for i in range(start, self.total, size)
+        ]
+        self.write()
+
+    @property
+    def downloaded(self) -> int:
+        """Amount of bytes that are already downloaded."""
+        done = self.total - sum(end + 1 - pos for _, pos, end in self.ranges)
+        return done
+
+    def advance(self, index: int, amount: int):
+        """Mark bytes of a range as downloaded, the manifest is written at
+        most every `WRITE_INTERVAL` seconds.
+
+        Args:
+            index: Index of the range
+            amount: Amount of bytes
+        """
+        with self._lock:
+            self.ranges[index][1] += amount
+            if time.monotonic() - self._last_write > self.WRITE_INTERVAL:
+                self._write()
+
+    def write(self):
+        """Write the manifest file."""
+        with self._lock:
+            self._write()
+
+    def delete(self):
+        """Delete the manifest file."""
+        self.file.unlink(missing_ok=True)
+
+    def _write(self):
+        self._last_write = time.monotonic()
+        # Replace the manifest in one step, a process that gets killed
+        # while writing must not leave a broken manifest behind
+        tmp = self.file.with_name(f"{self.file.name}.tmp")
+        tmp.write_text(json.dumps({"total": self.total, "ranges": self.ranges}))
+        os.replace(tmp, self.file)
+
+
+class ConcurrencyController:
+    """An AIMD (additive increase, multiplicative decrease) controller for the
+    amount of parallel segment requests to a host.
+
+    The limit grows by one for every `limit` successful requests, as long
+    as the per-connection throughput holds up. It shrinks by one if the
+    throughput of a connection falls below `SATURATION_RATIO` of the best
+    observed throughput (the link or the host is saturated) and it is
+    halved on rate limiting (HTTP 429), server errors (HTTP 5xx) and
+    connection errors.
+
+    Attributes:
+        min_workers: The lower bound of the limit
+        max_workers: The upper bound of the limit
+    """
+
+    INITIAL_WORKERS = 12
+    SATURATION_RATIO = 0.5
+    EWMA_WEIGHT = 0.2
+    BEST_THROUGHPUT_DECAY = 0.99
+
+    def __init__(self, min_workers: int, max_workers: int):
+        """__init__ of ConcurrencyController
+
+        Args:
+            min_workers: The lower bound of the limit
+            max_workers: The upper bound of the limit
+        """
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+
+        self._limit = float(min(max(self.INITIAL_WORKERS, min_workers), max_workers))
+        self._lock = Lock()
+        self._latency: Optional[float] = None
+        self._throughput: Optional[float] = None
+        self._best_throughput = 0.0
+        self._last_decrease = 0.0
+        self._requests = 0
+        self._failures = 0
+
+    @property
+    def limit(self) -> int:
+        """The current amount of parallel requests."""
+        return int(self._limit)
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Moving average of the request latency in seconds."""
+        return self._latency
+
+    @property
+    def throughput(self) -> Optional[float]:
+        """Moving average of the throughput of a single connection in bytes
+        per second."""
+        return self._throughput
+
+    @property
+    def failure_rate(self) -> float:
+        """Ratio of failed requests (429, 5xx, connection errors)."""
+        return self._failures / self._requests if self._requests else 0.0
+
+    def record_success(self, latency: float, size: int):
+        """Record a successful request.
+
+        Args:
+            latency: Time the request took in seconds
+            size: Size of the response body in bytes
+        """
+        throughput = size / max(latency, 1e-3)
+        with self._lock:
+            self._requests += 1
+            self._latency = self._ewma(self._latency, latency)
+            self._throughput = self._ewma(self._throughput, throughput)
+            # Let the best throughput decay, so a host that gets slower overall
+            # is not mistaken for a saturated one forever
+            self._best_throughput = max(
+                self._best_throughput * self.BEST_THROUGHPUT_DECAY, self._throughput
+            )
+
+            if self._throughput < self._best_throughput * self.SATURATION_RATIO:
+                self._limit = max(self._limit - 1 / self._limit, self.min_workers)
+            else:
+                self._limit = min(self._limit + 1 / self._limit, self.max_workers)
+
+    def record_failure(self):
+        """Record a request that failed because of rate limiting, a server
+        error or a connection error."""
+        with self._lock:
+            self._requests += 1
+            self._failures += 1
+
+            # Only back off once per round trip, the requests that are
+            # already in flight were sent with the old limit
+            now = time.monotonic()
+            if now - self._last_decrease < (self._latency or 1.0):
+                return
+
+            self._last_decrease = now
+            self._limit = max(self._limit / 2, self.min_workers)
+
+    def _ewma(self, average: Optional[float], value: float) -> float:
+        if average is None:
+            return value
+        return (1 - self.EWMA_WEIGHT) * average + self.EWMA_WEIGHT * value
+
+
+class ConnectionBudget:
+    """A budget of connections that is shared between downloads.
+
+    The budget is split fairly between the hosts that currently use or
+    wait for a connection, a host may only use more than its fair share if
+    no other host is waiting.
+
+    Attributes:
+        max_connections: The amount of connections in the budget
+    """
+
+    def __init__(self, max_connections: int):
+        """__init__ of ConnectionBudget
+
+        Args:
+            max_connections: The amount of connections in the budget
+        """
+        self.max_connections = max_connections
+
+        self._condition = Condition()
+        self._in_use: Dict[str, int] = defaultdict(int)
+        self._waiting: Dict[str, int] = defaultdict(int)
+
+    @contextmanager
+    def acquire(self, host: str) -> Iterator[None]:
+        """Hold a connection to a host while in the context.
+
+        Args:
+            host: The host to connect to
+        """
+        with self._condition:
+            self._waiting[host] += 1
+            try:
+                self._condition.wait_for(lambda: self._can_acquire(host))
+            finally:
+                self._waiting[host] -= 1
+            self._in_use[host] += 1
+
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._in_use[host] -= 1
+                self._condition.notify_all()
+
+    def _can_acquire(self, host: str) -> bool:
+        if sum(self._in_use.values()) >= self.max_connections:
+            return False
+
+        hosts = {h for h, n in self._in_use.items() if n > 0}
+        hosts |= {h for h, n in self._waiting.items() if n > 0}
+        fair_share = max(self.max_connections // len(hosts), 1)
+        if self._in_use[host] < fair_share:
+            return True
+
+        return not any(n > 0 for h, n in self._waiting.items() if h != host)
+
+
+class RateLimiter:
+    """A token bucket that limits the amount of bytes per second, it may be
+    shared between downloads.
+
+    Attributes:
+        bytes_per_second: The rate limit
+    """
+
+    def __init__(self, bytes_per_second: int):
+        """__init__ of RateLimiter
+
+        Args:
+            bytes_per_second: The rate limit
+        """
+        self.bytes_per_second = bytes_per_second
+
+        self._lock = Lock()
+        self._tokens = float(bytes_per_second)
+        self._last = time.monotonic()
+
+    def consume(self, amount: int):
+        """Take bytes out of the bucket, this blocks until the rate allows
+        for the amount of bytes.
+
+        Args:
+            amount: Amount of bytes
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._tokens + (now - self._last) * self.bytes_per_second,
+                self.bytes_per_second,
+            )
+            self._last = now
+            self._tokens -= amount
+            delay = -self._tokens / self.bytes_per_second
+
+        if delay > 0:
+            time.sleep(delay)
+
+
 class Downloader:
     """Downloader class to download streams retrieved by the Providers."""
 
@@ -59,6 +526,12 @@ class Downloader:
         progress_callback: Optional[ProgressCallback] = None,
         info_callback: Optional[InfoCallback] = None,
         soft_error_callback: Optional[InfoCallback] = None,
+        min_workers: int = 4,
+        max_workers: int = 32,
+        connection_budget: Optional[ConnectionBudget] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        chunk_size: int = 1024 * 1024,
+        mp4_connections: int = 4,
     ):
         """__init__ of Downloader.
 
@@ -66,7 +539,33 @@ class Downloader:
             progress_callback: A callback with an percentage argument, that gets called on download progress.
             info_callback: A callback with an message argument, that gets called on certain events.
             soft_error_callback: A callback with a message argument, when certain events cause a non-fatal error (if none given, alternative fallback is info_callback).
+            min_workers: The minimum amount of parallel segment requests per host for m3u8/hls downloads.
+            max_workers: The maximum amount of parallel segment requests per host for m3u8/hls downloads,
+                the actual amount adapts to the host, look at [ConcurrencyController][anipy_api.download.ConcurrencyController].
+            connection_budget: A budget of connections shared with other downloaders.
+            rate_limiter: A rate limit shared with other downloaders.
+            chunk_size: Size of the chunks that are read from the network at once for mp4 downloads.
+            mp4_connections: Amount of parallel range requests for mp4 downloads, if the server supports them.
+
+        Raises:
+            ArgumentError: Raised if the worker limits are invalid
         """
+        if not 1 <= min_workers <= max_workers:
+            raise ArgumentError(
+                f"Invalid worker limits min_workers={min_workers}, max_workers={max_workers}"
+            )
+
+        self._min_workers = min_workers
+        self._max_workers = max_workers
+        self._controllers: Dict[str, ConcurrencyController] = {}
+        self._controllers_lock = Lock()
+        self._connection_budget = connection_budget
+        self._rate_limiter = rate_limiter
+        self._chunk_size = chunk_size
+        self._mp4_connections = max(mp4_connections, 1)
+        self._last_progress = 0.0
+        self._cancelled = Event()
+
         self._progress_callback: ProgressCallback = progress_callback or (
             lambda percentage: None
         )
@@ -81,10 +580,27 @@ class Downloader:
 
         self._session = requests.Session()
 
-        adapter = HTTPAdapter(max_retries=Retry(connect=3, backoff_factor=0.5))
+        adapter = HTTPAdapter(
+            max_retries=Retry(connect=3, backoff_factor=0.5), pool_maxsize=max_workers
+        )
         self._session.mount("http://", adapter)
         self._session.mount("https://", adapter)
 
+    def cancel(self):
+        """Cancel the downloads of this downloader, they stop as soon as
+        possible and raise a [DownloadError][anipy_api.error.DownloadError].
+        The partial files are kept, so a later download resumes them."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """If [cancel][anipy_api.download.Downloader.cancel] was called."""
+        return self._cancelled.is_set()
+
+    def _raise_if_cancelled(self):
+        if self._cancelled.is_set():
+            raise DownloadError("Download was cancelled")
+
     @staticmethod
     def _get_valid_pathname(name: str):
         is_android = "ANDROID_ROOT" in os.environ or "ANDROID_DATA" in os.environ
@@ -99,14 +615,75 @@ class Downloader:
 
         return name
 
-    MAX_SEGMENT_NAME_LENGTH = 200
+    SEGMENT_WINDOW = 64
+    SEGMENT_RETRIES = 3
+
+    PROGRESS_INTERVAL = 0.1
+
+    def _report_progress(self, percentage: float):
+        now = time.monotonic()
+        if percentage < 100 and now - self._last_progress < self.PROGRESS_INTERVAL:
+            return
+
+        self._last_progress = now
+        self._progress_callback(percentage)
+
+    def _acquire_connection(self, url: str) -> ContextManager:
+        if self._connection_budget is None:
+            return nullcontext()
+        return self._connection_budget.acquire(urlparse(url).netloc)
 
+    @staticmethod
+    def _make_temp_folder(download_path: Path) -> Path:
+        # Every download gets its own folder in the shared temp folder,
+        # so parallel downloads do not remove each others files
+        folder = download_path.parent / "temp" / download_path.stem
+        while True:
+            try:
+                folder.mkdir(parents=True, exist_ok=True)
+                return folder
+            except FileNotFoundError:
+                # Another download just removed the empty shared folder
+                continue
+
+    @staticmethod
+    def _remove_temp_folder(folder: Path):
+        shutil.rmtree(folder, ignore_errors=True)
+        try:
+            folder.parent.rmdir()
+        except OSError:
+            # Other downloads are still using it
+            pass
+
+    def _consume_rate(self, amount: int):
+        if self._rate_limiter is not None:
+            self._rate_limiter.consume(amount)
+
+    def _get_controller(self, url: str) -> ConcurrencyController:
+        host = urlparse(url).netloc
+        with self._controllers_lock:
+            if host not in self._controllers:
+                self._controllers[host] = ConcurrencyController(
+                    self._min_workers, self._max_workers
+                )
+            return self._controllers[host]
+
+    @traced("download.m3u8")
     def m3u8_download(self, stream: "ProviderStream", download_path: Path) -> Path:
         """Download a m3u8/hls stream to a specified download path in a ts container.
 
         The suffix of the download path will be replaced (or added) with
         ".ts", use the path returned instead of the passed path.
 
+        Segments are fetched in parallel, the amount of parallel requests
+        adapts to the host (look at [ConcurrencyController][anipy_api.download.ConcurrencyController]).
+        They are appended to a partial file in playlist order while the
+        download is running, only a window of `SEGMENT_WINDOW` segments that
+        arrived out of order is held in memory. The merged segments are
+        recorded in a manifest, if the download fails or gets interrupted,
+        the next call with the same download path continues where the last
+        one stopped.
+
         Args:
             stream: The m3u8/hls stream
             download_path: The path to save the downloaded stream to
@@ -117,88 +694,163 @@ class Downloader:
         Returns:
             The path with a ".ts" suffix
         """
-        temp_folder = download_path.parent / "temp"
-        temp_folder.mkdir(exist_ok=True)
         download_path = download_path.with_suffix(".ts")
-        res = self._session.get(stream.url, headers={"Referer": stream.referrer})
-        res.raise_for_status()
+        temp_folder = self._make_temp_folder(download_path)
+        partial_path = temp_folder / download_path.name
+        with span("download.m3u8.playlist", url=stream.url):
+            res = self._session.get(stream.url, headers={"Referer": stream.referrer})
+            res.raise_for_status()
 
-        m3u8_content = m3u8.M3U8(res.text, base_uri=urljoin(res.url, "."))
+            m3u8_content = m3u8.M3U8(res.text, base_uri=urljoin(res.url, "."))
 
         assert m3u8_content.is_variant is False
 
-        counter = 0
+        segments = m3u8_content.segments
+        manifest = SegmentManifest(
+            temp_folder / f"{download_path.stem}.manifest",
+            len(segments),
+            SegmentManifest.stream_id([seg.absolute_uri for seg in segments]),
+        )
+        merged_count = manifest.resume(partial_path)
+        parent_span = current_span()
+        parent_span.set_attributes(segments=len(segments), resumed=merged_count)
 
-        def download_ts(segment: m3u8.Segment):
-            nonlocal counter
+        if merged_count > 0:
+            self._info_callback(
+                f"Resuming download, {merged_count} of {len(segments)} parts already downloaded"
+            )
+
+        controller = self._get_controller(
+            urljoin(segments[0].base_uri, segments[0].uri) if segments else stream.url
+        )
+
+        def download_ts(segment: m3u8.Segment) -> bytes:
+            with span("download.m3u8.segment", parent=parent_span) as s:
+                return download_ts_try(segment, s)
+
+        def download_ts_try(segment: m3u8.Segment, s: Span) -> bytes:
             url = urljoin(segment.base_uri, segment.uri)
-            segment_uri = Path(segment.uri)
-            segment_name = self._get_valid_pathname(segment_uri.stem)
-            segment_name = segment_name[: self.MAX_SEGMENT_NAME_LENGTH]
-            fname = (temp_folder / segment_name).with_suffix(segment_uri.suffix)
-            try:
-                res = self._session.get(str(url), headers={"Referer": stream.referrer})
-                res.raise_for_status()
+            error: Exception = DownloadError("Unknown error occurred")
+            for i in range(self.SEGMENT_RETRIES):
+                self._raise_if_cancelled()
+                if i > 0:
+                    time.sleep(0.5 * 2**i)
+                s.set_attribute("attempts", i + 1)
 
-                with fname.open("wb") as fout:
-                    fout.write(res.content)
+                try:
+                    with self._acquire_connection(url):
+                        start = time.monotonic()
+                        res = self._session.get(
+                            str(url), headers={"Referer": stream.referrer}
+                        )
+                        latency = time.monotonic() - start
+                except requests.RequestException as e:
+                    controller.record_failure()
+                    error = e
+                    continue
+
+                if res.status_code == 429 or res.status_code >= 500:
+                    controller.record_failure()
+                    error = requests.HTTPError(
+                        f"{res.status_code} Server Error for url: {url}"
+                    )
+                    continue
 
-                counter += 1
-                self._progress_callback(counter / len(m3u8_content.segments) * 100)
-            except Exception as e:
-                # TODO: This gets ignored, because it's in a seperate thread...
-                raise DownloadError(
-                    f"Encountered this error while downloading: {str(e)}"
-                )
+                try:
+                    res.raise_for_status()
+                except requests.HTTPError as e:
+                    error = e
+                    break
+
+                controller.record_success(latency, len(res.content))
+                s.set_attributes(bytes=len(res.content), latency=latency)
+                self._consume_rate(len(res.content))
+                return res.content
+
+            raise DownloadError(
+                f"Encountered this error while downloading: {str(error)}"
+            )
 
         try:
-            with ThreadPoolExecutor(max_workers=12) as pool_video:
-                futures = [
-                    pool_video.submit(download_ts, s) for s in m3u8_content.segments
-                ]
+            with manifest, partial_path.open("ab") as merged, ThreadPoolExecutor(
+                max_workers=controller.max_workers
+            ) as pool_video:
+                futures: Dict[Future, int] = {}
+                finished: Dict[int, bytes] = {}
+                next_submit = merged_count
+
+                def merge_finished():
+                    nonlocal merged_count
+                    while merged_count in finished:
+                        content = finished.pop(merged_count)
+                        merged.write(content)
+                        manifest.add(content)
+                        merged_count += 1
+
                 try:
-                    for future in as_completed(futures):
-                        future.result()
+                    while merged_count < len(segments):
+                        self._raise_if_cancelled()
+                        while (
+                            next_submit < len(segments)
+                            and len(futures) < controller.limit
+                            and next_submit - merged_count < self.SEGMENT_WINDOW
+                        ):
+                            future = pool_video.submit(
+                                download_ts, segments[next_submit]
+                            )
+                            futures[future] = next_submit
+                            next_submit += 1
+
+                        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            finished[futures.pop(future)] = future.result()
+
+                        merge_finished()
+                        self._report_progress(
+                            (merged_count + len(finished)) / len(segments) * 100
+                        )
                 except KeyboardInterrupt:
                     self._info_callback(
                         "Download Interrupted, cancelling futures, this may take a while..."
                     )
                     pool_video.shutdown(wait=False, cancel_futures=True)
                     raise
+                except Exception:
+                    # Keep the segments that already arrived, so a retry
+                    # only has to fetch the ones after the failed segment
+                    pool_video.shutdown(wait=True, cancel_futures=True)
+                    for future, index in futures.items():
+                        if not future.cancelled() and future.exception() is None:
+                            finished[index] = future.result()
+                    merge_finished()
+                    raise
 
-            self._info_callback("Parts Downloaded")
-
-            self._info_callback("Merging Parts...")
-            with download_path.open("wb") as merged:
-                for segment in m3u8_content.segments:
-                    uri = Path(segment.uri)
-                    segment_name = self._get_valid_pathname(uri.stem)
-                    segment_name = segment_name[: self.MAX_SEGMENT_NAME_LENGTH]
-                    fname = (temp_folder / segment_name).with_suffix(uri.suffix)
-                    if not fname.is_file():
-                        raise DownloadError(
-                            f"Could not merge, missing a segment of this playlist: {stream.url}"
-                        )
-
-                    with fname.open("rb") as mergefile:
-                        shutil.copyfileobj(mergefile, merged)
-
-            self._info_callback("Merge Finished")
-            shutil.rmtree(temp_folder)
+            self._info_callback("Download Finished")
+            os.replace(partial_path, download_path)
+            manifest.delete()
+            self._remove_temp_folder(temp_folder)
 
             return download_path
         except KeyboardInterrupt:
-            self._info_callback("Download Interrupted, deleting partial file.")
-            download_path.unlink(missing_ok=True)
-            shutil.rmtree(temp_folder)
+            self._info_callback(
+                "Download Interrupted, the partial file is kept to resume later."
+            )
             raise
 
+    MIN_RANGE_SIZE = 8 * 1024 * 1024
+
+    @traced("download.mp4")
     def mp4_download(self, stream: "ProviderStream", download_path: Path) -> Path:
         """Download a mp4 stream to a specified download path.
 
         The suffix of the download path will be replaced (or added)
         with ".mp4", use the path returned instead of the passed path.
 
+        If the server supports range requests, the file is downloaded with
+        several parallel range requests into a preallocated partial file
+        and an interrupted download resumes where it stopped. Otherwise
+        the stream is downloaded in one request.
+
         Args:
             stream: The mp4 stream
             download_path: The path to download the stream to
@@ -206,28 +858,145 @@ class Downloader:
         Returns:
             The download path with a ".mp4" suffix
         """
-        r = self._session.get(
-            stream.url, stream=True, headers={"Referer": stream.referrer}
-        )
-        r.raise_for_status()
-        total = int(r.headers.get("content-length", 0))
-        try:
+        download_path = download_path.with_suffix(".mp4")
+        temp_folder = self._make_temp_folder(download_path)
+        partial_path = temp_folder / download_path.name
 
-            with download_path.with_suffix(".mp4").open("wb") as file_handle:
-                downloaded_size = 0
-                for data in r.iter_content(chunk_size=1024):
-                    downloaded_size += file_handle.write(data)
-                    self._progress_callback(downloaded_size / total * 100)
+        with span("download.mp4.probe", url=stream.url) as s:
+            r = self._session.get(
+                stream.url, stream=True, headers={"Referer": stream.referrer}
+            )
+            r.raise_for_status()
+            total = int(r.headers.get("content-length", 0))
+            supports_ranges = r.headers.get("accept-ranges", "").lower() == "bytes"
+            s.set_attributes(bytes=total, ranges=supports_ranges)
 
+        try:
+            if supports_ranges and total > 0:
+                r.close()
+                self._mp4_download_ranges(stream, partial_path, temp_folder, total)
+            else:
+                self._mp4_download_single(r, partial_path, total)
         except KeyboardInterrupt:
-            self._info_callback("Download Interrupted, deleting partial file.")
-            download_path.unlink()
+            self._info_callback(
+                "Download Interrupted, the partial file is kept to resume later."
+            )
             raise
 
+        os.replace(partial_path, download_path)
+        self._remove_temp_folder(temp_folder)
+
         self._info_callback("Download finished.")
 
-        return download_path.with_suffix(".mp4")
+        return download_path
+
+    def _mp4_download_single(
+        self, r: requests.Response, partial_path: Path, total: int
+    ):
+        with partial_path.open("wb") as file_handle:
+            downloaded_size = 0
+            for data in r.iter_content(chunk_size=self._chunk_size):
+                self._raise_if_cancelled()
+                downloaded_size += file_handle.write(data)
+                self._consume_rate(len(data))
+                if total:
+                    self._report_progress(downloaded_size / total * 100)
+
+    def _mp4_download_ranges(
+        self,
+        stream: "ProviderStream",
+        partial_path: Path,
+        temp_folder: Path,
+        total: int,
+    ):
+        manifest = RangeManifest(temp_folder / f"{partial_path.stem}.ranges", total)
+
+        if not manifest.ranges or not partial_path.is_file():
+            # Without a valid manifest nothing is known about the partial
+            # file, it is preallocated so its length says nothing either
+            partial_path.unlink(missing_ok=True)
+            manifest.split(0, self._mp4_connections, self.MIN_RANGE_SIZE)
+
+        if manifest.downloaded > 0:
+            self._info_callback(
+                f"Resuming download, {manifest.downloaded / total * 100:.1f}% already downloaded"
+            )
+
+        fd = os.open(partial_path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0))
+        write_lock = Lock()
+        parent_span = current_span()
+        parent_span.set_attributes(
+            ranges=len(manifest.ranges), resumed=manifest.downloaded
+        )
 
+        def pwrite(data: bytes, offset: int):
+            if hasattr(os, "pwrite"):
+                while data:
+                    written = os.pwrite(fd, data, offset)
+                    data = data[written:]
+                    offset += written
+            else:
+                with write_lock:
+                    os.lseek(fd, offset, os.SEEK_SET)
+                    while data:
+                        data = data[os.write(fd, data) :]
+
+        def download_range(index: int):
+            _, position, end = manifest.ranges[index]
+            if position > end:
+                return
+            self._raise_if_cancelled()
+
+            with span(
+                "download.mp4.range", parent=parent_span, start=position, end=end
+            ), self._acquire_connection(stream.url):
+                res = self._session.get(
+                    stream.url,
+                    stream=True,
+                    headers={
+                        "Referer": stream.referrer,
+                        "Range": f"bytes={position}-{end}",
+                    },
+                )
+                res.raise_for_status()
+                if res.status_code != 206:
+                    raise DownloadError(
+                        f"Server ignored the range request for: {stream.url}"
+                    )
+
+                for data in res.iter_content(chunk_size=self._chunk_size):
+                    self._raise_if_cancelled()
+                    data = data[: end + 1 - position]
+                    pwrite(data, position)
+                    position += len(data)
+                    manifest.advance(index, len(data))
+                    self._consume_rate(len(data))
+                    self._report_progress(manifest.downloaded / total * 100)
+
+            if position <= end:
+                raise DownloadError(
+                    f"Connection closed before the range was complete: {stream.url}"
+                )
+
+        try:
+            os.ftruncate(fd, total)
+            with ThreadPoolExecutor(max_workers=max(len(manifest.ranges), 1)) as pool:
+                futures = [
+                    pool.submit(download_range, i) for i in range(len(manifest.ranges))
+                ]
+                try:
+                    for future in as_completed(futures):
+                        future.result()
+                except BaseException:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    raise
+        finally:
+            os.close(fd)
+            manifest.write()
+
+        manifest.delete()
+
+    @traced("download.ffmpeg")
     def ffmpeg_download(self, stream: "ProviderStream", download_path: Path) -> Path:
         """Download a stream with FFmpeg, FFmpeg needs to be installed on the
         system. FFmpeg will be able to handle about any stream and it is also
@@ -244,41 +1013,42 @@ class Downloader:
             passed one as ffmpeg will remux to about any container.
         """
 
-        ffprobe = (
-            FFmpeg(executable="ffprobe")
-            .option("v", 0)
-            .option("of", "json")
-            .option("show_program_version")
-        )
-        version = json.loads(ffprobe.execute())
-        version = [
-            int("".join(c for c in v if c.isdigit()))
-            for v in version["program_version"]["version"].split("-")[0].split(".")
-        ]
+        with span("download.ffmpeg.probe", url=stream.url):
+            ffprobe = (
+                FFmpeg(executable="ffprobe")
+                .option("v", 0)
+                .option("of", "json")
+                .option("show_program_version")
+            )
+            version = json.loads(ffprobe.execute())
+            version = [
+                int("".join(c for c in v if c.isdigit()))
+                for v in version["program_version"]["version"].split("-")[0].split(".")
+            ]
 
-        if len(version) < 3:
-            version.append(0)
+            if len(version) < 3:
+                version.append(0)
 
-        major_v, minor_v, patch_v = version
+            major_v, minor_v, patch_v = version
 
-        extension_picky = major_v >= 7 and minor_v >= 1 and patch_v >= 1
+            extension_picky = major_v >= 7 and minor_v >= 1 and patch_v >= 1
 
-        ffprobe = FFmpeg(executable="ffprobe").input(
-            stream.url, print_format="json", show_format=None
-        )
+            ffprobe = FFmpeg(executable="ffprobe").input(
+                stream.url, print_format="json", show_format=None
+            )
 
-        if stream.referrer:
-            ffprobe.option("headers", f"Referer: {stream.referrer}")
+            if stream.referrer:
+                ffprobe.option("headers", f"Referer: {stream.referrer}")
 
-        if extension_picky:
-            ffprobe.option("extension_picky", 0)
+            if extension_picky:
+                ffprobe.option("extension_picky", 0)
 
-        if stream.container == "hls":
-            ffprobe.option("f", "hls")
+            if stream.container == "hls":
+                ffprobe.option("f", "hls")
 
-        meta = json.loads(ffprobe.execute())
-        duration = float(meta["format"]["duration"])
-        format_name = meta["format"]["format_name"]
+            meta = json.loads(ffprobe.execute())
+            duration = float(meta["format"]["duration"])
+            format_name = meta["format"]["format_name"]
 
         ffmpeg = (
             FFmpeg()
@@ -298,14 +1068,26 @@ class Downloader:
 
         @ffmpeg.on("progress")
         def on_progress(progress: Progress):
+            if self._cancelled.is_set():
+                ffmpeg.terminate()
+                return
             self._progress_callback(progress.time.total_seconds() / duration * 100)
 
         try:
-            ffmpeg.execute()
+            with span("download.ffmpeg.transcode", duration=duration):
+                ffmpeg.execute()
         except KeyboardInterrupt:
             self._info_callback("interrupted deleting partially downloaded file")
             download_path.unlink()
             raise
+        except Exception:
+            if not self._cancelled.is_set():
+                raise
+
+        if self._cancelled.is_set():
+            # FFmpeg can not resume its output
+            download_path.unlink(missing_ok=True)
+            self._raise_if_cancelled()
 
         return download_path
 
@@ -315,12 +1097,13 @@ class Downloader:
 
         download_path.parent.mkdir(parents=True, exist_ok=True)
         self._info_callback("Downloading external subs")
-        for s in stream.subtitle.values():
-            res = self._session.get(s.url, headers={"Referer": stream.referrer})
-            suffix = f".{s.shortcode}.{s.codec}"
-            path = download_path.with_suffix(suffix)
-            with path.open("w", encoding="utf-8") as fp:
-                fp.write(res.content.decode())
+        with span("download.subtitles", subtitles=len(stream.subtitle)):
+            for s in stream.subtitle.values():
+                res = self._session.get(s.url, headers={"Referer": stream.referrer})
+                suffix = f".{s.shortcode}.{s.codec}"
+                path = download_path.with_suffix(suffix)
+                with path.open("w", encoding="utf-8") as fp:
+                    fp.write(res.content.decode())
 
     def download(
         self,
@@ -356,15 +1139,28 @@ class Downloader:
         curr_exc: Exception | None = None
         post_dl_cb = post_dl_cb or (lambda path, stream: None)
         for i in range(max_retry):
+            self._raise_if_cancelled()
             try:
-                path = self._download_single_try(
-                    stream, download_path, post_dl_cb, container, ffmpeg
-                )
+                with span(
+                    "download",
+                    url=stream.url,
+                    container=stream.container,
+                    episode=stream.episode,
+                    resolution=stream.resolution,
+                    attempt=i + 1,
+                ):
+                    path = self._download_single_try(
+                        stream, download_path, post_dl_cb, container, ffmpeg
+                    )
                 return path
             except DownloadError as e:
+                if self._cancelled.is_set():
+                    raise
                 self._soft_error_callback(str(e))
                 curr_exc = e
             except Exception as e:
+                if self._cancelled.is_set():
+                    raise
                 self._soft_error_callback(f"An error occurred during download: {e}")
                 curr_exc = e
             self._soft_error_callback(f"{max_retry-i-1} retries remain")
@@ -420,18 +1216,308 @@ class Downloader:
                 return path
             self._info_callback(f"Remuxing to {container} container")
             new_path = path.with_suffix(container)
-            download = self.ffmpeg_download(
-                ProviderStream(
-                    str(path),
-                    stream.resolution,
-                    stream.episode,
-                    stream.language,
-                ),
-                new_path,
-            )
+            with span("download.remux", container=container):
+                download = self.ffmpeg_download(
+                    ProviderStream(
+                        str(path),
+                        stream.resolution,
+                        stream.episode,
+                        stream.language,
+                    ),
+                    new_path,
+                )
             path.unlink()
             post_dl_cb(download, stream)
             return download
 
         post_dl_cb(path, stream)
         return path
+
+
+@dataclass
+class DownloadJob:
+    """A download job for the [DownloadScheduler][anipy_api.download.DownloadScheduler].
+
+    Attributes:
+        stream: The stream to download
+        download_path: The path to download the stream to, look at
+            [download][anipy_api.download.Downloader.download]
+        priority: Jobs with a higher priority are started first, jobs with
+            the same priority are started in the order they were submitted
+        container: The container to remux the video to, look at
+            [download][anipy_api.download.Downloader.download]
+        ffmpeg: Wheter to use ffmpeg for m3u8/hls streams, look at
+            [download][anipy_api.download.Downloader.download]
+        max_retry: The amount of times the download can be retried
+        post_dl_cb: Called when completing download
+        progress_callback: Progress callback of this job
+        info_callback: Info callback of this job
+        soft_error_callback: Soft error callback of this job
+        refresh_stream: Resolves the stream again, stream urls often expire
+            after some time. It is called if the job starts more than
+            `stream_max_age` seconds after the stream was resolved and once
+            if the download fails.
+        stream_max_age: Age in seconds after which the stream is resolved
+            again before downloading, only used with `refresh_stream`
+        resolved_at: Time (`time.monotonic`) at which the stream was resolved
+    """
+
+    stream: ProviderStream
+    download_path: Path
+    priority: int = 0
+    container: Optional[str] = None
+    ffmpeg: bool = False
+    max_retry: int = 3
+    post_dl_cb: Optional[PostDownloadCallback] = None
+    progress_callback: Optional[ProgressCallback] = None
+    info_callback: Optional[InfoCallback] = None
+    soft_error_callback: Optional[InfoCallback] = None
+    refresh_stream: Optional[Callable[[], Optional[ProviderStream]]] = None
+    stream_max_age: float = 600
+    resolved_at: float = field(default_factory=time.monotonic)
+
+
+class DownloadScheduler:
+    """A scheduler that downloads several jobs at once. All downloads share
+    one budget of connections (split fairly between hosts), an optional rate
+    limit and the learned per-host concurrency limits.
+
+    Example:
+        ```python
+        from anipy_api.download import DownloadJob, DownloadScheduler
+
+        with DownloadScheduler(max_parallel=3, max_bytes_per_second=10_000_000) as scheduler:
+            futures = [
+                scheduler.submit(DownloadJob(stream, path)) for stream, path in jobs
+            ]
+
+        for f in futures:
+            print(f.result()) # (1)
+        ```
+
+        1. The result is the path of the download, or the exception raised by
+            [download][anipy_api.download.Downloader.download].
+    """
+
+    def __init__(
+        self,
+        max_parallel: int = 2,
+        max_connections: int = 32,
+        max_bytes_per_second: Optional[int] = None,
+        min_workers: int = 4,
+        max_workers: int = 32,
+        max_pending: Optional[int] = None,
+    ):
+        """__init__ of DownloadScheduler
+
+        Args:
+            max_parallel: The amount of jobs that are downloaded at once
+            max_connections: The amount of connections shared by all jobs
+            max_bytes_per_second: The rate limit shared by all jobs
+            max_pending: The amount of jobs that may wait to be started, if
+                this is reached [submit][anipy_api.download.DownloadScheduler.submit]
+                blocks until a job starts. Use this to bound how far ahead of the
+                downloads streams are resolved.
+            min_workers: Look at [Downloader][anipy_api.download.Downloader.__init__]
+            max_workers: Look at [Downloader][anipy_api.download.Downloader.__init__]
+
+        Raises:
+            ArgumentError: Raised if a limit is invalid
+        """
+        if (
+            max_parallel < 1
+            or max_connections < 1
+            or (max_pending is not None and max_pending < 1)
+        ):
+            raise ArgumentError(
+                f"Invalid limits max_parallel={max_parallel}, max_connections={max_connections}, max_pending={max_pending}"
+            )
+
+        self.max_parallel = max_parallel
+        self._min_workers = min_workers
+        self._max_workers = min(max_workers, max_connections)
+
+        self._connection_budget = ConnectionBudget(max_connections)
+        self._rate_limiter = (
+            RateLimiter(max_bytes_per_second) if max_bytes_per_second else None
+        )
+        self._controllers: Dict[str, ConcurrencyController] = {}
+        self._controllers_lock = Lock()
+
+        self._queue: PriorityQueue = PriorityQueue()
+        self._counter = count()
+        self._threads: List[Thread] = []
+        self._lock = Condition()
+        self._shutdown = False
+        self._max_pending = max_pending
+        self._pending = 0
+        self._running: Dict[Future, Downloader] = {}
+        self._cancelled: Set[Future] = set()
+
+    @property
+    def pending(self) -> int:
+        """The amount of jobs that are waiting to be started."""
+        return self._pending
+
+    def submit(self, job: DownloadJob) -> "Future[Path]":
+        """Queue a download job.
+
+        Args:
+            job: The job to download
+
+        Returns:
+            A future that resolves to the path of the download
+
+        Raises:
+            RuntimeError: Raised if the scheduler is already shut down
+        """
+        future: "Future[Path]" = Future()
+        with self._lock:
+            if self._max_pending is not None:
+                self._lock.wait_for(
+                    lambda: self._pending < self._max_pending or self._shutdown
+                )
+
+            if self._shutdown:
+                raise RuntimeError("Can not submit jobs after shutdown")
+
+            self._pending += 1
+            self._queue.put((-job.priority, next(self._counter), job, future))
+            if len(self._threads) < self.max_parallel:
+                thread = Thread(target=self._work, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+        return future
+
+    def cancel(self, future: Future):
+        """Cancel a job, if it is waiting it is not started and if it is
+        running its download is stopped (look at
+        [cancel][anipy_api.download.Downloader.cancel]). Finished jobs are not
+        affected.
+
+        Args:
+            future: The future returned by
+                [submit][anipy_api.download.DownloadScheduler.submit]
+        """
+        if future.cancel() or future.done():
+            return
+
+        with self._lock:
+            self._cancelled.add(future)
+            downloader = self._running.get(future)
+
+        if downloader is not None:
+            downloader.cancel()
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False):
+        """Stop the scheduler after the queued jobs are done.
+
+        Args:
+            wait: Wait for the jobs to finish
+            cancel_pending: Cancel the jobs that have not started yet
+        """
+        with self._lock:
+            if not self._shutdown:
+                self._shutdown = True
+                for _ in self._threads:
+                    self._queue.put((float("inf"), next(self._counter), None, None))
+                self._lock.notify_all()
+
+        if cancel_pending:
+            for _, _, _, future in list(self._queue.queue):
+                if future is not None:
+                    future.cancel()
+
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _work(self):
+        while True:
+            _, _, job, future = self._queue.get()
+            if job is None or future is None:
+                return
+
+            with self._lock:
+                self._pending -= 1
+                self._lock.notify_all()
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                future.set_result(self._download(job, future))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._running.pop(future, None)
+                    self._cancelled.discard(future)
+
+    def _download(self, job: DownloadJob, future: Future) -> Path:
+        downloader = Downloader(
+            job.progress_callback,
+            job.info_callback,
+            job.soft_error_callback,
+            min_workers=min(self._min_workers, self._max_workers),
+            max_workers=self._max_workers,
+            connection_budget=self._connection_budget,
+            rate_limiter=self._rate_limiter,
+        )
+        # Share what was learned about the hosts between the jobs
+        downloader._controllers = self._controllers
+        downloader._controllers_lock = self._controllers_lock
+
+        with self._lock:
+            self._running[future] = downloader
+            if future in self._cancelled:
+                downloader.cancel()
+
+        if (
+            job.refresh_stream is not None
+            and time.monotonic() - job.resolved_at > job.stream_max_age
+        ):
+            downloader._info_callback("Stream may have expired, resolving it again")
+            self._refresh_stream(job)
+
+        def download() -> Path:
+            return downloader.download(
+                job.stream,
+                job.download_path,
+                container=job.container,
+                ffmpeg=job.ffmpeg,
+                max_retry=job.max_retry,
+                post_dl_cb=job.post_dl_cb,
+            )
+
+        try:
+            return download()
+        except Exception:
+            if job.refresh_stream is None or downloader.cancelled:
+                raise
+
+            downloader._soft_error_callback(
+                "Download failed, resolving the stream again in case it expired"
+            )
+            if not self._refresh_stream(job):
+                raise
+
+            return download()
+
+    @staticmethod
+    def _refresh_stream(job: DownloadJob) -> bool:
+        assert job.refresh_stream is not None
+        stream = job.refresh_stream()
+        if stream is None:
+            return False
+
+        job.stream = stream
+        job.resolved_at = time.monotonic()
+        return True
+
+    def __enter__(self) -> "DownloadScheduler":
+        return self
+
+    def __exit__(self, exc_type: Optional[type], *_: Any):
+        self.shutdown(wait=exc_type is None, cancel_pending=exc_type is not None)
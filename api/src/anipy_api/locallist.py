@@ -1,16 +1,56 @@
+import json
+import os
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from pathlib import Path
-from time import time
-from typing import Any, Dict, List, Optional, Protocol, Set, Union
+from time import sleep, time
+from typing import (Any, Dict, Iterable, Iterator, List, Optional, Protocol,
+                    Set, Tuple, Union)
 
 from anipy_api.anime import Anime
+from anipy_api.codec import FastJsonMixin, loads
 from anipy_api.error import ArgumentError
 from anipy_api.provider import Episode, LanguageTypeEnum
-from dataclasses_json import DataClassJsonMixin, config
+from dataclasses_json import config
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def _lock_file(file: Path) -> Iterator[None]:
+    """Hold a advisory exclusive lock on a file, it is created if it does
+    not exist."""
+    with file.open("a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            # LK_LOCK gives up after 10 seconds, another process may hold
+            # the lock longer than that
+            delay = 0.01
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    sleep(delay)
+                    delay = min(delay * 2, 0.5)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
 
 
 @dataclass
-class LocalListEntry(DataClassJsonMixin):
+class LocalListEntry(FastJsonMixin):
     """A json-serializable local list entry class that can be saved to a file
     and includes various information to rebuild state after deserializing.
 
@@ -40,7 +80,7 @@ class LocalListEntry(DataClassJsonMixin):
 
 
 @dataclass
-class LocalListData(DataClassJsonMixin):
+class LocalListData(FastJsonMixin):
     """A json-serializable class to save local list data
 
     Attributes:
@@ -52,10 +92,18 @@ class LocalListData(DataClassJsonMixin):
     def write(self, file: Path):
         """Writes the data of the current LocalListData object to a file.
 
+        The data is written to a temporary file first, which then replaces
+        the file, so readers never see a half written file.
+
         Args:
             file: File path to write to (this should be a .json file)
         """
-        file.write_text(self.to_json())
+        temp = file.with_name(f".{file.name}.{os.getpid()}.tmp")
+        try:
+            temp.write_text(self.to_json())
+            os.replace(temp, file)
+        finally:
+            temp.unlink(missing_ok=True)
 
 
 class MigrateCallback(Protocol):
@@ -75,8 +123,31 @@ class MigrateCallback(Protocol):
 class LocalList:
     """This class can manage a list of Anime objects and some extra state. This is built
     for the cli, but it may also be used in a library for easy (de)serialization of Anime objects
+
+    The list is kept in memory and only read again from disk if the file changed.
+    Changes are not written by rewriting the whole file, instead they are appended
+    to a journal next to it (`<file>.log`). When the journal gets too long it is
+    merged back into the file (compaction), so the file always stays in the same
+    json format.
+
+    Several LocalList objects, also in different processes, can safely share a
+    file: changes are made while holding a lock on `<file>.lock` and the file is
+    only ever replaced atomically. If two records of the same entry conflict,
+    the one with the newer `timestamp` wins.
+
+    Until the journal is merged, the file alone does not have the latest
+    changes. Read the list through a LocalList (or call
+    [compact][anipy_api.locallist.LocalList.compact] first) instead of reading
+    the file directly.
+
+    Attributes:
+        COMPACT_AFTER: The minimum amount of journal records before the journal
+            gets merged into the file, if the list has more entries than this the
+            amount of entries is used instead
     """
 
+    COMPACT_AFTER = 256
+
     def __init__(self, file: Path, migrate_cb: Optional[MigrateCallback] = None):
         """__init__ of LocalList
 
@@ -86,21 +157,224 @@ class LocalList:
         """
 
         self.file = file
+        self.journal = file.with_name(f"{file.name}.log")
+        self.lock = file.with_name(f"{file.name}.lock")
+        self._migrate_cb = migrate_cb
+
+        self._file_stat: Optional[Tuple[int, int, int]] = None
+        self._journal_offset = 0
+        self._journal_records = 0
+
+        # Set while a batch is running, see `batch`
+        self._batch_ops: Optional[List[Tuple[str, Any, Dict[str, Any]]]] = None
+        self._pending: Optional[List[bytes]] = None
+
         if not self.file.is_file():
             self.file.parent.mkdir(exist_ok=True, parents=True)
-            self.file.touch()
-            self.data = LocalListData({})
-            self.data.write(self.file)
-        else:
+            with _lock_file(self.lock):
+                if not self.file.is_file():
+                    self.journal.unlink(missing_ok=True)
+                    LocalListData({}).write(self.file)
+
+        self._load()
+
+    @staticmethod
+    def _stat(file: Path) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = file.stat()
+        except FileNotFoundError:
+            return None
+
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def _load(self):
+        # The stat has to describe the data that was read, if another
+        # process replaced the file while reading, read it again
+        while True:
+            file_stat = self._stat(self.file)
             try:
                 self.data = LocalListData.from_json(self.file.read_text())
             except KeyError:
-                if migrate_cb is None:
+                if self._migrate_cb is None:
                     raise
-                self.data = migrate_cb(self.file)
+                self.data = self._migrate_cb(self.file)
+
+            if self._stat(self.file) == file_stat:
+                break
+
+        self._file_stat = file_stat
+        self._journal_offset = 0
+        self._journal_records = 0
+        self._replay()
+
+    def _replay(self):
+        """Apply the journal records that were not applied yet."""
+        try:
+            size = self.journal.stat().st_size
+        except FileNotFoundError:
+            return
+
+        if size == self._journal_offset:
+            return
+
+        with self.journal.open("rb") as f:
+            f.seek(self._journal_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Partially written record, it is read once it is complete
+                    break
+
+                self._journal_offset += len(line)
+                record = loads(line)
+
+                if "file" in record:
+                    # The header of the journal, if it does not belong to the
+                    # current file it is left over from a old list and gets
+                    # replaced by the next write
+                    if tuple(record["file"]) != self._file_stat:
+                        self._journal_offset = 0
+                        return
+                    continue
+
+                self._apply(record)
+                self._journal_records += 1
+
+    def _apply(self, record: Dict[str, Any]):
+        uid = record["uid"]
+        current = self.data.data.get(uid, None)
+
+        if record["op"] == "set":
+            entry = LocalListEntry.from_dict(record["entry"])
+            if current is None or entry.timestamp >= current.timestamp:
+                self.data.data[uid] = entry
+        elif current is not None and current.timestamp <= record["ts"]:
+            del self.data.data[uid]
 
     def _read(self):
-        self.data = LocalListData.from_json(self.file.read_text())
+        if self._batch_ops is not None:
+            # Reading in a batch would drop its changes, they are
+            # applied to the current list when the batch is written
+            return
+
+        if self._stat(self.file) != self._file_stat:
+            self._load()
+        else:
+            self._replay()
+
+    def _append(self, record: Dict[str, Any]):
+        """Append a record to the journal and compact it if it got too long,
+        the lock has to be held. In a batch the record is only buffered."""
+        line = json.dumps(record).encode() + b"\n"
+
+        if self._pending is not None:
+            self._pending.append(line)
+            return
+
+        self._write_journal([line])
+
+    def _write_journal(self, lines: List[bytes]):
+        if self._journal_offset == 0:
+            # There is no journal for the current file yet
+            header = json.dumps({"file": self._file_stat}).encode() + b"\n"
+            with self.journal.open("wb") as f:
+                f.write(header + b"".join(lines))
+        else:
+            with self.journal.open("ab") as f:
+                f.write(b"".join(lines))
+
+        self._replay()
+
+        if self._journal_records > max(self.COMPACT_AFTER, len(self.data.data)):
+            self._compact()
+
+    def compact(self):
+        """Merge the journal into the list file."""
+        with _lock_file(self.lock):
+            self._read()
+            self._compact()
+
+    @contextmanager
+    def batch(self) -> Iterator["LocalList"]:
+        """Collect all updates and deletes made in this context and write
+        them at once when it exits.
+
+        The changes are visible in this LocalList right away, but they are
+        only written to disk (in one write) when the context exits. If it
+        exits with a exception, the changes are discarded. The lock is only
+        held for that write, so a long running batch does not block other
+        processes. Batches can be nested, the outermost one writes the changes.
+
+        The changes are applied again to the list as it is on disk when they
+        are written. A change that does not apply anymore (e.g. the update of
+        an entry that another process deleted in the meantime) is skipped,
+        the others are still written.
+
+        Example:
+            ```python
+            with local_list.batch():
+                for anime in seasonals:
+                    local_list.update(anime, episode=1, language=LanguageTypeEnum.SUB)
+            ```
+
+        Yields:
+            This LocalList
+        """
+        if self._batch_ops is not None:
+            yield self
+            return
+
+        self._batch_ops = []
+        self._pending = []
+        try:
+            yield self
+        except BaseException:
+            self._batch_ops = None
+            self._pending = None
+            # Drop the changes of the batch from the list in memory
+            self._load()
+            raise
+
+        ops = self._batch_ops
+        self._batch_ops = None
+        self._pending = None
+        if ops:
+            self._commit(ops)
+
+    def _commit(self, ops: List[Tuple[str, Any, Dict[str, Any]]]):
+        with _lock_file(self.lock):
+            # Start from what is on disk and apply the operations again,
+            # the list may have changed while the batch was running
+            self._load()
+
+            self._pending = []
+            try:
+                for op, anime, update_fields in ops:
+                    try:
+                        if op == "update":
+                            self._update(anime, **update_fields)
+                        else:
+                            self._delete(anime)
+                    except ArgumentError:
+                        # The entry was deleted by another process since
+                        # the batch changed it, the deletion wins
+                        continue
+                lines = self._pending
+            finally:
+                self._pending = None
+
+            if lines:
+                self._write_journal(lines)
+
+    def _compact(self):
+        # Only write what is on disk, the list in memory could be
+        # missing records of other processes
+        self._load()
+        self.data.write(self.file)
+        self.journal.unlink(missing_ok=True)
+
+        self._file_stat = self._stat(self.file)
+        self._journal_offset = 0
+        self._journal_records = 0
 
     def update(
         self, anime: Union[Anime, LocalListEntry], **update_fields: Any
@@ -137,8 +411,38 @@ class LocalList:
             ArgumentError: Raised if updating a anime that does not exist (adding) and not providing at
                 least the `episode` and `language` to the update_fields.
         """
-        self._read()
+        if self._batch_ops is not None:
+            entry = self._update(anime, **update_fields)
+            self._batch_ops.append(("update", anime, update_fields))
+            return entry
+
+        with _lock_file(self.lock):
+            self._read()
+            return self._update(anime, **update_fields)
+
+    def update_many(
+        self, updates: Iterable[Tuple[Union[Anime, LocalListEntry], Dict[str, Any]]]
+    ) -> List[LocalListEntry]:
+        """Update (or add) several anime in the local list at once, this
+        writes the list only once. Look at [update][anipy_api.locallist.LocalList.update]
+        for the possible fields.
 
+        Args:
+            updates: Pairs of the anime to update and its update fields
+
+        Returns:
+            The updated entries
+
+        Raises:
+            ArgumentError: Raised if updating a anime that does not exist (adding) and not providing at
+                least the `episode` and `language` to the update fields.
+        """
+        with self.batch():
+            return [self.update(anime, **fields) for anime, fields in updates]
+
+    def _update(
+        self, anime: Union[Anime, LocalListEntry], **update_fields: Any
+    ) -> LocalListEntry:
         uid = self._get_uid(anime)
         entry = self.data.data.get(uid, None)
 
@@ -171,7 +475,9 @@ class LocalList:
             entry.timestamp = int(time())
 
         self.data.data[uid] = entry
-        self.data.write(self.file)
+        self._append(
+            {"op": "set", "uid": uid, "entry": entry.to_dict(encode_json=True)}
+        )
 
         return entry
 
@@ -184,10 +490,19 @@ class LocalList:
         Returns:
             The deleted object or None if the anime to delete was not found in the local list
         """
-        self._read()
+        if self._batch_ops is not None:
+            self._batch_ops.append(("delete", anime, {}))
+            return self._delete(anime)
 
-        entry = self.data.data.pop(self._get_uid(anime), None)
-        self.data.write(self.file)
+        with _lock_file(self.lock):
+            self._read()
+            return self._delete(anime)
+
+    def _delete(self, anime: Union[Anime, LocalListEntry]) -> Optional[LocalListEntry]:
+        uid = self._get_uid(anime)
+        entry = self.data.data.pop(uid, None)
+        if entry is not None:
+            self._append({"op": "delete", "uid": uid, "ts": int(time())})
 
         return entry
 
@@ -5,10 +5,10 @@ from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set
 
 import Levenshtein
 from anipy_api.anime import Anime
+from anipy_api.codec import FastJsonMixin
 from anipy_api.error import MyAnimeListError
 from anipy_api.provider import (FilterCapabilities, Filters, MediaType,
                                 ProviderSearchResult, Season)
-from dataclasses_json import DataClassJsonMixin
 from requests import Request, Session
 
 if TYPE_CHECKING:
@@ -77,7 +77,7 @@ class MALSeasonEnum(Enum):
 
 
 @dataclass
-class MALUser(DataClassJsonMixin):
+class MALUser(FastJsonMixin):
     """A json-serializable class that holds user data.
 
     Attributes:
@@ -92,7 +92,7 @@ class MALUser(DataClassJsonMixin):
 
 
 @dataclass
-class MALMyListStatus(DataClassJsonMixin):
+class MALMyListStatus(FastJsonMixin):
     """A json-serializable class that holds a user's list status. It
     accompanies [MALAnime][anipy_api.mal.MALAnime].
 
@@ -112,7 +112,7 @@ class MALMyListStatus(DataClassJsonMixin):
 
 
 @dataclass
-class MALAlternativeTitles(DataClassJsonMixin):
+class MALAlternativeTitles(FastJsonMixin):
     """A json-serializable class that holds alternative anime titles.
 
     Attributes:
@@ -127,7 +127,7 @@ class MALAlternativeTitles(DataClassJsonMixin):
 
 
 @dataclass
-class MALStartSeason(DataClassJsonMixin):
+class MALStartSeason(FastJsonMixin):
     """A json-serializable class that holds a season/year combination
     indicating the time this anime was aired in.
 
@@ -144,7 +144,7 @@ class MALStartSeason(DataClassJsonMixin):
 
 
 @dataclass
-class MALAnime(DataClassJsonMixin):
+class MALAnime(FastJsonMixin):
     """A json-serializable class that holds information about an anime and the
     user's list status if the anime is in their list.
 
@@ -175,18 +175,18 @@ class MALAnime(DataClassJsonMixin):
 
 
 @dataclass
-class MALPaging(DataClassJsonMixin):
+class MALPaging(FastJsonMixin):
     previous: Optional[str] = None
     next: Optional[str] = None
 
 
 @dataclass
-class MALResourceNode(DataClassJsonMixin):
+class MALResourceNode(FastJsonMixin):
     node: MALAnime
 
 
 @dataclass
-class MALPagingResource(DataClassJsonMixin):
+class MALPagingResource(FastJsonMixin):
     data: List[MALResourceNode]
     paging: MALPaging
 
@@ -1,12 +1,16 @@
 import atexit
+import functools
 import os
 import subprocess as sp
 import tempfile
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Dict, List, Optional, Protocol
+from concurrent.futures import Future
+from threading import Lock
+from typing import TYPE_CHECKING, Dict, List, Optional, Protocol, Tuple
 
 import requests
 from anipy_api.error import PlayerError
+from anipy_api.tracing import span
 
 if TYPE_CHECKING:
     from anipy_api.anime import Anime
@@ -33,6 +37,11 @@ class PlayerBase(ABC):
     and [get_player][anipy_api.player.player.get_player] respectively.
     """
 
+    # Downloaded subtitles by their urls, they are shared
+    # by all players and deleted when the program exits
+    _subtitles: Dict[Tuple[str, ...], "Future[Dict[str, str]]"] = {}
+    _subtitles_lock = Lock()
+
     def __init__(self, play_callback: Optional[PlayCallback] = None):
         """__init__ of PlayerBase
 
@@ -41,6 +50,26 @@ class PlayerBase(ABC):
         """
         self._play_callback = play_callback
 
+    def __init_subclass__(cls) -> None:
+        # Trace how long it takes to start playing a title
+        if "play_title" in cls.__dict__:
+            cls.play_title = cls._trace_play_title(cls.__dict__["play_title"])
+
+    @staticmethod
+    def _trace_play_title(func):
+        @functools.wraps(func)
+        def wrapper(self, anime: "Anime", stream: "ProviderStream"):
+            with span(
+                "player.play_title",
+                player=type(self).__name__,
+                anime=anime.name,
+                episode=stream.episode,
+                url=stream.url,
+            ):
+                return func(self, anime, stream)
+
+        return wrapper
+
     @abstractmethod
     def play_title(self, anime: "Anime", stream: "ProviderStream"):
         """Play a stream of an anime.
@@ -79,23 +108,64 @@ class PlayerBase(ABC):
         return f"[{anime.provider.NAME}] {anime.name} E{stream.episode} [{stream.language}][{stream.resolution}p]"
 
     @staticmethod
-    def _get_media_sub(stream: "ProviderStream"):
+    def prefetch_subtitles(stream: "ProviderStream"):
+        """Download the external subtitles of a stream ahead of time, e.g.
+        while the episode before it is playing. When the stream is played
+        the downloaded subtitles are used, instead of waiting for them.
+        This is safe to call from another thread.
+
+        Args:
+            stream: The stream
+        """
+        PlayerBase._get_media_sub(stream)
+
+    @staticmethod
+    def _get_media_sub(stream: "ProviderStream") -> Dict[str, str]:
+        if not stream.subtitle:
+            return {}
+
+        key = tuple(sub.url for sub in stream.subtitle.values())
+        with PlayerBase._subtitles_lock:
+            future = PlayerBase._subtitles.get(key)
+            owner = future is None
+            if future is None:
+                future = PlayerBase._subtitles[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            future.set_result(PlayerBase._download_media_sub(stream))
+        except BaseException as e:
+            # Let the next call try again
+            with PlayerBase._subtitles_lock:
+                del PlayerBase._subtitles[key]
+            future.set_exception(e)
+            raise
+
+        return future.result()
+
+    @staticmethod
+    def _download_media_sub(stream: "ProviderStream") -> Dict[str, str]:
         subtitles = {}
-        if stream.subtitle:
-            for name, sub in stream.subtitle.items():
-                suffix = f".{sub.shortcode if sub.shortcode else 'und'}.{sub.codec}"
-                subtitle_file = tempfile.NamedTemporaryFile(
-                    "w+", delete=False, suffix=suffix, encoding="utf-8"
-                )
-                req = requests.get(sub.url, headers={"Referer": stream.referrer})
-                subtitle_file.write(req.content.decode())
-                subtitles[name] = subtitle_file.name
 
         def delete_files(files: Dict[str, str]):
             for f in files.values():
                 os.remove(f)
 
         atexit.register(delete_files, subtitles)
+
+        assert stream.subtitle is not None
+        with span("player.subtitles", subtitles=len(stream.subtitle)):
+            for name, sub in stream.subtitle.items():
+                suffix = f".{sub.shortcode if sub.shortcode else 'und'}.{sub.codec}"
+                with tempfile.NamedTemporaryFile(
+                    "w+", delete=False, suffix=suffix, encoding="utf-8"
+                ) as subtitle_file:
+                    subtitles[name] = subtitle_file.name
+                    req = requests.get(sub.url, headers={"Referer": stream.referrer})
+                    subtitle_file.write(req.content.decode())
+
         return subtitles
 
 
@@ -155,14 +225,15 @@ class SubProcessPlayerBase(PlayerBase):
         self._player_exec = player_path
 
     def play_title(self, anime: "Anime", stream: "ProviderStream"):
+        subtitles = self._get_media_sub(stream).values()
         player_cmd = [
             i.format(
                 media_title=self._get_media_title(anime, stream),
                 stream_url=stream.url,
                 subtitles=(
-                    "#".join(self._get_media_sub(stream).values())
+                    "#".join(subtitles)
                     if self._player_exec == "vlc"
-                    else ":".join(self._get_media_sub(stream).values())
+                    else ":".join(subtitles)
                 ),
                 referrer=stream.referrer,
                 container=stream.container
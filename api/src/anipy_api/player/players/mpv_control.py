@@ -1,6 +1,9 @@
-from typing import TYPE_CHECKING, Any, Optional
+import os
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from anipy_api.player.base import PlayCallback, PlayerBase
+from anipy_api.tracing import span
 
 if TYPE_CHECKING:
     from anipy_api.anime import Anime
@@ -19,6 +22,25 @@ class MpvControllable(PlayerBase):
     [here](https://github.com/jaseg/python-mpv?tab=readme-ov-file#usage)
     for documentation (or use your LSP), the python-mpv mpv instance lives in the mpv attribute.
 
+    Titles can also be queued with [queue_title][anipy_api.player.players.mpv_control.MpvControllable.queue_title],
+    they are appended to the playlist of mpv, which starts loading the next
+    title before the current one ends (`prefetch-playlist`), so episodes play
+    one after another without a gap.
+
+    Example:
+        ```python
+        player = MpvControllable()
+        for stream in streams:
+            if not player.queue_title(anime, stream, on_play=print):
+                break  # the window was closed
+            player.wait_for_queue(max_pending=1)  # (1)
+        player.wait_for_queue()
+        player.wait()
+        ```
+
+        1. Only queue the next title once the last queued one started, so
+           stream urls are not resolved long before they are played.
+
     Attributes:
         mpv: The python-mpv mpv instance
     """
@@ -46,9 +68,26 @@ class MpvControllable(PlayerBase):
                 "force_window": "immediate",
                 "title": "MPV - Receiving Links from anipy-cli",
                 "osc": True,
+                # Open and buffer the next queued title while the
+                # current one is playing
+                "prefetch_playlist": True,
+                "cache": True,
+                "demuxer_max_bytes": "150MiB",
+                "demuxer_max_back_bytes": "50MiB",
             }
 
-        self.mpv = MPV(**mpv_args)
+        with span("player.start", player=type(self).__name__):
+            self.mpv = MPV(**mpv_args)
+
+        # The queued titles by their url, and the url of the title that
+        # is playing
+        self._queue: Dict[
+            str, Tuple["Anime", "ProviderStream", Optional[PlayCallback]]
+        ] = {}
+        self._queue_order: List[str] = []
+        self._queue_lock = Lock()
+        self._playing: Optional[str] = None
+        self.mpv.observe_property("playlist-pos", self._on_playlist_pos)
 
     def play_title(self, anime: "Anime", stream: "ProviderStream"):
         self.mpv.force_media_title = self._get_media_title(anime, stream)
@@ -60,6 +99,103 @@ class MpvControllable(PlayerBase):
         self.mpv.sub = 1
         self._call_play_callback(anime, stream)
 
+    def queue_title(
+        self,
+        anime: "Anime",
+        stream: "ProviderStream",
+        on_play: Optional[PlayCallback] = None,
+    ) -> bool:
+        """Append a stream to the playlist of mpv, if nothing is playing
+        it starts right away. The play callback of the player (and
+        `on_play`) is called once mpv starts playing it.
+
+        Args:
+            anime: The anime
+            stream: The stream
+            on_play: Callback called when mpv starts playing this title
+
+        Returns:
+            False if mpv was closed
+        """
+        from mpv import ShutdownError
+
+        options = {
+            "force-media-title": self._get_media_title(anime, stream),
+            "referrer": stream.referrer or "",
+        }
+        subtitles = self._get_media_sub(stream)
+        if subtitles:
+            options["sub-files"] = os.pathsep.join(subtitles.values())
+
+        with self._queue_lock:
+            self._queue[stream.url] = (anime, stream, on_play)
+            self._queue_order.append(stream.url)
+
+        try:
+            self.mpv.loadfile(
+                stream.url,
+                "append-play",
+                # The values are length-prefixed, so titles can contain commas
+                **{k: f"%{len(v.encode())}%{v}" for k, v in options.items()},
+            )
+        except ShutdownError:
+            return False
+
+        return True
+
+    def wait_for_queue(self, max_pending: int = 0) -> bool:
+        """Wait until at most `max_pending` queued titles have not started
+        playing yet.
+
+        Args:
+            max_pending: The amount of titles that may still be waiting
+
+        Returns:
+            False if mpv was closed
+        """
+        from mpv import ShutdownError
+
+        def pending(pos: Optional[int]) -> int:
+            # The position is looked at directly, the observer that
+            # updates `_playing` may not have seen it yet
+            url = self._url_at(pos)
+            with self._queue_lock:
+                if url not in self._queue:
+                    url = self._playing
+                if url not in self._queue_order:
+                    return len(self._queue_order)
+                return len(self._queue_order) - self._queue_order.index(url) - 1
+
+        try:
+            self.mpv.wait_for_property(
+                "playlist-pos", lambda pos: pending(pos) <= max_pending
+            )
+        except ShutdownError:
+            return False
+
+        return True
+
+    def _url_at(self, pos: Optional[int]) -> Optional[str]:
+        if pos is None or pos < 0:
+            return None
+
+        try:
+            return self.mpv.playlist[pos]["filename"]
+        except (IndexError, KeyError, TypeError):
+            return None
+
+    def _on_playlist_pos(self, _: str, pos: Optional[int]):
+        url = self._url_at(pos)
+        with self._queue_lock:
+            if url is None or url == self._playing or url not in self._queue:
+                return
+            self._playing = url
+            anime, stream, on_play = self._queue[url]
+
+        self._call_play_callback(anime, stream)
+        if on_play is not None:
+            on_play(anime, stream)
+
     def play_file(self, path: str):
         self.mpv.play(path)
 
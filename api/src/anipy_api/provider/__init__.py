@@ -3,7 +3,10 @@ from anipy_api.provider.base import (BaseProvider, Episode, LanguageTypeEnum,
                                      ProviderStream)
 from anipy_api.provider.filter import (FilterCapabilities, Filters, MediaType,
                                        Season, Status)
-from anipy_api.provider.provider import get_provider, list_providers
+from anipy_api.provider.provider import (get_provider, list_providers,
+                                         search_providers)
+from anipy_api.provider.aio import (AsyncBaseProvider, AsyncProviderAdapter,
+                                    SyncProviderFacade, get_async_provider)
 
 __all__ = [
     "BaseProvider",
@@ -19,4 +22,9 @@ __all__ = [
     "Status",
     "list_providers",
     "get_provider",
+    "search_providers",
+    "AsyncBaseProvider",
+    "AsyncProviderAdapter",
+    "SyncProviderFacade",
+    "get_async_provider",
 ]
@@ -0,0 +1,362 @@
+import asyncio
+import copy
+import functools
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ThreadPoolExecutor
+from threading import Lock, Thread
+from typing import (TYPE_CHECKING, Any, Awaitable, Callable, List, Optional,
+                    TypeVar)
+from weakref import WeakKeyDictionary
+
+from anipy_api.provider.base import (BaseProvider, Episode, LanguageTypeEnum,
+                                     ProviderInfoResult, ProviderSearchResult,
+                                     ProviderStream)
+from anipy_api.provider.filter import FilterCapabilities, Filters
+from anipy_api.provider.provider import get_provider
+from requests import Session
+from requests.adapters import HTTPAdapter
+
+if TYPE_CHECKING:
+    from anipy_api.provider.base import InfoCallback
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_lock = Lock()
+
+
+def shared_executor() -> ThreadPoolExecutor:
+    """Get the executor that is shared by all
+    [AsyncProviderAdapter][anipy_api.provider.aio.AsyncProviderAdapter]s
+    that do not get their own executor.
+
+    Returns:
+        The shared executor
+    """
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=AsyncProviderAdapter.MAX_CONCURRENCY,
+                thread_name_prefix="anipy-provider",
+            )
+        return _executor
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """Run a coroutine to completion from synchronous code.
+
+    The coroutine runs in a event loop in a background thread,
+    which is shared by all callers, so this also works if the calling
+    thread already runs a event loop. Do not call this from a coroutine
+    that runs in that background loop, it would block forever.
+
+    Args:
+        coro: The coroutine to run
+
+    Returns:
+        The result of the coroutine
+    """
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            Thread(
+                target=_loop.run_forever, name="anipy-provider-loop", daemon=True
+            ).start()
+
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()  # type: ignore
+
+
+class AsyncBaseProvider(ABC):
+    """The asynchronous twin of the
+    [BaseProvider][anipy_api.provider.base.BaseProvider], it has the same
+    methods, but they are coroutines.
+
+    To use the existing providers through this interface wrap them in a
+    [AsyncProviderAdapter][anipy_api.provider.aio.AsyncProviderAdapter] or
+    use [get_async_provider][anipy_api.provider.aio.get_async_provider].
+
+    Attributes:
+        NAME: The name of the provider
+        BASE_URL: The base url of the provider
+        FILTER_CAPS: The filter capabilities of the provider
+    """
+
+    NAME: str
+    BASE_URL: str
+    FILTER_CAPS: FilterCapabilities
+
+    @abstractmethod
+    async def get_search(
+        self, query: str, filters: Filters = Filters()
+    ) -> List[ProviderSearchResult]:
+        """Search in the Provider.
+
+        Args:
+            query: The search query
+            filters: The filter object, check FILTER_CAPS
+                to see which filters this provider supports
+
+        Returns:
+            A list of search results
+        """
+        ...
+
+    @abstractmethod
+    async def get_info(self, identifier: str) -> ProviderInfoResult:
+        """Get detailed information about an anime.
+
+        Args:
+            identifier: The identifier of the anime
+
+        Returns:
+            A information object
+        """
+        ...
+
+    @abstractmethod
+    async def get_episodes(
+        self, identifier: str, lang: LanguageTypeEnum
+    ) -> List[Episode]:
+        """Get a list of episodes of an anime.
+
+        Args:
+            identifier: The identifier of the anime
+            lang: The language type used to look up the episode list
+
+        Returns:
+            A list of episodes
+
+        Raises:
+            LangTypeNotAvailableError: Raised when the language provided is
+                not available for the anime
+        """
+        ...
+
+    @abstractmethod
+    async def get_video(
+        self, identifier: str, episode: Episode, lang: LanguageTypeEnum
+    ) -> List[ProviderStream]:
+        """Get a list of video streams for a anime episode.
+
+        Args:
+            identifier: The identifier of the anime
+            episode: The episode to get the streams from
+            lang: The language type used to look up the streams
+
+        Returns:
+            A list of video streams
+
+        Raises:
+            LangTypeNotAvailableError: Raised when the language provided is
+                not available for the anime
+        """
+        ...
+
+    async def aclose(self):
+        """Release the resources (e.g. http connections) of the provider."""
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    def __str__(self) -> str:
+        return self.NAME
+
+
+class AsyncProviderAdapter(AsyncBaseProvider):
+    """Use a synchronous provider through the async interface.
+
+    The calls of the wrapped provider run in a thread pool, by default
+    one pool is shared by all adapters. They go to a copy of the provider
+    with its own session, whose connection pool fits `max_concurrency`
+    parallel requests, so concurrent lookups reuse connections instead of
+    opening a new one every time. The passed provider and its session are
+    not changed, the cookies and headers it had are copied.
+
+    The adapter can be used from several event loops (e.g. the loop of the
+    caller and the one of [run_sync][anipy_api.provider.aio.run_sync]),
+    `max_concurrency` applies per loop.
+
+    Attributes:
+        MAX_CONCURRENCY: Default for the maximum amount of parallel calls
+        provider: The copy of the wrapped provider, that the calls go to
+    """
+
+    MAX_CONCURRENCY = 64
+
+    def __init__(
+        self,
+        provider: BaseProvider,
+        executor: Optional[Executor] = None,
+        max_concurrency: int = MAX_CONCURRENCY,
+    ):
+        """__init__ of AsyncProviderAdapter
+
+        Args:
+            provider: The provider to wrap
+            executor: The executor the provider calls run in, defaults to
+                the [shared_executor][anipy_api.provider.aio.shared_executor]
+            max_concurrency: Maximum amount of parallel calls to the provider,
+                further calls wait until a earlier one finished
+        """
+        self.provider = copy.copy(provider)
+        self.provider._pool_maxsize = max_concurrency
+        self.provider.session = self._copy_session(provider.session, max_concurrency)
+        self.NAME = provider.NAME
+        self.BASE_URL = provider.BASE_URL
+        self.FILTER_CAPS = provider.FILTER_CAPS
+
+        self._executor = executor
+        self._max_concurrency = max_concurrency
+        # A semaphore can only be used in the loop it was first used in
+        self._semaphores: WeakKeyDictionary = WeakKeyDictionary()
+        self._semaphores_lock = Lock()
+
+    @staticmethod
+    def _copy_session(session: Session, pool_maxsize: int) -> Session:
+        new = Session()
+        new.headers.update(session.headers)
+        new.cookies.update(session.cookies)
+        new.auth = session.auth
+        new.proxies = dict(session.proxies)
+        new.verify = session.verify
+        new.cert = session.cert
+
+        adapter = HTTPAdapter(pool_maxsize=pool_maxsize)
+        new.mount("http://", adapter)
+        new.mount("https://", adapter)
+        return new
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._semaphores_lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self._max_concurrency)
+                self._semaphores[loop] = semaphore
+            return semaphore
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        async with self._semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor or shared_executor(), functools.partial(func, *args)
+            )
+
+    async def get_search(
+        self, query: str, filters: Filters = Filters()
+    ) -> List[ProviderSearchResult]:
+        return await self._run(self.provider.get_search, query, filters)
+
+    async def get_info(self, identifier: str) -> ProviderInfoResult:
+        return await self._run(self.provider.get_info, identifier)
+
+    async def get_episodes(
+        self, identifier: str, lang: LanguageTypeEnum
+    ) -> List[Episode]:
+        return await self._run(self.provider.get_episodes, identifier, lang)
+
+    async def get_video(
+        self, identifier: str, episode: Episode, lang: LanguageTypeEnum
+    ) -> List[ProviderStream]:
+        return await self._run(self.provider.get_video, identifier, episode, lang)
+
+    async def aclose(self):
+        self.provider.session.close()
+
+
+class SyncProviderFacade(BaseProvider):
+    """Use a async provider through the synchronous
+    [BaseProvider][anipy_api.provider.base.BaseProvider] interface, so
+    it can be passed to everything that expects a normal provider (e.g.
+    [Anime][anipy_api.anime.Anime]).
+
+    The coroutines run in a background event loop, see
+    [run_sync][anipy_api.provider.aio.run_sync].
+
+    Attributes:
+        async_provider: The wrapped async provider
+    """
+
+    NAME = ""
+    BASE_URL = ""
+    FILTER_CAPS = FilterCapabilities(0)
+
+    def __init__(
+        self,
+        async_provider: AsyncBaseProvider,
+        info_callback: Optional["InfoCallback"] = None,
+    ):
+        """__init__ of SyncProviderFacade
+
+        Args:
+            async_provider: The async provider to wrap
+            info_callback: A callback with a message argument, that gets called
+                on certain events.
+        """
+        super().__init__(info_callback=info_callback)
+        self.async_provider = async_provider
+        self.NAME = async_provider.NAME
+        self.BASE_URL = async_provider.BASE_URL
+        self.FILTER_CAPS = async_provider.FILTER_CAPS
+
+    def get_search(
+        self, query: str, filters: Filters = Filters()
+    ) -> List[ProviderSearchResult]:
+        return run_sync(self.async_provider.get_search(query, filters))
+
+    def get_info(self, identifier: str) -> ProviderInfoResult:
+        return run_sync(self.async_provider.get_info(identifier))
+
+    def get_episodes(self, identifier: str, lang: LanguageTypeEnum) -> List[Episode]:
+        return run_sync(self.async_provider.get_episodes(identifier, lang))
+
+    def get_video(
+        self, identifier: str, episode: Episode, lang: LanguageTypeEnum
+    ) -> List[ProviderStream]:
+        return run_sync(self.async_provider.get_video(identifier, episode, lang))
+
+
+def get_async_provider(
+    name: str,
+    base_url_override: Optional[str] = None,
+    info_callback: Optional["InfoCallback"] = None,
+    max_concurrency: int = AsyncProviderAdapter.MAX_CONCURRENCY,
+) -> Optional[AsyncBaseProvider]:
+    """Get a provider by name and wrap it in a
+    [AsyncProviderAdapter][anipy_api.provider.aio.AsyncProviderAdapter].
+
+    Arguments:
+        name: Name of the provider to get
+        base_url_override: Override the url used by the provider.
+        info_callback: A callback that gets called on certain provider events.
+        max_concurrency: Maximum amount of parallel calls to the provider
+
+    Returns:
+        The async provider by name, if it exsists
+
+    Example:
+        ```python
+        import asyncio
+        from anipy_api.provider.aio import get_async_provider
+
+        async def main():
+            async with get_async_provider("animehub") as provider:
+                results = await asyncio.gather(
+                    *(provider.get_search(q) for q in ["frieren", "mushishi"])
+                )
+
+        asyncio.run(main())
+        ```
+    """
+    provider = get_provider(name, base_url_override, info_callback)
+    if provider is None:
+        return None
+
+    return AsyncProviderAdapter(provider, max_concurrency=max_concurrency)
@@ -1,13 +1,17 @@
+import functools
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 import time
 from enum import Enum
 from typing import Dict, List, Optional, Protocol, Set, Union
 
+from anipy_api.provider.cache import ResponseCache, current_endpoint
 from anipy_api.provider.filter import FilterCapabilities, Filters, Status
 from anipy_api.provider.utils import request_page
+from anipy_api.tracing import span
 from requests import ConnectionError as RequestConnectionError
 from requests import Request, Session
+from requests.adapters import HTTPAdapter
 
 Episode = Union[int, float]
 """Episode type, float or integer."""
@@ -134,11 +138,16 @@ class BaseProvider(ABC):
         NAME: The name of the provider
         BASE_URL: The base url of the provider
         FILTER_CAPS: The filter capabilities of the provider
+        response_cache: A [ResponseCache][anipy_api.provider.cache.ResponseCache]
+            for the requests of the providers, set it on this class to
+            cache the requests of all providers or on a single provider.
+            `None` disables caching.
     """
 
     NAME: str
     BASE_URL: str
     FILTER_CAPS: FilterCapabilities
+    response_cache: Optional[ResponseCache] = None
 
     def __init__(
         self,
@@ -158,6 +167,7 @@ class BaseProvider(ABC):
         self._info_callback: InfoCallback = info_callback or (
             lambda message, exc_info=None: None
         )
+        self._pool_maxsize: Optional[int] = None
         self._generate_new_session()
 
     def __init_subclass__(cls) -> None:
@@ -169,6 +179,32 @@ class BaseProvider(ABC):
                     )
                 )
 
+        # Remember which method is running, so the response cache
+        # can use the ttl of that method, and trace it
+        for name in ["get_search", "get_info", "get_episodes", "get_video"]:
+            if name in cls.__dict__:
+                setattr(cls, name, cls._track_endpoint(name, cls.__dict__[name]))
+
+    @staticmethod
+    def _track_endpoint(name, func):
+        argument = "query" if name == "get_search" else "identifier"
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            token = current_endpoint.set(name)
+            try:
+                with span(f"provider.{name}", provider=self.NAME) as s:
+                    if args:
+                        s.set_attribute(argument, args[0])
+                    result = func(self, *args, **kwargs)
+                    if isinstance(result, list):
+                        s.set_attribute("results", len(result))
+                    return result
+            finally:
+                current_endpoint.reset(token)
+
+        return wrapper
+
     def _generate_new_session(self):
         """Close the last session, and create a new one.
 
@@ -178,9 +214,35 @@ class BaseProvider(ABC):
         if hasattr(self, "session"):
             self.session.close()
         self.session = Session()
+        if self._pool_maxsize is not None:
+            adapter = HTTPAdapter(pool_maxsize=self._pool_maxsize)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
         return self.session
 
     def _request_page(self, req: Request):
+        """Prepare a request and send it, or get its response from the
+        `response_cache` if there is one.
+
+        Args:
+            req: The request
+
+        Returns:
+            out: Response of the request
+        """
+        with span(
+            "provider.request", provider=self.NAME, method=req.method, url=req.url
+        ) as s:
+            if self.response_cache is None:
+                res = self._send_request(req)
+            else:
+                res = self.response_cache.request(
+                    req.prepare(), functools.partial(self._send_request, req)
+                )
+            s.set_attribute("status", res.status_code)
+            return res
+
+    def _send_request(self, req: Request):
         """Prepare a request and send it, but create a new session if self.session is broken
 
         Args:
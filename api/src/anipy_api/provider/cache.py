@@ -0,0 +1,451 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from threading import Lock, Thread
+from typing import (TYPE_CHECKING, Any, Callable, Dict, Iterator, Optional, Set,
+                    Tuple)
+
+from anipy_api.provider.utils import request_page
+from anipy_api.tracing import current_span, span
+from requests import Request, RequestException, Response, Session
+from requests.structures import CaseInsensitiveDict
+
+if TYPE_CHECKING:
+    from anipy_api.provider.base import InfoCallback
+    from requests import PreparedRequest
+
+current_endpoint: ContextVar[Optional[str]] = ContextVar(
+    "current_endpoint", default=None
+)
+"""The provider method (e.g. `get_info`) that is currently running, it is
+set by the [BaseProvider][anipy_api.provider.base.BaseProvider] and used to
+look up the ttl of a cached response."""
+
+_bypass: ContextVar[bool] = ContextVar("bypass_cache", default=False)
+
+
+@contextmanager
+def bypass_cache() -> Iterator[None]:
+    """Send the provider requests of this block to the network, even if
+    the [ResponseCache][anipy_api.provider.cache.ResponseCache] has fresh
+    responses for them. The new responses are stored in the cache.
+
+    Example:
+        ```python
+        from anipy_api.provider.cache import bypass_cache
+
+        with bypass_cache():
+            episodes = provider.get_episodes(identifier, lang)
+        ```
+    """
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def is_cache_bypassed() -> bool:
+    """Check if the current code runs in a
+    [bypass_cache][anipy_api.provider.cache.bypass_cache] block.
+
+    Returns:
+        Whether caches should be bypassed
+    """
+    return _bypass.get()
+
+
+class ResponseCache:
+    """A persistent cache of http responses, backed by a SQLite database.
+
+    Set it as the `response_cache` of the
+    [BaseProvider][anipy_api.provider.base.BaseProvider] (or of a single
+    provider) to cache the requests the providers send. How long a response
+    is fresh depends on the provider method that sent it, the ttls can be
+    changed per method. A response that is no longer fresh, but younger than
+    its ttl plus `stale_ttl`, is still returned immediately and refreshed in
+    the background (stale-while-revalidate), except for the methods in
+    `NEVER_STALE`. Requests in a
+    [bypass_cache][anipy_api.provider.cache.bypass_cache] block always go
+    to the network.
+
+    Several processes can share the database. If it can not be read or
+    written (e.g. it stays locked longer than `BUSY_TIMEOUT`), the error is
+    passed to the info callback and the request goes to the network.
+
+    Cached responses are rebuilt from their stored content, they have no
+    `raw` stream. Streamed responses (`stream=True`) are not cached.
+
+    Example:
+        ```python
+        from pathlib import Path
+        from anipy_api.provider import BaseProvider
+        from anipy_api.provider.cache import ResponseCache
+
+        BaseProvider.response_cache = ResponseCache(Path("~/.cache/anipy.db").expanduser())
+        ```
+
+    Attributes:
+        DEFAULT_TTLS: The default ttls in seconds, per provider method
+        NEVER_STALE: Provider methods whose expired responses are never
+            served, e.g. episode lists, which would hide new episodes
+        ttls: The ttls used by this cache
+        stale_ttl: How many seconds a response may be served after it expired
+        BUSY_TIMEOUT: Seconds to wait for a database that another process
+            has locked
+    """
+
+    DEFAULT_TTLS: Dict[str, float] = {
+        "get_search": 60 * 60,
+        "get_info": 7 * 24 * 60 * 60,
+        "get_episodes": 60 * 60,
+        "get_video": 0,
+    }
+    NEVER_STALE: Set[str] = {"get_episodes"}
+    BUSY_TIMEOUT: float = 5
+
+    def __init__(
+        self,
+        path: Path,
+        ttls: Optional[Dict[str, float]] = None,
+        stale_ttl: float = 24 * 60 * 60,
+        info_callback: Optional["InfoCallback"] = None,
+    ):
+        """__init__ of ResponseCache
+
+        Args:
+            path: Path of the database file, it is created if it does not exist
+            ttls: Ttls in seconds per provider method, these override the
+                `DEFAULT_TTLS`. Requests of methods without ttl are not cached.
+            stale_ttl: How many seconds a expired response may still be
+                served while it gets refreshed in the background
+            info_callback: A callback with a message argument, that gets
+                called if the database can not be used
+        """
+        self.ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+        self.stale_ttl = stale_ttl
+        self._info_callback: "InfoCallback" = info_callback or (
+            lambda message, exc_info=None: None
+        )
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(
+            path, timeout=self.BUSY_TIMEOUT, check_same_thread=False
+        )
+        # Readers do not block the writer of another process in WAL mode
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, stored_at REAL, status INTEGER, "
+            "url TEXT, headers TEXT, encoding TEXT, content BLOB)"
+        )
+        self._db.commit()
+        self._lock = Lock()
+        self._refreshing: Set[str] = set()
+
+    def request(
+        self,
+        prepped: "PreparedRequest",
+        send: Callable[[], Response],
+        endpoint: Optional[str] = None,
+    ) -> Response:
+        """Get the response of a request from the cache, or send it.
+
+        Args:
+            prepped: The request, it is only used to build the cache key
+            send: A function that sends the request
+            endpoint: The provider method that sends the request,
+                defaults to the current one
+
+        Returns:
+            The response, from the cache or from the network
+        """
+        endpoint = endpoint or current_endpoint.get() or ""
+        ttl = self.ttls.get(endpoint, 0)
+        if ttl <= 0:
+            return send()
+
+        key = self._key(prepped)
+        cached = None if is_cache_bypassed() else self._get(key)
+        if cached is not None:
+            age, response = cached
+            if age <= ttl:
+                current_span().set_attribute("cache", "hit")
+                return response
+            if endpoint not in self.NEVER_STALE and age <= ttl + self.stale_ttl:
+                current_span().set_attribute("cache", "stale")
+                self._revalidate(key, send)
+                return response
+
+        current_span().set_attribute(
+            "cache", "bypass" if is_cache_bypassed() else "miss"
+        )
+        response = send()
+        self._set(key, response)
+        return response
+
+    def clear(self):
+        """Delete all cached responses."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses")
+
+    def _revalidate(self, key: str, send: Callable[[], Response]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._set(key, send())
+            except Exception:
+                # The stale response was already served, the next request
+                # simply tries again
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        # A daemon thread, a refresh must not hold up the exit
+        Thread(target=refresh, name="anipy-cache", daemon=True).start()
+
+    @staticmethod
+    def _key(prepped: "PreparedRequest") -> str:
+        body = prepped.body or b""
+        if isinstance(body, str):
+            body = body.encode()
+
+        digest = hashlib.sha256(f"{prepped.method} {prepped.url}\n".encode())
+        digest.update(body)
+        return digest.hexdigest()
+
+    def _get(self, key: str) -> Optional[Tuple[float, Response]]:
+        try:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT stored_at, status, url, headers, encoding, content "
+                    "FROM responses WHERE key = ?",
+                    (key,),
+                ).fetchone()
+        except sqlite3.Error as e:
+            self._info_callback("Could not read the response cache", e)
+            return None
+
+        if row is None:
+            return None
+
+        stored_at, status, url, headers, encoding, content = row
+        response = Response()
+        response.status_code = status
+        response.url = url
+        response.headers = CaseInsensitiveDict(json.loads(headers))
+        response.encoding = encoding
+        response._content = content
+        response.reason = "OK"
+
+        return time.time() - stored_at, response
+
+    def _set(self, key: str, response: Response):
+        # Reading the content of a streamed response would consume it
+        if not response.ok or not response._content_consumed:
+            return
+
+        try:
+            with self._lock, self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        time.time(),
+                        response.status_code,
+                        response.url,
+                        json.dumps(dict(response.headers)),
+                        response.encoding,
+                        response.content,
+                    ),
+                )
+        except sqlite3.Error as e:
+            self._info_callback("Could not write the response cache", e)
+
+
+class RemoteArtifact:
+    """A json file that providers need to build their requests (e.g. the
+    key of allanime), which is published on a url and changes every now
+    and then.
+
+    The last fetched version is stored in `directory` with its ETag and
+    Last-Modified headers. If there is a stored version, it is used at
+    once and revalidated with a conditional request in a background
+    thread, so only the first run ever waits for the network. A provider
+    that finds the stored version no longer works (e.g. a decryption
+    fails) calls [refresh][anipy_api.provider.cache.RemoteArtifact.refresh].
+
+    Example:
+        ```python
+        from pathlib import Path
+        from anipy_api.provider.cache import RemoteArtifact
+
+        RemoteArtifact.directory = Path("~/.cache/anipy/artifacts").expanduser()
+        ```
+
+    Attributes:
+        directory: Where the artifacts are stored, set it on this class to
+            store the artifacts of all providers. `None` keeps them in memory,
+            so they are fetched once per process.
+        FORMAT_VERSION: Version of the stored files, files of other versions
+            are ignored
+    """
+
+    directory: Optional[Path] = None
+    FORMAT_VERSION: int = 1
+
+    def __init__(self, name: str, url: str):
+        """__init__ of RemoteArtifact
+
+        Args:
+            name: Name of the artifact, it is used as file name
+            url: Url of the json file
+        """
+        self.name = name
+        self.url = url
+        self._data: Optional[Dict[str, Any]] = None
+        self._revalidating = False
+        self._lock = Lock()
+
+    @property
+    def path(self) -> Optional[Path]:
+        """The file the artifact is stored in, if there is a `directory`."""
+        if self.directory is None:
+            return None
+        return self.directory / f"{self.name}.json"
+
+    def get(self) -> Any:
+        """Get the content of the artifact.
+
+        Returns:
+            The parsed json, the stored version if there is one
+        """
+        with self._lock:
+            if self._data is None:
+                self._data = self._load()
+                if self._data is not None:
+                    self._revalidate()
+
+            if self._data is not None:
+                return self._data["content"]
+
+        return self.refresh()
+
+    def refresh(self) -> Any:
+        """Revalidate the artifact now, use this when the content does not
+        work anymore.
+
+        Returns:
+            The parsed json, as the server has it now
+        """
+        data = self._fetch(self._data)
+        with self._lock:
+            self._data = data
+        return data["content"]
+
+    def try_refresh(self, info_callback: Optional["InfoCallback"] = None) -> bool:
+        """Like [refresh][anipy_api.provider.cache.RemoteArtifact.refresh],
+        but errors are passed to the info callback instead of being raised.
+        Use this when the content failed, to decide if trying again can help.
+
+        Args:
+            info_callback: Gets the error if the refresh fails
+
+        Returns:
+            If the refresh worked
+        """
+        try:
+            self.refresh()
+            return True
+        except (RequestException, OSError, ValueError) as e:
+            if info_callback is not None:
+                info_callback(f"Could not refresh the {self.name} artifact", e)
+            return False
+
+    def clear(self):
+        """Forget the artifact, it is fetched again on the next use."""
+        with self._lock:
+            self._data = None
+            if self.path is not None:
+                self.path.unlink(missing_ok=True)
+
+    def _revalidate(self):
+        if self._revalidating:
+            return
+        self._revalidating = True
+
+        def revalidate():
+            try:
+                data = self._fetch(self._data)
+                with self._lock:
+                    self._data = data
+            except Exception:
+                # The stored version is still used, if it does not
+                # work the provider refreshes it
+                pass
+            finally:
+                self._revalidating = False
+
+        Thread(target=revalidate, name="anipy-artifact", daemon=True).start()
+
+    def _fetch(self, stored: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        headers = {}
+        if stored is not None:
+            if stored.get("etag"):
+                headers["If-None-Match"] = stored["etag"]
+            if stored.get("last_modified"):
+                headers["If-Modified-Since"] = stored["last_modified"]
+
+        with span("provider.artifact", artifact=self.name, url=self.url) as s:
+            with Session() as session:
+                res = request_page(session, Request("GET", self.url, headers=headers))
+            s.set_attribute("status", res.status_code)
+
+        if res.status_code == 304 and stored is not None:
+            data = {**stored, "fetched_at": time.time()}
+        else:
+            data = {
+                "format": self.FORMAT_VERSION,
+                "url": self.url,
+                "etag": res.headers.get("ETag"),
+                "last_modified": res.headers.get("Last-Modified"),
+                "fetched_at": time.time(),
+                "content": json.loads(res.text),
+            }
+
+        self._store(data)
+        return data
+
+    def _load(self) -> Optional[Dict[str, Any]]:
+        if self.path is None:
+            return None
+
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return None
+
+        if data.get("format") != self.FORMAT_VERSION or data.get("url") != self.url:
+            return None
+        return data
+
+    def _store(self, data: Dict[str, Any]):
+        if self.path is None:
+            return
+
+        # Write to a temporary file first, so other processes never
+        # read a half written artifact
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data))
+        tmp.replace(self.path)
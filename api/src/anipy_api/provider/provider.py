@@ -1,11 +1,15 @@
-from typing import TYPE_CHECKING, Iterator, Optional, Type
+import time
+from queue import Empty, Queue
+from threading import Thread
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple, Type
 
+from anipy_api.provider.filter import Filters
 from anipy_api.provider.providers import *
 from anipy_api.provider.providers import __all__
 
 if TYPE_CHECKING:
     from anipy_api.provider import BaseProvider
-    from anipy_api.provider.base import InfoCallback
+    from anipy_api.provider.base import InfoCallback, ProviderSearchResult
 
 
 def list_providers() -> Iterator[Type["BaseProvider"]]:
@@ -56,3 +60,76 @@ def get_provider(
     for p in list_providers():
         if p.NAME == name:
             return p(base_url_override, info_callback)
+
+
+def search_providers(
+    providers: Iterable["BaseProvider"],
+    query: str,
+    filters: Filters = Filters(),
+    timeout: Optional[float] = 10,
+    error_callback: Optional["InfoCallback"] = None,
+) -> Iterator[Tuple["BaseProvider", List["ProviderSearchResult"]]]:
+    """Search in several providers at the same time.
+
+    The results of a provider are yielded as soon as it answered, so
+    the first results arrive before the slowest provider finished.
+    Providers that fail or do not answer within the timeout are skipped.
+
+    Args:
+        providers: The providers to search in
+        query: The search query
+        filters: The filter object, filters a provider does not support
+            are skipped for that provider
+        timeout: Seconds to wait for the providers, `None` waits forever
+        error_callback: Gets called with a message and the exception
+            for every provider that failed or timed out
+
+    Yields:
+        Tuples of the provider and its search results, in the order the
+            providers answered
+
+    Example:
+        ```python
+        from anipy_api.provider import list_providers, search_providers
+
+        providers = [p() for p in list_providers()]
+        for provider, results in search_providers(providers, "frieren"):
+            print(provider.NAME, results)
+        ```
+    """
+    providers = list(providers)
+    error_callback = error_callback or (lambda message, exc_info=None: None)
+
+    # The searches run in daemon threads, so a provider that never
+    # answers does not keep the program alive after the timeout
+    answers: Queue = Queue()
+
+    def search(provider: "BaseProvider"):
+        try:
+            answers.put((provider, provider.get_search(query, filters), None))
+        except Exception as e:
+            answers.put((provider, None, e))
+
+    for p in providers:
+        Thread(target=search, args=(p,), name="anipy-search", daemon=True).start()
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    pending = set(providers)
+    while pending:
+        try:
+            remaining = (
+                None if deadline is None else max(deadline - time.monotonic(), 0)
+            )
+            provider, results, exc = answers.get(timeout=remaining)
+        except Empty:
+            for provider in pending:
+                error_callback(
+                    f"Searching in {provider.NAME} timed out after {timeout} seconds"
+                )
+            return
+
+        pending.discard(provider)
+        if exc is not None:
+            error_callback(f"Searching in {provider.NAME} failed: {exc}", exc)
+        else:
+            yield provider, results or []
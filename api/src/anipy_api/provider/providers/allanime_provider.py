@@ -1,11 +1,10 @@
 import base64
-import functools
 import hashlib
 import json
 import re
 import time
 from copy import deepcopy
-from typing import TYPE_CHECKING, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 from urllib.parse import urljoin
 
 import Levenshtein
@@ -13,11 +12,13 @@ import m3u8
 from anipy_api.provider import (BaseProvider, Episode, ProviderInfoResult,
                                 ProviderSearchResult, ProviderStream)
 from anipy_api.provider.base import ExternalSub, InfoCallback, LanguageTypeEnum
+from anipy_api.provider.cache import RemoteArtifact
 from anipy_api.provider.filter import (BaseFilter, FilterCapabilities, Filters,
                                        MediaType, Season, Status)
 from anipy_api.provider.utils import get_language_name, parsenum, request_page
+from anipy_api.tracing import traced
 from Cryptodome.Cipher import AES
-from requests import Request, Session
+from requests import Request
 from requests.exceptions import HTTPError
 
 if TYPE_CHECKING:
@@ -27,16 +28,17 @@ KEYGEN_URL: str = (
     "https://raw.githubusercontent.com/sdaqo/anipy-cli/refs/heads/key-gen/scripts/keygen/keygen.json"
 )
 
-@functools.lru_cache()
-def fetch_keygen(session: Session):
-    req = Request("GET", KEYGEN_URL)
-    res = request_page(session, req)
-    return json.loads(res.text)
+KEYGEN = RemoteArtifact("allanime-keygen", KEYGEN_URL)
 
 
+def fetch_keygen():
+    return KEYGEN.get()
 
-def build_source_request(session: Session) -> Tuple[str, str, str, str]:
-    keygen = fetch_keygen(session)
+
+
+@traced("allanime.build_source_request")
+def build_source_request() -> Tuple[str, str, str, str]:
+    keygen = fetch_keygen()
 
     ts = int(time.time() * 1000) // 300000 * 300000
     payload = {
@@ -58,8 +60,9 @@ def build_source_request(session: Session) -> Tuple[str, str, str, str]:
     return keygen["query_hash"], token, keygen["lane"], keygen["build_id"]
 
 
-def decode_tobeparsed(session: Session, tbp: str):
-    keygen = fetch_keygen(session)
+@traced("allanime.decode_tobeparsed")
+def decode_tobeparsed(tbp: str):
+    keygen = fetch_keygen()
 
     raw = base64.b64decode(tbp)
     iv, ciphertext, tag = raw[1:13], raw[13:-16], raw[-16:]
@@ -288,51 +291,16 @@ class AllAnimeProvider(BaseProvider):
         self, identifier: str, episode: Episode, lang: LanguageTypeEnum
     ) -> List[ProviderStream]:
         tt = "dub" if lang == LanguageTypeEnum.DUB else "sub"
-        query_hash, aareq, lane, build_id = build_source_request(self.session)
-        # The source query has to go through as a GET request with the aaReq
-        # token in the query string, otherwise the api returns AA_CRYPTO_MISSING.
-        req = Request(
-            "GET",
-            self.API_URL,
-            params={
-                "variables": json.dumps(
-                    {
-                        "showId": identifier,
-                        "translationType": tt,
-                        "episodeString": str(episode),
-                    }
-                ),
-                "extensions": json.dumps(
-                    {
-                        "persistedQuery": {
-                            "version": 1,
-                            "sha256Hash": query_hash,
-                        },
-                        "aaReq": aareq,
-                        "k": lane
-                    }
-                ),
-            },
-            headers={
-                "Referer": "https://mkissa.to",
-                "Origin": "https://mkissa.to",
-                "x-build-id": build_id,
-            },
-        )
-        result = self._request_page(req).json()
         providers = ["Yt-mp4", "S-Mp4", "Uv-mp4", "Luf-Mp4", "Ak", "Default", "Mp4"]
         streams = []
 
-        data = result.get("data") or {}
-        if "tobeparsed" in data:
-            try:
-                data = decode_tobeparsed(self.session, data["tobeparsed"])
-            except ValueError:
-                # Crypto rotated between the aaReq and the response, drop the cache so the next attempt refetches, and return no streams instead of crashing.
-                fetch_keygen.cache_clear()
-                return streams
+        data = self._get_sources(identifier, episode, tt)
+        if data is None and KEYGEN.try_refresh(self._info_callback):
+            # The stored keygen is outdated or the crypto rotated between the
+            # aaReq and the response, try once more with the new keygen
+            data = self._get_sources(identifier, episode, tt)
 
-        if not data.get("episode"):
+        if data is None:
             return streams
 
         for provider in data["episode"]["sourceUrls"]:
@@ -457,6 +425,60 @@ class AllAnimeProvider(BaseProvider):
                     )
         return streams
 
+    def _get_sources(
+        self, identifier: str, episode: Episode, tt: str
+    ) -> Optional[Dict[str, Any]]:
+        """Request the sources of an episode with a token of the keygen.
+
+        Returns:
+            The decoded source data, `None` if the api rejected the token
+                or the response could not be decoded with the keygen
+        """
+        query_hash, aareq, lane, build_id = build_source_request()
+        # The source query has to go through as a GET request with the aaReq
+        # token in the query string, otherwise the api returns AA_CRYPTO_MISSING.
+        req = Request(
+            "GET",
+            self.API_URL,
+            params={
+                "variables": json.dumps(
+                    {
+                        "showId": identifier,
+                        "translationType": tt,
+                        "episodeString": str(episode),
+                    }
+                ),
+                "extensions": json.dumps(
+                    {
+                        "persistedQuery": {
+                            "version": 1,
+                            "sha256Hash": query_hash,
+                        },
+                        "aaReq": aareq,
+                        "k": lane,
+                    }
+                ),
+            },
+            headers={
+                "Referer": "https://mkissa.to",
+                "Origin": "https://mkissa.to",
+                "x-build-id": build_id,
+            },
+        )
+        result = self._request_page(req).json()
+
+        data = result.get("data") or {}
+        if "tobeparsed" in data:
+            try:
+                data = decode_tobeparsed(data["tobeparsed"])
+            except ValueError:
+                return None
+
+        if not data.get("episode"):
+            return None
+
+        return data
+
     @staticmethod
     def _decrypt(provider_id: str) -> str:
         decrypted = ""
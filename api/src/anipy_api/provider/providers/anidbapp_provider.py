@@ -9,13 +9,11 @@ from anipy_api.provider import (BaseProvider, Episode, ProviderInfoResult,
 from anipy_api.provider.base import LanguageTypeEnum
 from anipy_api.provider.filter import (BaseFilter, FilterCapabilities, Filters,
                                        MediaType, Season, Status)
-from anipy_api.provider.utils import parsenum
+from anipy_api.provider.utils import only_classes, parse_html, parsenum
 from anipy_api.provider import Episode
 from anipy_api.error import LangTypeNotAvailableError
 
 
-from bs4 import BeautifulSoup
-
 from requests import Request
 
 HLS_RE = re.compile(
@@ -73,7 +71,8 @@ class AniDBAppProvider(BaseProvider):
         req = AniDBAppFilter(req).apply(query, filters)
         res = self._request_page(req)
 
-        current_page = BeautifulSoup(res.text, "html.parser")
+        results_only = only_classes("text-muted", "anime-grid")
+        current_page = parse_html(res.text, results_only)
         pages = current_page.find("span", attrs={"class": "text-sm text-muted"})
         if pages:
             pages = parsenum(pages.findChildren()[-1].text)
@@ -100,7 +99,7 @@ class AniDBAppProvider(BaseProvider):
 
             req.params["page"] = p
             res = self._request_page(req)
-            current_page = BeautifulSoup(res.text, "html.parser")
+            current_page = parse_html(res.text, results_only)
 
         results.sort(
             key=lambda x: Levenshtein.ratio(query, x.name, processor=str.lower),
@@ -116,7 +115,7 @@ class AniDBAppProvider(BaseProvider):
         )
         res = self._request_page(req)
 
-        soup = BeautifulSoup(res.text, "html.parser")
+        soup = parse_html(res.text)
 
         name = soup.find("h1", attrs={"class": "leading-tight"})
         if name:
@@ -12,11 +12,12 @@ from anipy_api.provider import (BaseProvider, Episode, ProviderInfoResult,
 from anipy_api.provider.base import LanguageTypeEnum
 from anipy_api.provider.filter import (BaseFilter, FilterCapabilities, Filters,
                                        MediaType, Season, Status)
-from anipy_api.provider.utils import parsenum, request_page 
+from anipy_api.provider.utils import (only_classes, parse_html, parsenum,
+                                      request_page)
 from anipy_api.provider import Episode
 
 
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 
 from requests import Request
 
@@ -53,7 +54,7 @@ class AnimeHubProvider(BaseProvider):
     BASE_URL: str = "https://123animehub.cc"
     FILTER_CAPS: FilterCapabilities = FilterCapabilities.NO_QUERY
 
-    def _request_page(self, req: Request):
+    def _send_request(self, req: Request):
         res = request_page(self.session, req, False)
         
         for _ in range(5):
@@ -75,7 +76,8 @@ class AnimeHubProvider(BaseProvider):
         req = AnimeHubFilter(req).apply(query, filters)
         res = self._request_page(req)
 
-        current_page = BeautifulSoup(res.text, "html.parser")
+        results_only = only_classes("total", "film-list")
+        current_page = parse_html(res.text, results_only)
         pages = current_page.find("span", attrs={"class": "total"})
         if pages:
             pages = parsenum(pages.text)
@@ -121,7 +123,7 @@ class AnimeHubProvider(BaseProvider):
 
             req.params["page"] = p
             res = self._request_page(req)
-            current_page = BeautifulSoup(res.text, "html.parser")
+            current_page = parse_html(res.text, results_only)
 
         result_list = list(results.values())
         result_list.sort(
@@ -138,7 +140,7 @@ class AnimeHubProvider(BaseProvider):
         )
         res = self._request_page(req)
 
-        soup = BeautifulSoup(res.text, "html.parser")
+        soup = parse_html(res.text, only_classes("title", "anxmnx", "desc"))
 
         name = soup.find("h2", attrs={"class": "title"})
         if name:
@@ -192,7 +194,7 @@ class AnimeHubProvider(BaseProvider):
         )
         res = self._request_page(req)
 
-        soup = BeautifulSoup(res.json()["html"], "html.parser")
+        soup = parse_html(res.json()["html"], only_classes("episodes"))
         ep_elements = soup.find("ul", attrs={"class": "episodes"}).findAll("li")
 
         return [parsenum(el.a["data-id"].split("/")[-1]) for el in ep_elements]
@@ -223,7 +225,7 @@ class AnimeHubProvider(BaseProvider):
         )
         res = self._request_page(req)
 
-        soup = BeautifulSoup(res.text, "html.parser")
+        soup = parse_html(res.text, SoupStrainer(id="sources"))
         sources = json.loads(soup.find("div", attrs={"id": "sources"}).text)["sources"]
 
         req = Request("GET", sources, headers={"Referer": target_base})
@@ -1,9 +1,14 @@
+import ast
 import base64
 import functools
 import json
 import re
 import urllib.parse
-from typing import TYPE_CHECKING, List
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass
+from typing import (TYPE_CHECKING, Any, Callable, Dict, Iterator, List,
+                    Optional, Tuple, TypeVar)
 from urllib.parse import urljoin
 
 import m3u8
@@ -13,43 +18,149 @@ from anipy_api.provider import (BaseProvider, LanguageTypeEnum,
                                 ProviderInfoResult, ProviderSearchResult,
                                 ProviderStream)
 from anipy_api.provider.base import ExternalSub
+from anipy_api.provider.cache import (RemoteArtifact, current_endpoint,
+                                      is_cache_bypassed)
 from anipy_api.provider.filter import (BaseFilter, FilterCapabilities, Filters,
                                        MediaType, Season, Status)
-from anipy_api.provider.utils import (get_language_code2, parsenum,
-                                      request_page, safe_attr)
-from bs4 import BeautifulSoup
+from anipy_api.provider.utils import (TTLCache, get_language_code2,
+                                      only_classes, parse_html, parsenum,
+                                      safe_attr)
+from bs4 import BeautifulSoup, SoupStrainer
 from Cryptodome.Cipher import ARC4
-from requests import HTTPError, Request, Session
-from simpleeval import simple_eval
+from requests import HTTPError, Request
+from simpleeval import DEFAULT_OPERATORS, simple_eval
 
 if TYPE_CHECKING:
     from anipy_api.provider import Episode
-    from requests import Session
+    from anipy_api.provider.base import InfoCallback
 
 DECODE_URL: str = (
     "https://raw.githubusercontent.com/sdaqo/anipy-cli/refs/heads/key-gen/scripts/decoder/generated/kai.json"
 )
 AnimekaiDecodeFunc = None
 
+_T = TypeVar("_T")
+
+
+DECODE = RemoteArtifact("animekai-decode", DECODE_URL)
+
 
-@functools.lru_cache()
 def fetch_decode():
-    req = Request("GET", DECODE_URL)
-    res = request_page(Session(), req)
-    return json.loads(res.text)
-
-
-def safe_eval(exp: str, n: str):
-    allowed_funcs = {
-        "transform": transform,
-        "base64_url_encode": base64_url_encode,
-        "base64_url_decode": base64_url_decode,
-        "reverse_it": reverse_it,
-        "substitute": substitute,
-        "strict_decode": strict_decode,
-        "strict_encode": strict_encode,
+    return DECODE.get()
+
+
+def fetch_decoders() -> Dict[str, Callable[[Any], Any]]:
+    """Get the expressions of `fetch_decode`, compiled with `compile_expression`.
+
+    Returns:
+        The compiled expressions by name
+    """
+    return {
+        name: compile_expression(exp)
+        for name, exp in fetch_decode().items()
+        if isinstance(exp, str)
     }
-    return simple_eval(exp, names={"n": n}, functions=allowed_funcs)
+
+
+def safe_eval(exp: str, n: Any):
+    return compile_expression(exp)(n)
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_expression(exp: str) -> Callable[[Any], Any]:
+    """Compile a decoder expression into a function of `n`.
+
+    The expression is validated like simpleeval would: only `n`,
+    constants, arithmetic operators and calls of the decoder functions
+    are allowed, and the operators simpleeval guards against huge results
+    still go through its guards. Expressions that use anything else
+    are evaluated with simpleeval instead.
+
+    Args:
+        exp: The expression, e.g. `base64_url_encode(reverse_it(n))`
+
+    Returns:
+        A function that evaluates the expression for a value of `n`
+    """
+    try:
+        tree = ast.parse(exp, mode="eval")
+        _validate_expression(tree)
+    except (SyntaxError, ValueError):
+        return functools.partial(_simple_eval, exp)
+
+    body = _GuardOperators().visit(tree.body)
+    args = ast.arguments(
+        posonlyargs=[],
+        args=[ast.arg(arg="n")],
+        kwonlyargs=[],
+        kw_defaults=[],
+        defaults=[],
+    )
+    func = ast.fix_missing_locations(ast.Expression(ast.Lambda(args, body)))
+    scope = {"__builtins__": {}, **_FUNCTIONS, **_GUARDS}
+    return eval(compile(func, "<kai.json>", "eval"), scope)
+
+
+def _simple_eval(exp: str, n: Any):
+    return simple_eval(exp, names={"n": n}, functions=_FUNCTIONS)
+
+
+_NODES = (
+    ast.Expression,
+    ast.Call,
+    ast.Name,
+    ast.Load,
+    ast.Constant,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.FloorDiv,
+    ast.Mod,
+    ast.Pow,
+    ast.LShift,
+    ast.RShift,
+    ast.BitOr,
+    ast.BitXor,
+    ast.BitAnd,
+    ast.USub,
+    ast.UAdd,
+    ast.Invert,
+)
+
+_GUARDS = {
+    f"_{op.__name__.lower()}": DEFAULT_OPERATORS[op]
+    for op in (ast.Add, ast.Mult, ast.Pow, ast.LShift, ast.RShift)
+}
+
+
+def _validate_expression(tree: ast.AST):
+    for node in ast.walk(tree):
+        if not isinstance(node, _NODES):
+            raise ValueError(f"{type(node).__name__} is not allowed")
+        if isinstance(node, ast.Name) and node.id != "n" and node.id not in _FUNCTIONS:
+            raise ValueError(f"Name {node.id} is not allowed")
+        if isinstance(node, ast.Call) and not (
+            isinstance(node.func, ast.Name) and node.func.id in _FUNCTIONS
+        ):
+            raise ValueError("Only the decoder functions can be called")
+        if isinstance(node, ast.Constant) and type(node.value) not in (str, int, float):
+            raise ValueError(f"Constant {node.value!r} is not allowed")
+
+
+class _GuardOperators(ast.NodeTransformer):
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.generic_visit(node)
+        guard = f"_{type(node.op).__name__.lower()}"
+        if guard not in _GUARDS:
+            return node
+        return ast.Call(
+            func=ast.Name(id=guard, ctx=ast.Load()),
+            args=[node.left, node.right],
+            keywords=[],
+        )
 
 
 def reverse_it(n: str):
@@ -77,39 +188,44 @@ def base64_url_decode(s: str):
 
 
 def generate_token(n: str):
-    return safe_eval(fetch_decode()["generate_token"], n)
+    return fetch_decoders()["generate_token"](n)
 
 
 def decode_iframe_data(n: str):
-    return urllib.parse.unquote(safe_eval(fetch_decode()["decode_iframe_data"], n))
+    return urllib.parse.unquote(fetch_decoders()["decode_iframe_data"](n))
 
 
 def decode(n: str):
-    return urllib.parse.unquote(safe_eval(fetch_decode()["decode"], n))
+    return urllib.parse.unquote(fetch_decoders()["decode"](n))
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_ops(ops: str) -> Tuple[Callable[[Any], Any], ...]:
+    return tuple(compile_expression(op) for op in ops.split(";"))
 
 
 def strict_decode(n: str, ops: str):
-    ops_arr = ops.split(";")
+    ops_arr = _compile_ops(ops)
     padded = n + "=" * (-len(n) % 4)
     raw = base64.b64decode(padded.replace("-", "+").replace("_", "/"))
     result = []
 
     for i, b in enumerate(raw):
         op = ops_arr[i % len(ops_arr)]
-        transformed = simple_eval(op, names={"n": b})
+        transformed = op(b)
         result.append(transformed & 255)
 
     return "".join(map(chr, result))
 
 
 def strict_encode(n: str, ops: str):
-    ops_arr = ops.split(";")
+    ops_arr = _compile_ops(ops)
     result = []
 
     for i, ch in enumerate(n):
         code = ord(ch)
         op = ops_arr[i % len(ops_arr)]
-        transformed = simple_eval(op, names={"n": code})
+        transformed = op(code)
         result.append(transformed & 255)
 
     byte_string = bytes(result)
@@ -117,6 +233,23 @@ def strict_encode(n: str, ops: str):
     return b64.replace("+", "-").replace("/", "_").rstrip("=")
 
 
+_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    "transform": transform,
+    "base64_url_encode": base64_url_encode,
+    "base64_url_decode": base64_url_decode,
+    "reverse_it": reverse_it,
+    "substitute": substitute,
+    "strict_decode": strict_decode,
+    "strict_encode": strict_encode,
+}
+
+
+@dataclass
+class _WatchPage:
+    ani_id: Optional[str]
+    info: ProviderInfoResult
+
+
 class AnimekaiFilter(BaseFilter):
     def _apply_query(self, query: str):
         self._request.params.update({"keyword": query})
@@ -156,6 +289,10 @@ class AnimekaiProvider(BaseProvider):
         NAME: animekai
         BASE_URL: https://animekai.to
         FILTER_CAPS: YEAR, SEASON, STATUS, MEDIA_TYPE, NO_QUERY
+        SEARCH_WORKERS: How many search pages are fetched at the same time
+        WATCH_CACHE_SIZE: Maximum amount of cached watch pages and episode lists
+        WATCH_CACHE_TTL: Seconds after which cached watch pages and
+            episode lists expire
     """
 
     NAME: str = "animekai"
@@ -167,73 +304,236 @@ class AnimekaiProvider(BaseProvider):
         | FilterCapabilities.MEDIA_TYPE
         | FilterCapabilities.NO_QUERY
     )
+    SEARCH_WORKERS: int = 4
+    WATCH_CACHE_SIZE: int = 64
+    WATCH_CACHE_TTL: float = 5 * 60
+
+    def __init__(
+        self,
+        base_url_override: Optional[str] = None,
+        info_callback: Optional["InfoCallback"] = None,
+    ):
+        super().__init__(base_url_override, info_callback)
+        # get_info, get_episodes and get_video all need the watch page,
+        # and the last two the episode list, fetch them once per anime. The
+        # response cache can not do this, it is optional and does not cache
+        # the requests of get_video
+        self._watch_cache = TTLCache(self.WATCH_CACHE_SIZE, self.WATCH_CACHE_TTL)
 
     def get_search(
         self, query: str, filters: "Filters" = Filters()
     ) -> List[ProviderSearchResult]:
-        search_url = self.BASE_URL + "/browser"
-        req = Request("GET", search_url)
-        req = AnimekaiFilter(req).apply(query, filters)
+        req = self._search_request(query, filters)
+        results, last_page = self._search_page(req, 1)
+        if last_page <= 1:
+            return results
+
+        # The first page tells how many pages there are, the
+        # remaining ones are fetched at the same time
+        with ThreadPoolExecutor(
+            max_workers=min(self.SEARCH_WORKERS, last_page - 1),
+            thread_name_prefix="anipy-animekai",
+        ) as pool:
+            pages = [
+                pool.submit(copy_context().run, self._search_page, req, page)
+                for page in range(2, last_page + 1)
+            ]
+            for p in pages:
+                results.extend(p.result()[0])
 
-        results = []
-        has_next = True
-        page = 0
-        while has_next:
-            req.params["page"] = page + 1
+        return results
+
+    def iter_search(
+        self, query: str, filters: "Filters" = Filters()
+    ) -> Iterator[List[ProviderSearchResult]]:
+        """Lazy variant of
+        [get_search][anipy_api.provider.base.BaseProvider.get_search],
+        the pages are fetched one after another while iterating, so callers
+        that only need the first results can stop early.
+
+        Args:
+            query: The search query
+            filters: The filter object, check FILTER_CAPS
+                to see which filters this provider supports
+
+        Yields:
+            The search results of every page, in page order
+        """
+        req = self._search_request(query, filters)
+        page, last_page = 1, 1
+        while page <= last_page:
+            results, last_page = self._search_page(req, page)
+            yield results
+            page += 1
+
+    def _search_request(self, query: str, filters: "Filters") -> Request:
+        req = Request("GET", self.BASE_URL + "/browser")
+        return AnimekaiFilter(req).apply(query, filters)
+
+    def _search_page(
+        self, req: Request, page: int
+    ) -> Tuple[List[ProviderSearchResult], int]:
+        """Fetch one page of the browser.
+
+        Args:
+            req: The search request, it is not modified
+            page: The page to fetch, starting at 1
+
+        Returns:
+            The results of the page and the number of the last page
+        """
+        req = Request(req.method, req.url, params={**req.params, "page": page})
+        # Pages might be fetched outside of get_search (iter_search),
+        # the response cache should still use the search ttl
+        token = current_endpoint.set("get_search")
+        try:
             res = self._request_page(req)
-            soup = BeautifulSoup(res.text, "html.parser")
-            has_next = bool(soup.find("li", attrs={"class": "page-item next"}))
-            anime = soup.find_all("div", class_="aitem")
-            for a in anime:
-                uri = a.div.a["href"]
-                identifier = uri.split("/")[-1]
-                if identifier is None:
-                    continue
-
-                name = a.find("a", class_="title")["title"]
-                languages = {LanguageTypeEnum.SUB}
-                has_dub = a.find("span", class_="dub")
-                if has_dub is not None:
-                    languages.add(LanguageTypeEnum.DUB)
-
-                results.append(
-                    ProviderSearchResult(
-                        identifier=identifier, name=name, languages=languages
-                    )
+        finally:
+            current_endpoint.reset(token)
+
+        soup = parse_html(res.text, only_classes("aitem", "pagination"))
+        results = []
+        for a in soup.find_all("div", class_="aitem"):
+            uri = a.div.a["href"]
+            identifier = uri.split("/")[-1]
+            if identifier is None:
+                continue
+
+            name = a.find("a", class_="title")["title"]
+            languages = {LanguageTypeEnum.SUB}
+            has_dub = a.find("span", class_="dub")
+            if has_dub is not None:
+                languages.add(LanguageTypeEnum.DUB)
+
+            results.append(
+                ProviderSearchResult(
+                    identifier=identifier, name=name, languages=languages
                 )
+            )
 
-            page += 1
-        return results
+        return results, max(page, self._last_page(soup))
+
+    @staticmethod
+    def _last_page(soup: BeautifulSoup) -> int:
+        last_page = 1
+        pagination = soup.find("ul", class_="pagination")
+        if pagination is None:
+            return last_page
+
+        for link in pagination.find_all("a", href=True):  # type: ignore
+            query = urllib.parse.urlparse(link["href"]).query
+            for num in urllib.parse.parse_qs(query).get("page", []):
+                if num.isdigit():
+                    last_page = max(last_page, int(num))
+
+        return last_page
 
     def get_episodes(self, identifier: str, lang: LanguageTypeEnum) -> List["Episode"]:
-        req = Request("GET", f"{self.BASE_URL}/watch/{identifier}")
-        result = self._request_page(req)
-        soup = BeautifulSoup(result.text, "html.parser")
-        ani_id = safe_attr(soup.find("div", class_="rate-box"), "data-id")
+        ep_list = []
+        map = {"1": ["sub"], "3": ["sub", "dub"]}
+        for episode_num, lang_num, _ in self._episode_list(identifier):
+            if lang.value in map[lang_num]:
+                ep_list.append(parsenum(episode_num))
+
+        return ep_list
+
+    def get_info(self, identifier: str) -> "ProviderInfoResult":
+        return self._watch_page(identifier).info
+
+    def _watch_page(self, identifier: str) -> "_WatchPage":
+        """Get the parsed watch page of a anime, it is cached for
+        WATCH_CACHE_TTL seconds unless the cache is bypassed.
+
+        Args:
+            identifier: The identifier of the anime
+
+        Returns:
+            The parsed watch page
+        """
+        key = (identifier, "watch")
+        if is_cache_bypassed():
+            self._watch_cache.invalidate(lambda k: k == key)
+
+        return self._watch_cache.get_or_set(
+            key, lambda: self._fetch_watch_page(identifier)
+        )
+
+    def _episode_list(self, identifier: str) -> List[Tuple[str, str, Optional[str]]]:
+        """Get the episode list of a anime, it is cached for
+        WATCH_CACHE_TTL seconds unless the cache is bypassed.
+
+        Args:
+            identifier: The identifier of the anime
+
+        Returns:
+            Tuples of the episode number, the language number
+                and the token of every episode
+        """
+        key = (identifier, "episodes")
+        if is_cache_bypassed():
+            self._watch_cache.invalidate(lambda k: k == key)
+
+        return self._watch_cache.get_or_set(
+            key, lambda: self._fetch_episode_list(identifier)
+        )
+
+    def _fetch_episode_list(
+        self, identifier: str
+    ) -> List[Tuple[str, str, Optional[str]]]:
+        return self._with_fresh_decoders(
+            lambda: self._fetch_episode_list_try(identifier)
+        )
+
+    def _fetch_episode_list_try(
+        self, identifier: str
+    ) -> List[Tuple[str, str, Optional[str]]]:
+        ani_id = self._watch_page(identifier).ani_id
         req = Request(
             "GET",
             f"{self.BASE_URL}/ajax/episodes/list",
             params={"ani_id": ani_id, "_": generate_token(ani_id)},
         )
-        json_res = json.loads(self._request_page(req).text)
-        soup = BeautifulSoup(json_res["result"], "html.parser")
+        res = self._request_page(req)
+        json_res = json.loads(res.text)
+        soup = parse_html(json_res["result"], SoupStrainer("a"))
         ep_elements = soup.find_all("a", attrs={"num": re.compile(r"\d")})
-        ep_list = []
-        map = {"1": ["sub"], "3": ["sub", "dub"]}
+        episodes = []
         for e in ep_elements:
             lang_num = safe_attr(e, "langs")
             episode_num = safe_attr(e, "num")
             if episode_num is None or lang_num is None:
-                raise BeautifulSoupLocationError("episode", result.url)
-            if lang.value in map[lang_num]:
-                ep_list.append(parsenum(episode_num))
-
-        return ep_list
-
-    def get_info(self, identifier: str) -> "ProviderInfoResult":
+                raise BeautifulSoupLocationError("episode", res.url)
+            episodes.append((episode_num, lang_num, safe_attr(e, "token")))
+
+        return episodes
+
+    def _with_fresh_decoders(self, func: Callable[[], _T]) -> _T:
+        """Run `func`, if it fails because the stored decoders are outdated
+        (the site rejects the tokens or the data does not decode), refresh
+        them and run it once more.
+
+        Args:
+            func: The requests that use the decoders
+
+        Returns:
+            The result of `func`
+        """
+        try:
+            return func()
+        except (KeyError, ValueError):
+            if not DECODE.try_refresh(self._info_callback):
+                raise
+            return func()
+
+    def _fetch_watch_page(self, identifier: str) -> "_WatchPage":
         req = Request("GET", f"{self.BASE_URL}/watch/{identifier}")
         result = self._request_page(req)
+        soup = parse_html(result.text)
+        ani_id = safe_attr(soup.find("div", class_="rate-box"), "data-id")
+        return _WatchPage(ani_id=ani_id, info=self._parse_info(soup))
 
+    @staticmethod
+    def _parse_info(soup: BeautifulSoup) -> "ProviderInfoResult":
         data_map = {
             "name": None,
             "image": None,
@@ -244,13 +544,11 @@ class AnimekaiProvider(BaseProvider):
             "alternative_names": [],
         }
 
-        soup = BeautifulSoup(result.text, "html.parser")
         data_map["name"] = safe_attr(soup.find("div", class_="title"), "text")
         data_map["synopsis"] = safe_attr(
             soup.find("div", class_="desc text-expand"), "text"
         )
         data_map["image"] = safe_attr(soup.select_one(".poster img"), "src")
-        soup.find("div", class_="detail")
 
         alt_names = safe_attr(soup.find("small", attrs={"class": "al-title"}), "text")
         data_map["alternative_names"] = alt_names.split(";") if alt_names else []
@@ -290,20 +588,17 @@ class AnimekaiProvider(BaseProvider):
     def get_video(
         self, identifier: str, episode: "Episode", lang: LanguageTypeEnum
     ) -> List["ProviderStream"]:
+        return self._with_fresh_decoders(
+            lambda: self._get_video_try(identifier, episode, lang)
+        )
 
-        req = Request("GET", f"{self.BASE_URL}/watch/{identifier}")
-        result = self._request_page(req)
-        soup = BeautifulSoup(result.text, "html.parser")
-        ani_id = safe_attr(soup.find("div", class_="rate-box"), "data-id")
-        req = Request(
-            "GET",
-            f"{self.BASE_URL}/ajax/episodes/list",
-            params={"ani_id": ani_id, "_": generate_token(ani_id)},
+    def _get_video_try(
+        self, identifier: str, episode: "Episode", lang: LanguageTypeEnum
+    ) -> List["ProviderStream"]:
+        token = next(
+            (t for num, _, t in self._episode_list(identifier) if num == str(episode)),
+            None,
         )
-        res = self._request_page(req)
-        json_res = json.loads(res.text)
-        soup = BeautifulSoup(json_res["result"], "html.parser")
-        token = safe_attr(soup.find("a", attrs={"num": episode}), "token")
 
         req = Request(
             "GET",
@@ -312,7 +607,7 @@ class AnimekaiProvider(BaseProvider):
         )
         res = self._request_page(req)
         json_res = json.loads(res.text)
-        soup = BeautifulSoup(json_res["result"], "html.parser")
+        soup = parse_html(json_res["result"], only_classes("server-items"))
         div_tag = soup.find_all(
             "div",
             class_="server-items lang-group",
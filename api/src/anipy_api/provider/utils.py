@@ -1,8 +1,20 @@
 """These are only internal utils, which are not made to be used outside"""
 
-from typing import TYPE_CHECKING, Optional, Union
+import re
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Optional, Union
 
 import pycountry
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.etree  # noqa: F401
+
+    HTML_PARSER = "lxml"
+except ImportError:  # pragma: no cover
+    HTML_PARSER = "html.parser"
 
 if TYPE_CHECKING:
     from bs4 import NavigableString, Tag
@@ -29,6 +41,39 @@ def request_page(session: "Session", req: "Request", raise_status: bool = True)
     return res
 
 
+def parse_html(
+    markup: Union[str, bytes], only: Optional["SoupStrainer"] = None
+) -> BeautifulSoup:
+    """Parse html with the fastest available BeautifulSoup backend,
+    that is lxml if it is installed and html.parser otherwise.
+
+    Args:
+        markup: The html
+        only: Only parse the tags this strainer matches (and their
+            children), the rest of the document is skipped
+
+    Returns:
+        The parsed document
+    """
+    return BeautifulSoup(markup, HTML_PARSER, parse_only=only)
+
+
+def only_classes(*classes: str) -> SoupStrainer:
+    """Get a strainer for [parse_html][anipy_api.provider.utils.parse_html],
+    that matches the tags that have one of the classes.
+
+    Args:
+        classes: The css classes
+
+    Returns:
+        The strainer
+    """
+    # While parsing, the class attribute is not yet split into
+    # single classes, so match them in the whole attribute
+    pattern = "|".join(re.escape(c) for c in classes)
+    return SoupStrainer(class_=re.compile(rf"(?:^|\s)(?:{pattern})(?:\s|$)"))
+
+
 def parsenum(n: str):
     """Parse a number be it a integer or float
 
@@ -72,3 +117,61 @@ def get_language_name(lang_code: str) -> Optional[str]:
         return language.name if language else None
     except AttributeError:
         return
+
+
+class TTLCache:
+    """A thread safe least-recently-used cache, whose entries expire after a ttl."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        """__init__ of TTLCache
+
+        Args:
+            maxsize: Maximum amount of entries, the least recently used
+                entry is dropped when it is exceeded
+            ttl: Seconds after which a entry expires
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get_or_set(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """Get a value from the cache, or compute and store it.
+
+        Args:
+            key: The key of the value
+            func: Computes the value if it is not cached or expired
+
+        Returns:
+            The value
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._data.move_to_end(key)
+                return entry[1]
+
+        value = func()
+
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+        return value
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]):
+        """Drop all entries whose key matches the predicate.
+
+        Args:
+            predicate: Gets called with every key
+        """
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,357 @@
+"""Structured tracing of the work anipy-api does, to find out where time
+is spent (e.g. in which provider call a slow binge is stuck).
+
+Work is recorded in spans, a span has a name, a start and end time,
+attributes and a parent span. Spans are only recorded while at least one
+exporter is added with [add_exporter][anipy_api.tracing.add_exporter],
+otherwise [span][anipy_api.tracing.span] costs next to nothing.
+
+The providers, the [Downloader][anipy_api.download.Downloader] and the
+players are traced. Spans can be written as json lines
+([JsonLinesExporter][anipy_api.tracing.JsonLinesExporter]) or in the
+OpenTelemetry OTLP/JSON format
+([OtlpJsonExporter][anipy_api.tracing.OtlpJsonExporter]), which can be
+read by the file receiver of the OpenTelemetry Collector.
+
+Example:
+    ```python
+    from pathlib import Path
+    from anipy_api.tracing import JsonLinesExporter, add_exporter, span
+
+    add_exporter(JsonLinesExporter(Path("trace.jsonl")))
+
+    with span("my-app.search", query="frieren") as s:
+        results = provider.get_search("frieren")
+        s.set_attribute("results", len(results))
+    ```
+"""
+
+import functools
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (Any, Callable, Dict, Iterator, List, Optional, Protocol,
+                    TypeVar)
+
+T = TypeVar("T")
+
+
+@dataclass
+class Span:
+    """A timed unit of work.
+
+    Attributes:
+        name: Name of the span, e.g. `provider.get_video`
+        trace_id: Id of the trace, all spans below the same root span share it
+        span_id: Id of the span
+        parent_id: Id of the parent span, if there is one
+        start_ns: Unix time in nanoseconds at which the span started
+        end_ns: Unix time in nanoseconds at which the span ended
+        attributes: Attributes of the span
+        error: The exception the span ended with, if any
+        thread: Name of the thread the span ran in
+    """
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    thread: str = ""
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Duration of the span in seconds, if it ended."""
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e9
+
+    def set_attribute(self, key: str, value: Any):
+        """Set an attribute of the span.
+
+        Args:
+            key: Name of the attribute
+            value: Value of the attribute, it should be json serializable
+        """
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any):
+        """Set several attributes of the span.
+
+        Args:
+            **attributes: The attributes
+        """
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the span as a dict, as written by the
+        [JsonLinesExporter][anipy_api.tracing.JsonLinesExporter].
+
+        Returns:
+            The span as a json serializable dict
+        """
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start_ns / 1e9,
+            "duration": self.duration,
+            "thread": self.thread,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Get the span in the OTLP/JSON format of OpenTelemetry.
+
+        Returns:
+            The span as a json serializable dict
+        """
+        attributes = {**self.attributes, "thread.name": self.thread}
+        otlp: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [
+                {"key": k, "value": _otlp_value(v)} for k, v in attributes.items()
+            ],
+            "status": (
+                {"code": 2, "message": self.error}
+                if self.error is not None
+                else {"code": 1}
+            ),
+        }
+        if self.parent_id is not None:
+            otlp["parentSpanId"] = self.parent_id
+        return otlp
+
+
+class _NoopSpan(Span):
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, **attributes: Any):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan("noop", "", "", None, 0)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class SpanExporter(Protocol):
+    """The interface of a span exporter, it is called with every
+    span that ended."""
+
+    def export(self, span: Span):
+        """Export a span that ended, this may be called from any thread.
+
+        Args:
+            span: The span
+        """
+        ...
+
+
+class JsonLinesExporter:
+    """Append every span as a json object on its own line to a file,
+    the format of a line is the one of
+    [Span.to_dict][anipy_api.tracing.Span.to_dict].
+    """
+
+    def __init__(self, path: Path):
+        """__init__ of JsonLinesExporter
+
+        Args:
+            path: Path of the file, the spans are appended if it exists
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = path.open("a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def _format(self, span: Span) -> Dict[str, Any]:
+        return span.to_dict()
+
+    def export(self, span: Span):
+        line = json.dumps(self._format(span), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        """Close the file."""
+        with self._lock:
+            self._file.close()
+
+
+class OtlpJsonExporter(JsonLinesExporter):
+    """Append every span as a OTLP/JSON `ExportTraceServiceRequest` on its
+    own line to a file, this is the format the file receiver of the
+    OpenTelemetry Collector reads.
+    """
+
+    def __init__(self, path: Path, service_name: str = "anipy"):
+        """__init__ of OtlpJsonExporter
+
+        Args:
+            path: Path of the file, the spans are appended if it exists
+            service_name: The `service.name` resource attribute
+        """
+        super().__init__(path)
+        self.service_name = service_name
+
+    def _format(self, span: Span) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": self.service_name},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {"scope": {"name": "anipy_api"}, "spans": [span.to_otlp()]}
+                    ],
+                }
+            ]
+        }
+
+
+_exporters: List[SpanExporter] = []
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def add_exporter(exporter: SpanExporter):
+    """Add a exporter, spans are recorded while there is at least one.
+
+    Args:
+        exporter: The exporter
+    """
+    _exporters.append(exporter)
+
+
+def remove_exporter(exporter: SpanExporter):
+    """Remove a exporter that was added before.
+
+    Args:
+        exporter: The exporter
+    """
+    _exporters.remove(exporter)
+
+
+def is_enabled() -> bool:
+    """Check if spans are recorded.
+
+    Returns:
+        If there is a exporter
+    """
+    return bool(_exporters)
+
+
+def current_span() -> Span:
+    """Get the span that is currently running in this context.
+
+    Returns:
+        The current span, a span that ignores attributes if there is none
+    """
+    return _current_span.get() or _NOOP_SPAN
+
+
+@contextmanager
+def span(name: str, parent: Optional[Span] = None, **attributes: Any) -> Iterator[Span]:
+    """Record a span around a block of code.
+
+    The span is a child of the span that is currently running, spans do not
+    propagate to other threads by themselves, pass the `parent` for work
+    that is done in a thread pool. If the block raises, the exception is
+    recorded in the span and reraised.
+
+    Args:
+        name: Name of the span
+        parent: The parent span, defaults to the current span
+        **attributes: Attributes of the span
+
+    Yields:
+        The span, use it to add attributes
+    """
+    if not _exporters:
+        yield _NOOP_SPAN
+        return
+
+    if parent is None:
+        parent = _current_span.get()
+    if parent is _NOOP_SPAN:
+        parent = None
+
+    s = Span(
+        name=name,
+        trace_id=(
+            parent.trace_id if parent is not None else f"{random.getrandbits(128):032x}"
+        ),
+        span_id=f"{random.getrandbits(64):016x}",
+        parent_id=parent.span_id if parent is not None else None,
+        start_ns=time.time_ns(),
+        attributes=attributes,
+        thread=threading.current_thread().name,
+    )
+    start = time.perf_counter_ns()
+    token = _current_span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        s.end_ns = s.start_ns + time.perf_counter_ns() - start
+        for exporter in list(_exporters):
+            exporter.export(s)
+
+
+def traced(
+    name: Optional[str] = None,
+) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorator that records a span around every call of a function.
+
+    Args:
+        name: Name of the span, defaults to the qualified name of the function
+
+    Returns:
+        The decorator
+    """
+
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            if not _exporters:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1 @@
+"""Benchmarks of anipy-api, run them with `python -m benchmarks`."""
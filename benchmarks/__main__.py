@@ -0,0 +1,77 @@
+"""Run the benchmarks and write the results as json.
+
+Usage:
+    python -m benchmarks --output results.json
+    python -m benchmarks --only locallist --compare baseline.json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from benchmarks import (bench_adapter, bench_animekai,  # noqa: F401
+                        bench_download, bench_html, bench_locallist,
+                        bench_providers)
+from benchmarks.harness import Context, compare, groups, load_report, report, run
+from benchmarks.record import FIXTURES
+
+
+def main(args: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the anipy-api benchmarks.")
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=groups(),
+        default=groups(),
+        help="Only run these groups",
+    )
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=5, help="Timings per benchmark"
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="Use smaller inputs, for a fast check"
+    )
+    parser.add_argument(
+        "--fixtures",
+        type=Path,
+        default=FIXTURES,
+        help="Directory of the recorded provider fixtures",
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path, help="Write the results to this json file"
+    )
+    parser.add_argument(
+        "--compare", type=Path, help="Compare the medians against these results"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed slowdown compared to --compare, 0.2 means 20%%",
+    )
+    options = parser.parse_args(args)
+
+    context = Context(
+        repeat=options.repeat, quick=options.quick, fixtures=options.fixtures
+    )
+    results = report(run(options.only, context), context)
+
+    if options.output is not None:
+        options.output.write_text(json.dumps(results, indent=2))
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if options.compare is not None:
+        regressions = compare(results, load_report(options.compare), options.threshold)
+        if regressions:
+            print("Regressions:\n  " + "\n  ".join(regressions), file=sys.stderr)
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
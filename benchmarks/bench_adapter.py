@@ -0,0 +1,121 @@
+"""Cost of matching anime between MyAnimeList and a provider.
+
+The provider and MyAnimeList are replaced with in-memory stand-ins, so
+only the matching itself (the name similarity of every candidate) is
+measured.
+"""
+
+import random
+from typing import Iterator, List
+
+from anipy_api.anime import Anime
+from anipy_api.mal import (MALAlternativeTitles, MALAnime, MALMediaTypeEnum,
+                           MyAnimeListAdapter)
+from anipy_api.provider import (BaseProvider, FilterCapabilities,
+                                LanguageTypeEnum, ProviderInfoResult,
+                                ProviderSearchResult)
+
+from benchmarks.harness import Context, Result, benchmark, measure
+
+WORDS = (
+    "sword shadow academy hero demon lord reincarnated slime magic girl "
+    "spirit dragon tale kingdom night school club love war witch"
+).split()
+
+
+def random_title(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))).title()
+
+
+class StubProvider(BaseProvider):
+    NAME = "stub"
+    BASE_URL = ""
+    FILTER_CAPS = FilterCapabilities.YEAR | FilterCapabilities.SEASON
+
+    def __init__(self, results: List[ProviderSearchResult], alt_names: int):
+        super().__init__()
+        self.results = results
+        self.alt_names = alt_names
+        self.rng = random.Random(0)
+
+    def get_search(self, query, filters=None):
+        return self.results
+
+    def get_info(self, identifier):
+        return ProviderInfoResult(
+            name=identifier,
+            alternative_names=[random_title(self.rng) for _ in range(self.alt_names)],
+        )
+
+    def get_episodes(self, identifier, lang):
+        return []
+
+    def get_video(self, identifier, episode, lang):
+        return []
+
+
+class StubMyAnimeList:
+    def __init__(self, results: List[MALAnime]):
+        self.results = results
+
+    def get_search(self, query, *args, **kwargs):
+        return self.results
+
+
+@benchmark("adapter")
+def bench_adapter(context: Context) -> Iterator[Result]:
+    rng = random.Random(0)
+    candidates = 20 if context.quick else 50
+    alt_names = 5
+
+    provider_results = [
+        ProviderSearchResult(f"id{i}", random_title(rng), {LanguageTypeEnum.SUB})
+        for i in range(candidates)
+    ]
+    mal_results = [
+        MALAnime(
+            id=i,
+            title=random_title(rng),
+            media_type=MALMediaTypeEnum.TV,
+            num_episodes=12,
+            alternative_titles=MALAlternativeTitles(
+                en=random_title(rng),
+                ja=random_title(rng),
+                synonyms=[random_title(rng) for _ in range(alt_names)],
+            ),
+        )
+        for i in range(candidates)
+    ]
+
+    provider = StubProvider(provider_results, alt_names)
+    adapter = MyAnimeListAdapter(StubMyAnimeList(mal_results), provider)  # type: ignore
+    # A title that is similar to no candidate, so every candidate is compared
+    mal_anime = MALAnime(
+        id=-1,
+        title="Completely Unrelated Title",
+        media_type=MALMediaTypeEnum.TV,
+        num_episodes=12,
+        alternative_titles=MALAlternativeTitles(en="Another Unrelated Title"),
+    )
+    anime = Anime(
+        provider, "Completely Unrelated Title", "id-1", {LanguageTypeEnum.SUB}
+    )
+
+    yield Result(
+        name=f"adapter.from_myanimelist[{candidates}]",
+        group="adapter",
+        timings=measure(
+            lambda: adapter.from_myanimelist(mal_anime),
+            context.repeat,
+            setup=Anime.clear_cache,
+        ),
+    )
+    yield Result(
+        name=f"adapter.from_provider[{candidates}]",
+        group="adapter",
+        timings=measure(
+            lambda: adapter.from_provider(anime),
+            context.repeat,
+            setup=Anime.clear_cache,
+        ),
+    )
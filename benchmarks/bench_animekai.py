@@ -0,0 +1,92 @@
+"""Per call cost of the Animekai decoder expressions.
+
+The expressions are shaped like the ones of kai.json, they are
+evaluated with simpleeval on every call (how the provider used to do
+it) and as compiled expressions.
+"""
+
+import base64
+import functools
+from typing import Iterator
+
+from anipy_api.provider.providers import animekai_provider as animekai
+from simpleeval import simple_eval
+
+from benchmarks.harness import Context, Result, benchmark, measure
+
+OPS = "n + 7;n ^ 91;(n << 1) | (n >> 7);~n;n - 13;(n >> 2) | (n << 6);n ^ 170"
+EXPRESSIONS = {
+    "generate_token": (
+        "base64_url_encode(transform('gEUzYavPrGpj', "
+        f"strict_encode(reverse_it(n), '{OPS}')))"
+    ),
+    "decode": (
+        "strict_decode(base64_url_encode(transform('ZoQxTnYtFtbH', "
+        f"base64_url_decode(n))), '{OPS}')"
+    ),
+}
+
+
+def simple_eval_strict_decode(n: str, ops: str):
+    ops_arr = ops.split(";")
+    padded = n + "=" * (-len(n) % 4)
+    raw = base64.b64decode(padded.replace("-", "+").replace("_", "/"))
+    result = []
+    for i, b in enumerate(raw):
+        op = ops_arr[i % len(ops_arr)]
+        result.append(simple_eval(op, names={"n": b}) & 255)
+    return "".join(map(chr, result))
+
+
+def simple_eval_strict_encode(n: str, ops: str):
+    ops_arr = ops.split(";")
+    result = []
+    for i, ch in enumerate(n):
+        op = ops_arr[i % len(ops_arr)]
+        result.append(simple_eval(op, names={"n": ord(ch)}) & 255)
+    b64 = base64.b64encode(bytes(result)).decode()
+    return b64.replace("+", "-").replace("/", "_").rstrip("=")
+
+
+SIMPLE_EVAL_FUNCTIONS = {
+    **animekai._FUNCTIONS,
+    "strict_decode": simple_eval_strict_decode,
+    "strict_encode": simple_eval_strict_encode,
+}
+
+
+def simple_eval_reference(exp: str, n: str) -> str:
+    """Evaluate a expression like the provider did before compiling them."""
+    return simple_eval(exp, names={"n": n}, functions=SIMPLE_EVAL_FUNCTIONS)
+
+
+@benchmark("animekai")
+def bench_animekai(context: Context) -> Iterator[Result]:
+    calls = 200 if context.quick else 2000
+    token_input = "c4S88Q"
+    decode_input = animekai.compile_expression(
+        f"base64_url_encode(transform('ZoQxTnYtFtbH', strict_encode(n, '{OPS}')))"
+    )("https://megaup.cc/e/abcdefghijklmnop")
+
+    for name, exp in EXPRESSIONS.items():
+        n = token_input if name == "generate_token" else decode_input
+        compiled = animekai.compile_expression(exp)
+        assert compiled(n) == simple_eval_reference(exp, n)
+
+        evaluators = {
+            "simple_eval": functools.partial(simple_eval_reference, exp),
+            "compiled": compiled,
+        }
+        for evaluator, func in evaluators.items():
+
+            def run():
+                for _ in range(calls):
+                    func(n)
+
+            timings = measure(run, context.repeat)
+            yield Result(
+                name=f"animekai.{name}.{evaluator}[{calls}]",
+                group="animekai",
+                timings=timings,
+                extra={"us_per_call": min(timings) / calls * 10**6},
+            )
@@ -0,0 +1,94 @@
+"""Throughput of the internal HLS downloader against a local server."""
+
+import shutil
+import statistics
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Iterator
+
+from anipy_api.download import Downloader
+from anipy_api.provider import LanguageTypeEnum, ProviderStream
+
+from benchmarks.harness import Context, Result, benchmark, measure
+
+
+class HlsServer:
+    """Serves a playlist of `segments` segments of `segment_size` bytes."""
+
+    def __init__(self, segments: int, segment_size: int):
+        playlist = ["#EXTM3U", "#EXT-X-TARGETDURATION:4", "#EXT-X-VERSION:3"]
+        for i in range(segments):
+            playlist += ["#EXTINF:4.0,", f"seg{i}.ts"]
+        playlist.append("#EXT-X-ENDLIST")
+
+        self.playlist = "\n".join(playlist).encode()
+        self.segment = bytes(range(256)) * (segment_size // 256)
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any):
+                pass
+
+            def do_GET(self):
+                body = (
+                    server.playlist if self.path.endswith(".m3u8") else server.segment
+                )
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/index.m3u8"
+
+    def __enter__(self) -> "HlsServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *_: Any):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@benchmark("download")
+def bench_download(context: Context) -> Iterator[Result]:
+    segments = 50 if context.quick else 300
+    segment_size = 512 * 1024
+
+    with HlsServer(segments, segment_size) as server:
+        stream = ProviderStream(
+            server.url, 1080, 1, LanguageTypeEnum.SUB, container="hls"
+        )
+        downloader = Downloader(lambda percentage: None, lambda message, *args: None)
+        folder = Path(tempfile.mkdtemp(prefix="anipy-bench-"))
+
+        def setup():
+            shutil.rmtree(folder, ignore_errors=True)
+            folder.mkdir()
+
+        try:
+            timings = measure(
+                lambda: downloader.m3u8_download(stream, folder / "episode"),
+                context.repeat,
+                setup=setup,
+            )
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+
+    size = segments * len(server.segment)
+    yield Result(
+        name=f"download.m3u8[{segments}x{segment_size // 1024}KiB]",
+        group="download",
+        timings=timings,
+        extra={"mib_per_second": size / statistics.median(timings) / 1024**2},
+    )
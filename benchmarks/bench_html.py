@@ -0,0 +1,68 @@
+"""Parse times of the html pages in the recorded provider fixtures,
+with every installed BeautifulSoup backend."""
+
+import base64
+from typing import Iterator, List
+
+from anipy_api.provider import list_providers
+from bs4 import BeautifulSoup, FeatureNotFound
+
+from benchmarks.fixtures import Fixture
+from benchmarks.harness import Context, Result, benchmark, measure
+
+BACKENDS = ["html.parser", "lxml"]
+
+
+def html_pages(fixture: Fixture) -> List[bytes]:
+    pages = []
+    for response in fixture.responses.values():
+        headers = {k.lower(): v for k, v in response["headers"].items()}
+        if "html" in headers.get("content-type", ""):
+            pages.append(base64.b64decode(response["body"]))
+    return pages
+
+
+def backend_available(backend: str) -> bool:
+    try:
+        BeautifulSoup("", backend)
+    except FeatureNotFound:
+        return False
+    return True
+
+
+@benchmark("html")
+def bench_html(context: Context) -> Iterator[Result]:
+    for provider_cls in list_providers():
+        name = provider_cls.NAME
+        path = context.fixtures / f"{name}.json"
+        pages = html_pages(Fixture.load(path)) if path.is_file() else []
+        if not pages:
+            yield Result(
+                name=f"html.{name}",
+                group="html",
+                skipped="no fixture with html pages",
+            )
+            continue
+
+        for backend in BACKENDS:
+            if not backend_available(backend):
+                yield Result(
+                    name=f"html.{name}[{backend}]",
+                    group="html",
+                    skipped=f"{backend} is not installed",
+                )
+                continue
+
+            def parse():
+                for page in pages:
+                    BeautifulSoup(page, backend)
+
+            yield Result(
+                name=f"html.{name}[{backend}]",
+                group="html",
+                timings=measure(parse, context.repeat),
+                extra={
+                    "pages": len(pages),
+                    "kib": sum(len(p) for p in pages) // 1024,
+                },
+            )
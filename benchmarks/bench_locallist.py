@@ -0,0 +1,79 @@
+"""Load and update times of the LocalList at different sizes."""
+
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterator
+
+from anipy_api.locallist import LocalList, LocalListData, LocalListEntry
+from anipy_api.provider import LanguageTypeEnum
+
+from benchmarks.harness import Context, Result, benchmark, measure
+
+
+def make_list(file: Path, size: int):
+    now = int(time.time())
+    entries = {}
+    for i in range(size):
+        entry = LocalListEntry(
+            provider="allanime",
+            identifier=f"id{i:07d}",
+            name=f"Some Anime Name Season {i % 5} Part {i}",
+            episode=i % 24 + 1,
+            timestamp=now - i,
+            language=LanguageTypeEnum.SUB,
+            languages={LanguageTypeEnum.SUB, LanguageTypeEnum.DUB},
+        )
+        entries[f"{entry.provider}:{entry.identifier}"] = entry
+
+    LocalListData(entries).write(file)
+
+
+@benchmark("locallist")
+def bench_locallist(context: Context) -> Iterator[Result]:
+    sizes = [1_000, 10_000] if context.quick else [1_000, 10_000, 100_000]
+    folder = Path(tempfile.mkdtemp(prefix="anipy-bench-"))
+
+    try:
+        for size in sizes:
+            file = folder / f"list{size}.json"
+            make_list(file, size)
+
+            def reset():
+                for p in folder.glob(f"list{size}.json.*"):
+                    p.unlink()
+
+            yield Result(
+                name=f"locallist.load[{size}]",
+                group="locallist",
+                timings=measure(
+                    lambda: LocalList(file).get_all(), context.repeat, setup=reset
+                ),
+            )
+
+            local_list = LocalList(file)
+            entry = local_list.get_all()[0]
+            episodes = iter(range(10**9))
+            yield Result(
+                name=f"locallist.update[{size}]",
+                group="locallist",
+                timings=measure(
+                    lambda: local_list.update(entry, episode=next(episodes)),
+                    context.repeat,
+                ),
+            )
+
+            entries = local_list.get_all()[:100]
+
+            def update_many():
+                episode = next(episodes)
+                local_list.update_many((e, {"episode": episode}) for e in entries)
+
+            yield Result(
+                name=f"locallist.update_many[{size}x100]",
+                group="locallist",
+                timings=measure(update_many, context.repeat),
+            )
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
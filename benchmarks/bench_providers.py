@@ -0,0 +1,52 @@
+"""Latency of every provider method, replayed from the recorded fixtures."""
+
+from typing import Iterator
+
+from anipy_api.provider import BaseProvider, LanguageTypeEnum, list_providers
+
+from benchmarks.fixtures import Fixture, ReplayServer, replaying
+from benchmarks.harness import Context, Result, benchmark, measure
+
+
+@benchmark("providers")
+def bench_providers(context: Context) -> Iterator[Result]:
+    # Measure the provider itself, not the response cache
+    BaseProvider.response_cache = None
+
+    for provider_cls in list_providers():
+        name = provider_cls.NAME
+        path = context.fixtures / f"{name}.json"
+        if not path.is_file():
+            yield Result(
+                name=f"providers.{name}",
+                group="providers",
+                skipped=(
+                    "no fixture, record one with: "
+                    f"python -m benchmarks.record {name} -q <query>"
+                ),
+            )
+            continue
+
+        fixture = Fixture.load(path)
+        scenario = fixture.scenario
+        identifier = scenario["identifier"]
+        lang = LanguageTypeEnum(scenario["lang"])
+        episode = scenario["episode"]
+
+        with ReplayServer(fixture) as server, replaying(server):
+            provider = provider_cls()
+            calls = {
+                "get_search": lambda: provider.get_search(scenario["query"]),
+                "get_info": lambda: provider.get_info(identifier),
+                "get_episodes": lambda: provider.get_episodes(identifier, lang),
+                "get_video": lambda: provider.get_video(identifier, episode, lang),
+            }
+            for method, call in calls.items():
+                timings = measure(call, context.repeat)
+                yield Result(
+                    name=f"providers.{name}.{method}",
+                    group="providers",
+                    timings=timings,
+                    extra={"misses": sum(server.misses.values())},
+                )
+                server.misses.clear()
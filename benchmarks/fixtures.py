@@ -0,0 +1,247 @@
+"""Recording of provider http traffic and replaying it from a local server.
+
+A fixture file holds the scenario that was recorded (query, identifier,
+episode...) and every response the provider got while running it. While
+[replaying][benchmarks.fixtures.replaying] a fixture, every request is
+sent to a [ReplayServer][benchmarks.fixtures.ReplayServer] on localhost
+instead of the real host. The server answers with the recorded response,
+so the benchmarks measure the http stack and the parsing of the provider
+without depending on the network.
+"""
+
+import base64
+import hashlib
+import json
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
+
+from requests import PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+
+ORIGINAL_URL_HEADER = "X-Anipy-Original-Url"
+
+# Headers that do not apply to the replayed body
+_DROPPED_HEADERS = {
+    "content-encoding",
+    "content-length",
+    "transfer-encoding",
+    "connection",
+    "keep-alive",
+}
+
+
+def request_key(method: str, url: str, body: Union[str, bytes, None]) -> str:
+    if isinstance(body, str):
+        body = body.encode()
+
+    digest = hashlib.sha256(f"{method.upper()} {url}\n".encode())
+    digest.update(body or b"")
+    return digest.hexdigest()
+
+
+class Fixture:
+    """The recorded scenario and responses of one provider.
+
+    Attributes:
+        scenario: What was recorded, e.g. `{"query": ..., "identifier": ...}`
+        responses: The recorded responses by request key
+    """
+
+    def __init__(
+        self,
+        scenario: Optional[Dict[str, Any]] = None,
+        responses: Optional[Dict[str, Dict[str, Any]]] = None,
+    ):
+        self.scenario = scenario or {}
+        self.responses = responses or {}
+
+    @classmethod
+    def load(cls, path: Path) -> "Fixture":
+        data = json.loads(path.read_text())
+        return cls(data["scenario"], data["responses"])
+
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps(
+                {"scenario": self.scenario, "responses": self.responses}, indent=1
+            )
+        )
+
+    def add(self, request: PreparedRequest, response: Response):
+        key = request_key(request.method or "GET", request.url or "", request.body)
+        self.responses[key] = {
+            "method": request.method,
+            "url": request.url,
+            "status": response.status_code,
+            "headers": {
+                k: v
+                for k, v in response.headers.items()
+                if k.lower() not in _DROPPED_HEADERS
+            },
+            "body": base64.b64encode(response.content).decode(),
+        }
+
+
+@contextmanager
+def recording(fixture: Fixture) -> Iterator[Fixture]:
+    """Record every response that is received in this block, from
+    any session, in a fixture.
+
+    Args:
+        fixture: The fixture to add the responses to
+
+    Yields:
+        The fixture
+    """
+    original_send = HTTPAdapter.send
+
+    def send(self: HTTPAdapter, request: PreparedRequest, **kwargs: Any) -> Response:
+        response = original_send(self, request, **kwargs)
+        # This also reads streamed responses, the content stays
+        # available to the caller
+        response.content
+        fixture.add(request, response)
+        return response
+
+    HTTPAdapter.send = send  # type: ignore
+    try:
+        yield fixture
+    finally:
+        HTTPAdapter.send = original_send  # type: ignore
+
+
+class ReplayServer:
+    """A local http server that answers with the responses of a fixture.
+
+    The url the request was originally sent to is read from the
+    `X-Anipy-Original-Url` header. Some providers put volatile values (e.g.
+    timestamps) into their requests, a request that was not recorded
+    exactly is answered with the recorded response of the same method and
+    path that has the most query parameters in common, these are counted
+    in `fuzzy`. Requests without any such response get a 404, they are
+    counted in `misses`.
+    """
+
+    def __init__(self, fixture: Fixture):
+        self.fixture = fixture
+        self.misses: Dict[str, int] = {}
+        self.fuzzy: Dict[str, int] = {}
+        self._by_path: Dict[str, List[Dict[str, Any]]] = {}
+        for recorded in fixture.responses.values():
+            key = self._path_key(recorded["method"], recorded["url"])
+            self._by_path.setdefault(key, []).append(recorded)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="replay-server", daemon=True
+        )
+
+    @staticmethod
+    def _path_key(method: str, url: str) -> str:
+        parts = urlsplit(url)
+        return f"{method.upper()} {parts.netloc}{parts.path}"
+
+    def _lookup(
+        self, method: str, url: str, body: Optional[bytes]
+    ) -> Optional[Dict[str, Any]]:
+        recorded = self.fixture.responses.get(request_key(method, url, body))
+        if recorded is not None:
+            return recorded
+
+        candidates = self._by_path.get(self._path_key(method, url))
+        if not candidates:
+            self.misses[url] = self.misses.get(url, 0) + 1
+            return None
+
+        query = set(parse_qsl(urlsplit(url).query))
+        self.fuzzy[url] = self.fuzzy.get(url, 0) + 1
+        return max(
+            candidates,
+            key=lambda r: len(query & set(parse_qsl(urlsplit(r["url"]).query))),
+        )
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any):
+                pass
+
+            def _replay(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length) if length else None
+                url = self.headers.get(ORIGINAL_URL_HEADER, "")
+                recorded = server._lookup(self.command, url, body)
+
+                if recorded is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                content = base64.b64decode(recorded["body"])
+                self.send_response(recorded["status"])
+                for k, v in recorded["headers"].items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = _replay
+
+        return Handler
+
+    def __enter__(self) -> "ReplayServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_: Any):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@contextmanager
+def replaying(server: "ReplayServer") -> Iterator["ReplayServer"]:
+    """Send every request in this block, from any session, to a
+    [ReplayServer][benchmarks.fixtures.ReplayServer] instead of the
+    real host.
+
+    Args:
+        server: The running server
+
+    Yields:
+        The server
+    """
+    original_send = HTTPAdapter.send
+    target = urlsplit(server.url)
+
+    def send(self: HTTPAdapter, request: PreparedRequest, **kwargs: Any) -> Response:
+        original = request.url or ""
+        parts = urlsplit(original)
+        request = request.copy()
+        request.url = urlunsplit(
+            (target.scheme, target.netloc, parts.path or "/", parts.query, "")
+        )
+        request.headers[ORIGINAL_URL_HEADER] = original
+        response = original_send(self, request, **kwargs)
+        # Providers look at the url of the response (e.g. to join urls)
+        response.url = original
+        return response
+
+    HTTPAdapter.send = send  # type: ignore
+    try:
+        yield server
+    finally:
+        HTTPAdapter.send = original_send  # type: ignore
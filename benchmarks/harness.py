@@ -0,0 +1,219 @@
+"""Registry, timing and reporting of the benchmarks."""
+
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+@dataclass
+class Result:
+    """The result of a single benchmark.
+
+    Attributes:
+        name: Unique name of the benchmark, e.g. `locallist.load[10000]`
+        group: The group the benchmark belongs to, e.g. `locallist`
+        unit: Unit of the timings
+        timings: The measured timings, one per repeat
+        extra: Further measurements, e.g. throughput
+        skipped: Why the benchmark was skipped, if it was
+    """
+
+    name: str
+    group: str
+    unit: str = "s"
+    timings: List[float] = field(default_factory=list)
+    extra: Dict[str, Any] = field(default_factory=dict)
+    skipped: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = asdict(self)
+        if self.timings:
+            result["stats"] = {
+                "min": min(self.timings),
+                "median": statistics.median(self.timings),
+                "mean": statistics.fmean(self.timings),
+                "stdev": (
+                    statistics.stdev(self.timings) if len(self.timings) > 1 else 0.0
+                ),
+                "max": max(self.timings),
+                "repeat": len(self.timings),
+            }
+        return result
+
+
+BenchmarkFunc = Callable[["Context"], Iterator[Result]]
+
+
+@dataclass
+class Context:
+    """Settings passed to every benchmark.
+
+    Attributes:
+        repeat: How many times every measurement is repeated
+        quick: Use smaller inputs, for a fast sanity run
+        fixtures: Directory of the recorded provider fixtures
+    """
+
+    repeat: int
+    quick: bool
+    fixtures: Path
+
+
+_registry: Dict[str, BenchmarkFunc] = {}
+
+
+def benchmark(group: str) -> Callable[[BenchmarkFunc], BenchmarkFunc]:
+    """Register a benchmark function, it gets a
+    [Context][benchmarks.harness.Context] and yields its results.
+
+    Args:
+        group: Name of the group, it can be selected with `--only`
+
+    Returns:
+        The decorator
+    """
+
+    def decorator(func: BenchmarkFunc) -> BenchmarkFunc:
+        _registry[group] = func
+        return func
+
+    return decorator
+
+
+def groups() -> List[str]:
+    return list(_registry)
+
+
+def measure(
+    func: Callable[[], Any],
+    repeat: int,
+    setup: Optional[Callable[[], Any]] = None,
+    warmup: int = 1,
+) -> List[float]:
+    """Time a function.
+
+    Args:
+        func: The function to time
+        repeat: How many timings to take
+        setup: Called before every run (and not timed)
+        warmup: How many untimed runs to do first
+
+    Returns:
+        The timings in seconds
+    """
+    timings = []
+    for i in range(warmup + repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            timings.append(elapsed)
+    return timings
+
+
+def run(selected: List[str], context: Context) -> List[Result]:
+    results: List[Result] = []
+    for group in selected:
+        try:
+            for result in _registry[group](context):
+                _print_result(result)
+                results.append(result)
+        except Exception as e:
+            result = Result(name=group, group=group, skipped=f"failed: {e!r}")
+            _print_result(result)
+            results.append(result)
+    return results
+
+
+def _print_result(result: Result):
+    if result.skipped is not None:
+        print(f"{result.name:<48} skipped ({result.skipped})", file=sys.stderr)
+        return
+
+    median = statistics.median(result.timings)
+    extra = " ".join(f"{k}={v:.4g}" for k, v in result.extra.items())
+    print(
+        f"{result.name:<48} median {median * 1000:10.3f} ms  "
+        f"min {min(result.timings) * 1000:10.3f} ms  {extra}",
+        file=sys.stderr,
+    )
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(results: List[Result], context: Context) -> Dict[str, Any]:
+    """Build the machine-readable report of a run.
+
+    Args:
+        results: The results of the run
+        context: The context of the run
+
+    Returns:
+        The report, it is json serializable
+    """
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "repeat": context.repeat,
+            "quick": context.quick,
+        },
+        "results": [r.to_dict() for r in results],
+    }
+
+
+def compare(
+    report: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    """Compare the medians of a report against a baseline report.
+
+    Args:
+        report: The current report
+        baseline: The baseline report
+        threshold: Allowed relative slowdown, e.g. 0.2 for 20%
+
+    Returns:
+        Descriptions of the benchmarks that got slower than allowed
+    """
+    base = {
+        r["name"]: r["stats"]["median"] for r in baseline["results"] if "stats" in r
+    }
+    regressions = []
+    for r in report["results"]:
+        if "stats" not in r or r["name"] not in base or base[r["name"]] <= 0:
+            continue
+
+        ratio = r["stats"]["median"] / base[r["name"]]
+        marker = ""
+        if ratio > 1 + threshold:
+            marker = "  <-- regression"
+            regressions.append(f"{r['name']}: {ratio:.2f}x slower")
+        print(f"{r['name']:<48} {ratio:6.2f}x{marker}", file=sys.stderr)
+
+    return regressions
+
+
+def load_report(path: Path) -> Dict[str, Any]:
+    return json.loads(path.read_text())
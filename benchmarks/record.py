@@ -0,0 +1,97 @@
+"""Record the fixtures of a provider, this needs network access.
+
+Usage:
+    python -m benchmarks.record allanime --query "frieren"
+
+The provider is searched for the query, the first result (or the one
+passed with `--identifier`) is looked up with get_info, get_episodes and
+get_video, every response is written to `benchmarks/fixtures/<provider>.json`.
+"""
+
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+from anipy_api.provider import BaseProvider, LanguageTypeEnum, get_provider
+
+from benchmarks.fixtures import Fixture, recording
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def record(
+    provider_name: str,
+    query: str,
+    identifier: Optional[str],
+    lang: LanguageTypeEnum,
+    output: Path,
+):
+    provider = get_provider(provider_name)
+    if provider is None:
+        raise SystemExit(f"Provider {provider_name} does not exist")
+
+    # Every request has to reach the network to be recorded
+    BaseProvider.response_cache = None
+
+    fixture = Fixture()
+    with recording(fixture):
+        results = provider.get_search(query)
+        if identifier is None:
+            if not results:
+                raise SystemExit(f"No search results for {query}")
+            identifier = results[0].identifier
+
+        provider.get_info(identifier)
+        episodes = provider.get_episodes(identifier, lang)
+        if not episodes:
+            raise SystemExit(f"{identifier} has no {lang.value} episodes")
+        streams = provider.get_video(identifier, episodes[0], lang)
+
+    fixture.scenario = {
+        "provider": provider_name,
+        "query": query,
+        "identifier": identifier,
+        "lang": lang.value,
+        "episode": episodes[0],
+    }
+    fixture.save(output)
+    print(
+        f"Recorded {len(fixture.responses)} responses "
+        f"({len(results)} results, {len(episodes)} episodes, {len(streams)} streams) "
+        f"to {output}"
+    )
+
+
+def main(args: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("provider", help="Name of the provider, e.g. allanime")
+    parser.add_argument("-q", "--query", required=True, help="The search query")
+    parser.add_argument(
+        "-i", "--identifier", help="Anime to look up, defaults to the first result"
+    )
+    parser.add_argument(
+        "-l",
+        "--lang",
+        choices=["sub", "dub"],
+        default="sub",
+        help="Language of the episodes and streams",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help="Fixture file to write, defaults to fixtures/<provider>.json",
+    )
+    options = parser.parse_args(args)
+
+    record(
+        options.provider,
+        options.query,
+        options.identifier,
+        LanguageTypeEnum(options.lang),
+        options.output or FIXTURES / f"{options.provider}.json",
+    )
+
+
+if __name__ == "__main__":
+    main()
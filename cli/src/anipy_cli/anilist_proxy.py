@@ -5,15 +5,16 @@ import anipy_cli.logger as logger
 from anipy_api.anilist import (AniList, AniListAdapter, AniListAnime,
                                AniListMyListStatus, AniListMyListStatusEnum)
 from anipy_api.anime import Anime
+from anipy_api.codec import FastJsonMixin
 from anipy_api.provider import LanguageTypeEnum, list_providers
 from anipy_cli.config import Config
 from anipy_cli.util import error, get_prefered_providers
-from dataclasses_json import DataClassJsonMixin, config
+from dataclasses_json import config
 from InquirerPy import inquirer
 
 
 @dataclass
-class ProviderMapping(DataClassJsonMixin):
+class ProviderMapping(FastJsonMixin):
     provider: str = field(metadata=config(field_name="pv"))
     name: str = field(metadata=config(field_name="na"))
     identifier: str = field(metadata=config(field_name="id"))
@@ -21,13 +22,13 @@ class ProviderMapping(DataClassJsonMixin):
 
 
 @dataclass
-class AniListProviderMapping(DataClassJsonMixin):
+class AniListProviderMapping(FastJsonMixin):
     anilist_anime: AniListAnime
     mappings: Dict[str, ProviderMapping]
 
 
 @dataclass
-class AniListLocalList(DataClassJsonMixin):
+class AniListLocalList(FastJsonMixin):
     mappings: Dict[int, AniListProviderMapping]
 
     def write(self, user_id: int):
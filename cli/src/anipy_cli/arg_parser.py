@@ -19,6 +19,7 @@ class CliArgs:
     quality: Optional[Union[str, int]]
     ffmpeg: bool
     auto_update: bool
+    watch: bool
     mal_sync_seasonals: bool
     anilist_sync_seasonals: bool
     optional_player: Optional[str]
@@ -31,6 +32,7 @@ class CliArgs:
     config: bool
     seasonal_search: Optional[str]
     subtitles: bool
+    no_cache: bool
 
 
 def parse_args(override_args: Optional[list[str]] = None) -> CliArgs:
@@ -171,6 +173,15 @@ def parse_args(override_args: Optional[list[str]] = None) -> CliArgs:
         help="Automatically update and download all Anime in seasonals or mal mode from start EP to newest.",
     )
 
+    options_group.add_argument(
+        "-w",
+        "--watch",
+        required=False,
+        dest="watch",
+        action="store_true",
+        help="With -S, keep running and download new episodes of the seasonals as soon as they are released.",
+    )
+
     options_group.add_argument(
         "-p",
         "--optional-player",
@@ -217,6 +228,14 @@ def parse_args(override_args: Optional[list[str]] = None) -> CliArgs:
         help="Download only subtitles",
     )
 
+    options_group.add_argument(
+        "--no-cache",
+        required=False,
+        dest="no_cache",
+        action="store_true",
+        help="Do not use cached provider responses, everything is fetched again.",
+    )
+
     options_group.add_argument(
         "--mal-password",
         required=False,
@@ -4,6 +4,9 @@ from typing import Optional
 
 import anipy_cli.logger as logger
 from anipy_api.locallist import LocalList
+from anipy_api.provider import BaseProvider
+from anipy_api.provider.cache import RemoteArtifact, ResponseCache
+from anipy_api.tracing import JsonLinesExporter, OtlpJsonExporter, add_exporter
 from anipy_cli.arg_parser import CliArgs, parse_args
 from anipy_cli.clis import *
 from anipy_cli.colors import color, colors, cprint
@@ -39,6 +42,20 @@ def _safe_cli(args: CliArgs):
     # This updates the config, adding new values doc changes and the like.
     config._create_config()
 
+    if not args.no_cache:
+        BaseProvider.response_cache = ResponseCache(
+            config._response_cache_path,
+            ttls=config.provider_cache_ttls,
+            info_callback=lambda message, exc_info=None: logger.warn(message, exc_info),
+        )
+        RemoteArtifact.directory = config._artifact_cache_path
+
+    if config.trace_file is not None:
+        exporter = (
+            OtlpJsonExporter if config.trace_format == "otlp" else JsonLinesExporter
+        )
+        add_exporter(exporter(config.trace_file))
+
     if config.dc_presence:
         with DotSpinner("Initializing Discord Presence...") as s:
             try:
@@ -1,19 +1,20 @@
 import sys
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterator, Optional, Tuple
 
-from anipy_api.provider.base import LanguageTypeEnum
-from anipy_api.error import LangTypeNotAvailableError
 from anipy_api.locallist import LocalList
+from anipy_api.player.players import MpvControllable
 from anipy_cli.clis.base_cli import CliBase
 from anipy_cli.colors import colors, cprint
 from anipy_cli.config import Config
 from anipy_cli.prompts import (lang_prompt, parse_auto_search,
                                parse_seasonal_search,
                                pick_episode_range_prompt, search_show_prompt)
-from anipy_cli.util import (DotSpinner, error, get_configured_player,
-                            migrate_locallist)
+from anipy_cli.util import (error, get_configured_player, migrate_locallist,
+                            prefetch_streams)
 
 if TYPE_CHECKING:
+    from anipy_api.anime import Anime
+    from anipy_api.provider import Episode, LanguageTypeEnum, ProviderStream
     from anipy_cli.arg_parser import CliArgs
 
 
@@ -68,40 +69,47 @@ class BingeCli(CliBase):
         assert self.anime is not None
         assert self.lang is not None
 
-        for e in self.episodes:
-            with DotSpinner(
-                "Extracting streams for ",
-                colors.BLUE,
-                f"{self.anime.name} ({self.lang})",
-                colors.END,
-                " Episode ",
-                e,
-                "...",
-            ) as s:
-                try:
-                    stream = self.anime.get_video(
-                        e, self.lang, preferred_quality=self.options.quality
-                    )
-                except LangTypeNotAvailableError: 
-                    if self.lang == LanguageTypeEnum.SUB:
-                        new_lang = LanguageTypeEnum.DUB
-                    else:
-                        new_lang = LanguageTypeEnum.SUB
-
-                    error(f"Language {self.lang} not available, changing to {new_lang} for this episode!")
-
-                    stream = self.anime.get_video(
-                        e, new_lang, preferred_quality=self.options.quality
-                    )
-
-                if stream is None:
-                    error("Could not find stream for requested episode, skipping")
-                    continue
-                s.ok("✔")
+        streams = prefetch_streams(
+            ((self.anime, e, self.lang) for e in self.episodes),
+            self.options.quality,
+        )
+
+        if isinstance(self.player, MpvControllable):
+            self._show_playlist(self.player, streams)
+            return
+
+        for _, e, _, stream in streams:
+            if stream is None:
+                error("Could not find stream for requested episode, skipping")
+                continue
 
             self.history_list.update(self.anime, episode=e, language=self.lang)
             self.player.play_title(self.anime, stream)
             self.player.wait()
 
+    def _show_playlist(
+        self,
+        player: MpvControllable,
+        streams: Iterator[
+            Tuple["Anime", "Episode", "LanguageTypeEnum", Optional["ProviderStream"]]
+        ],
+    ):
+        # Every episode is queued in mpv while the one before it plays, mpv
+        # then switches to it without a gap and without a new window
+        for _, e, _, stream in streams:
+            if stream is None:
+                error("Could not find stream for requested episode, skipping")
+                continue
+
+            def on_play(anime, stream, e=e):
+                self.history_list.update(anime, episode=e, language=self.lang)
+
+            if not player.queue_title(self.anime, stream, on_play):
+                return
+            if not player.wait_for_queue():
+                return
+
+        player.wait()
+
     def post(self):
         self.player.kill_player()
@@ -2,6 +2,7 @@ from typing import TYPE_CHECKING
 
 from anipy_cli.clis.base_cli import CliBase
 from anipy_cli.menus import SeasonalMenu
+from anipy_cli.seasonal_watcher import SeasonalWatcher
 
 if TYPE_CHECKING:
     from anipy_cli.arg_parser import CliArgs
@@ -26,7 +27,9 @@ class SeasonalCli(CliBase):
     def post(self):
         menu = SeasonalMenu(self.options)
 
-        if self.options.auto_update:
+        if self.options.watch:
+            SeasonalWatcher(menu).run()
+        elif self.options.auto_update:
             menu.download_latest()
         else:
             menu.run()
@@ -7,7 +7,7 @@ from typing import Any, Dict, List, Optional, Tuple, Type
 
 import yaml
 from anipy_cli import __appname__, __version__
-from appdirs import user_config_dir, user_data_dir
+from appdirs import user_cache_dir, user_config_dir, user_data_dir
 
 
 class Config:
@@ -45,6 +45,14 @@ class Config:
     def _anilist_local_user_list_path(self) -> Path:
         return self.user_files_path / "anilist_list.json"
 
+    @property
+    def _response_cache_path(self) -> Path:
+        return Path(user_cache_dir(__appname__, appauthor=False)) / "responses.db"
+
+    @property
+    def _artifact_cache_path(self) -> Path:
+        return Path(user_cache_dir(__appname__, appauthor=False)) / "artifacts"
+
     @property
     def download_folder_path(self) -> Path:
         """Path to your download folder/directory.
@@ -116,6 +124,61 @@ class Config:
 
         return self._get_value("provider_urls", {}, dict)
 
+    @property
+    def provider_cache_ttls(self) -> Dict[str, int]:
+        """Responses of the providers are cached on disk, this sets for how many
+        seconds they are used before they get fetched again. The keys are the
+        provider functions get_search, get_info, get_episodes and get_video,
+        functions that are not set here use the defaults (search 1 hour, info 7 days,
+        episodes 1 hour, video never). A ttl of 0 disables the cache for that function.
+        Use the `--no-cache` flag to bypass the cache for one run.
+
+        Examples:
+            provider_cache_ttls:
+              get_episodes: 600 # refresh episode lists after 10 minutes
+              get_info: 0 # never cache info
+            provider_cache_ttls: {} # use the defaults
+        """
+        return self._get_value("provider_cache_ttls", {}, dict)
+
+    @property
+    def provider_search_timeout(self) -> float:
+        """All providers are searched at the same time, this is the amount of
+        seconds to wait for their results. Providers that did not answer in time
+        are skipped.
+
+        Examples:
+            provider_search_timeout: 10
+        """
+        return self._get_value("provider_search_timeout", 10, (int, float))
+
+    @property
+    def trace_file(self) -> Optional[Path]:
+        """Record what anipy-cli spends its time on (provider requests,
+        downloads, player startup) in this file, to find out why something
+        is slow. The file grows with every run, so only set this while
+        you need it. You may use `~` or environment vars in your path.
+
+        Examples:
+            trace_file: null # do not trace
+            trace_file: ~/anipy-trace.jsonl
+        """
+        path = self._get_value("trace_file", None, str)
+        if path is None:
+            return None
+        return Path(os.path.expandvars(path)).expanduser()
+
+    @property
+    def trace_format(self) -> str:
+        """Format of the `trace_file`, either "jsonl" (one json object per
+        span) or "otlp" (OpenTelemetry OTLP/JSON, which can be imported by
+        the OpenTelemetry Collector).
+
+        Examples:
+            trace_format: jsonl
+        """
+        return self._get_value("trace_format", "jsonl", str)
+
     @property
     def player_path(self) -> Path:
         """
@@ -187,6 +250,86 @@ class Config:
         """
         return self._get_value("ffmpeg_hls", False, bool)
 
+    @property
+    def download_parallel_episodes(self) -> int:
+        """Amount of episodes that are downloaded at the same time when
+        downloading several episodes (e.g. in download, seasonal or tracker
+        mode).
+
+        Examples:
+            download_parallel_episodes: 1 # download one episode after another
+            download_parallel_episodes: 3
+        """
+        return self._get_value("download_parallel_episodes", 2, int)
+
+    @property
+    def download_lookahead(self) -> int:
+        """Amount of episodes whose streams are resolved ahead of the running
+        downloads. Streams that wait too long before their download starts
+        are resolved again, as the links of some providers expire."""
+        return max(self._get_value("download_lookahead", 2, int), 1)
+
+    @property
+    def download_max_connections(self) -> int:
+        """Maximum amount of connections that all running downloads share,
+        the connections are split fairly between the hosts that are
+        downloaded from."""
+        return self._get_value("download_max_connections", 32, int)
+
+    @property
+    def download_rate_limit(self) -> Optional[int]:
+        """Limit the download speed of all running downloads together, in
+        bytes per second. This does not apply to downloads with ffmpeg.
+
+        Examples:
+            download_rate_limit: 5000000 # 5 MB/s
+            download_rate_limit: null # no limit
+        """
+        return self._get_value("download_rate_limit", None, int)
+
+    @property
+    def seasonal_fetch_parallelism(self) -> int:
+        """How many episode lists are fetched at the same time per provider,
+        when checking the seasonals for new episodes.
+
+        Examples:
+            seasonal_fetch_parallelism: 4
+        """
+        return max(self._get_value("seasonal_fetch_parallelism", 4, int), 1)
+
+    @property
+    def seasonal_fetch_timeout(self) -> float:
+        """Seconds to wait for the episode list of a single seasonal, when
+        checking the seasonals for new episodes. Seasonals that take longer
+        are skipped.
+
+        Examples:
+            seasonal_fetch_timeout: 30
+        """
+        return self._get_value("seasonal_fetch_timeout", 30, (int, float))
+
+    @property
+    def seasonal_watch_interval(self) -> float:
+        """The shortest time in seconds between two checks of a seasonal,
+        when watching the seasonals for new episodes (`-S --watch`).
+
+        Examples:
+            seasonal_watch_interval: 900
+        """
+        return max(self._get_value("seasonal_watch_interval", 900, (int, float)), 1)
+
+    @property
+    def seasonal_watch_max_interval(self) -> float:
+        """The longest time in seconds between two checks of a seasonal,
+        when watching the seasonals for new episodes (`-S --watch`). The time
+        between checks of a seasonal that did not get a new episode grows
+        up to this.
+
+        Examples:
+            seasonal_watch_max_interval: 21600
+        """
+        return self._get_value("seasonal_watch_max_interval", 21600, (int, float))
+
     @property
     def remux_to(self) -> Optional[str]:
         """
@@ -1,9 +1,12 @@
+from concurrent.futures import Future
 from pathlib import Path
-from typing import List, Protocol, Tuple
+from threading import RLock
+from typing import Callable, Dict, List, Optional, Protocol, Tuple
 
 import anipy_cli.logger as logger
 from anipy_api.anime import Anime
-from anipy_api.download import Downloader
+from anipy_api.download import (Downloader, DownloadJob, DownloadScheduler,
+                                InfoCallback, ProgressCallback)
 from anipy_api.provider.base import Episode, LanguageTypeEnum
 from anipy_cli.arg_parser import CliArgs
 from anipy_cli.colors import color, colors
@@ -27,6 +30,86 @@ class SuccessfulEpDownload(Protocol):
         ...
 
 
+class _EpisodeQueue:
+    """The queued episodes of an anime. Finished episodes are handled in
+    episode order, as soon as every episode before them is done."""
+
+    def __init__(
+        self,
+        spinner: DotSpinner,
+        scheduler: DownloadScheduler,
+        anime: Anime,
+        lang: LanguageTypeEnum,
+        lock: RLock,
+        fails: List[Tuple[Anime, Episode]],
+        after_success_ep: SuccessfulEpDownload,
+        only_skip_ep_on_err: bool,
+    ):
+        self.spinner = spinner
+        self.scheduler = scheduler
+        self.anime = anime
+        self.lang = lang
+        self.lock = lock
+        self.fails = fails
+        self.after_success_ep = after_success_ep
+        self.only_skip_ep_on_err = only_skip_ep_on_err
+
+        self.futures: List[Tuple[Episode, Future]] = []
+        self.next = 0
+        self.stopped = False
+
+    def add(self, ep: Episode, future: Future):
+        with self.lock:
+            self.futures.append((ep, future))
+        future.add_done_callback(lambda _: self.advance())
+
+    def advance(self):
+        with self.lock:
+            while not self.stopped and self.next < len(self.futures):
+                ep, future = self.futures[self.next]
+                if not future.done():
+                    return
+
+                self.next += 1
+                exc = future.exception()
+                if exc is not None:
+                    self.fail(ep, exc)
+                    continue
+
+                try:
+                    self.after_success_ep(self.anime, ep, self.lang)
+                except Exception as e:
+                    logger.error(
+                        f"Could not save the progress of episode {ep} of"
+                        f" {self.anime.name}",
+                        e,
+                    )
+                    self.spinner.write(
+                        color(colors.RED, f"! Could not save the progress: {e}")
+                    )
+
+    def fail(self, ep: Episode, exc: BaseException):
+        # Log it first so we don't run into another error below
+        logger.error(
+            f"Error downloading episode {ep} of {self.anime.name}. Skipped.", exc
+        )
+        if self.only_skip_ep_on_err:
+            error_msg = (
+                f"! Issues downloading episode {ep} of {self.anime.name}. Skipping..."
+            )
+        else:
+            error_msg = f"! Issues occurred while downloading the series ${self.anime.name}. Skipping..."
+        self.spinner.write(color(colors.RED, f"! Error: {exc}\n", error_msg))
+        self.fails.append((self.anime, ep))
+
+        if self.only_skip_ep_on_err:
+            return
+
+        self.stopped = True
+        for _, f in self.futures[self.next :]:
+            self.scheduler.cancel(f)
+
+
 class DownloadComponent:
     """
     A component used to download anime for
@@ -51,10 +134,22 @@ class DownloadComponent:
             after_success_ep: The code to run when an anime successful downloads
             only_skip_ep_on_err: If we should skip the specific episode on an error. If false, we skip the entire anime.
         """
+        config = Config()
         with DotSpinner("Starting download...") as s:
+            progress: Dict[str, float] = {}
 
-            def progress_indicator(percentage: float):
-                s.set_text(f"Progress: {percentage:.1f}%")
+            def progress_indicator(label: str) -> ProgressCallback:
+                def callback(percentage: float):
+                    progress[label] = percentage
+                    s.set_text(
+                        "Progress: "
+                        + " | ".join(f"{k} {v:.1f}%" for k, v in list(progress.items()))
+                    )
+
+                return callback
+
+            def progress_done(label: str) -> Callable[[Future], None]:
+                return lambda future: progress.pop(label, None)
 
             def info_display(message: str, exc_info: BaseException | None = None):
                 logger.info(message, exc_info, exc_info is not None)
@@ -64,73 +159,72 @@ class DownloadComponent:
                 logger.error(message, exc_info)
                 s.write(f"{colors.RED}! {message}{colors.END}")
 
-            downloader = Downloader(progress_indicator, info_display, error_display)
-
             failed: List[Tuple[Anime, Episode]] = []
+            lock = RLock()
 
-            for anime, lang, eps in picked:
-                failed = self.download_episodes(
-                    s,
-                    downloader,
-                    anime,
-                    lang,
-                    eps,
-                    after_success_ep,
-                    only_skip_ep_on_err,
-                    sub_only,
-                )
+            with DownloadScheduler(
+                max_parallel=config.download_parallel_episodes,
+                max_connections=config.download_max_connections,
+                max_bytes_per_second=config.download_rate_limit,
+                max_pending=config.download_lookahead,
+            ) as scheduler:
+                for anime, lang, eps in picked:
+                    queue = _EpisodeQueue(
+                        s,
+                        scheduler,
+                        anime,
+                        lang,
+                        lock,
+                        failed,
+                        after_success_ep,
+                        only_skip_ep_on_err,
+                    )
+                    for ep in eps:
+                        if queue.stopped:
+                            break
 
-            return failed
+                        label = f"{anime.name} E{ep}"
+                        try:
+                            future = self.download_ep(
+                                s,
+                                scheduler,
+                                anime,
+                                lang,
+                                ep,
+                                sub_only,
+                                progress_indicator(label),
+                                info_display,
+                                error_display,
+                            )
+                            future.add_done_callback(progress_done(label))
+                        except Exception as e:
+                            future = Future()
+                            future.set_exception(e)
 
-    def download_episodes(
-        self,
-        spinner: DotSpinner,
-        downloader: Downloader,
-        anime: Anime,
-        lang: LanguageTypeEnum,
-        eps: List[Episode],
-        after_success_ep: SuccessfulEpDownload = lambda anime, ep, lang: None,
-        only_skip_ep_on_err: bool = False,
-        sub_only: bool = False,
-    ) -> List[Tuple[Anime, Episode]]:
-        fails = []
-        for ep in eps:
-            try:
-                self.download_ep(spinner, downloader, anime, lang, ep, sub_only)
-            except Exception as anime_download_error:
-                # Log it first so we don't run into another error below
-                logger.error(
-                    f"Error downloading episode {ep} of {anime.name}. Skipped.",
-                    anime_download_error,
-                )
-                if only_skip_ep_on_err:
-                    error_msg = f"! Issues downloading episode {ep} of {anime.name}. Skipping..."
-                else:
-                    error_msg = f"! Issues occurred while downloading the series ${anime.name}. Skipping..."
-                spinner.write(
-                    color(
-                        colors.RED,
-                        f"! Error: {anime_download_error}\n",
-                        error_msg,
-                    )
-                )
-                fails.append((anime, ep))
-                if only_skip_ep_on_err:
-                    continue
-                return fails
+                        # after_success_ep runs as soon as the episode and the
+                        # ones before it are done, not after the whole batch
+                        queue.add(ep, future)
 
-            after_success_ep(anime, ep, lang)
-        return fails
+            return failed
 
     def download_ep(
         self,
         spinner: DotSpinner,
-        downloader: Downloader,
+        scheduler: DownloadScheduler,
         anime: Anime,
         lang: LanguageTypeEnum,
         ep: Episode,
         sub_only: bool = False,
-    ):
+        progress_indicator: Optional[ProgressCallback] = None,
+        info_display: Optional[InfoCallback] = None,
+        error_display: Optional[InfoCallback] = None,
+    ) -> "Future[Optional[Path]]":
+        """Extract the stream of an episode and queue it for download, this
+        blocks while the scheduler already has enough streams waiting.
+
+        Returns:
+            A future that resolves when the episode is downloaded
+        """
         config = Config()
 
         spinner.set_text(
@@ -150,28 +244,42 @@ class DownloadComponent:
             DownloadComponent.serve_download_errors(
                 [(anime, ep)], only_skip_ep_on_err=True
             )
-            return
+            future: "Future[Optional[Path]]" = Future()
+            future.set_result(None)
+            return future
 
         download_message_update = (
-            f"Downloading Episode {stream.episode} of {anime.name} ({lang})"
+            f"Queued Episode {stream.episode} of {anime.name} ({lang})"
         )
         logger.info(download_message_update)
         spinner.write(f"> {download_message_update}")
 
-        spinner.set_text("Downloading...")
+        download_path = get_download_path(anime, stream, parent_directory=self.dl_path)
+
+        if sub_only:
+            future = Future()
+            Downloader(
+                info_callback=info_display, soft_error_callback=error_display
+            ).download_sub(stream, download_path)
+            future.set_result(None)
+            return future
 
-        if not sub_only:
-            downloader.download(
+        future = scheduler.submit(
+            DownloadJob(
                 stream,
-                get_download_path(anime, stream, parent_directory=self.dl_path),
+                download_path,
                 container=config.remux_to,
                 ffmpeg=self.options.ffmpeg or config.ffmpeg_hls,
                 post_dl_cb=get_post_download_scripts_hook(self.mode, anime, spinner),
+                progress_callback=progress_indicator,
+                info_callback=info_display,
+                soft_error_callback=error_display,
+                refresh_stream=lambda: anime.get_video(
+                    ep, lang, preferred_quality=self.options.quality
+                ),
             )
-        else:
-            downloader.download_sub(
-                stream, get_download_path(anime, stream, parent_directory=self.dl_path)
-            )
+        )
+        return future
 
     @staticmethod
     def serve_download_errors(
@@ -3,17 +3,18 @@ from typing import Dict, List, Optional, Set
 
 import anipy_cli.logger as logger
 from anipy_api.anime import Anime
+from anipy_api.codec import FastJsonMixin
 from anipy_api.mal import (MALAnime, MALMyListStatus, MALMyListStatusEnum,
                            MyAnimeList, MyAnimeListAdapter)
 from anipy_api.provider import LanguageTypeEnum, list_providers
 from anipy_cli.config import Config
 from anipy_cli.util import error, get_prefered_providers
-from dataclasses_json import DataClassJsonMixin, config
+from dataclasses_json import config
 from InquirerPy import inquirer
 
 
 @dataclass
-class ProviderMapping(DataClassJsonMixin):
+class ProviderMapping(FastJsonMixin):
     provider: str = field(metadata=config(field_name="pv"))
     name: str = field(metadata=config(field_name="na"))
     identifier: str = field(metadata=config(field_name="id"))
@@ -21,13 +22,13 @@ class ProviderMapping(DataClassJsonMixin):
 
 
 @dataclass
-class MALProviderMapping(DataClassJsonMixin):
+class MALProviderMapping(FastJsonMixin):
     mal_anime: MALAnime
     mappings: Dict[str, ProviderMapping]
 
 
 @dataclass
-class MALLocalList(DataClassJsonMixin):
+class MALLocalList(FastJsonMixin):
     mappings: Dict[int, MALProviderMapping]
 
     def write(self, user_id: int):
@@ -4,7 +4,6 @@ from typing import Dict, List, Tuple
 
 from anipy_api.anilist import AniList, AniListAnime, AniListMyListStatusEnum
 from anipy_api.anime import Anime
-from anipy_api.error import LangTypeNotAvailableError
 from anipy_api.locallist import LocalList, LocalListEntry
 from anipy_api.provider import LanguageTypeEnum
 from anipy_api.provider.base import Episode
@@ -16,7 +15,8 @@ from anipy_cli.download_component import DownloadComponent
 from anipy_cli.menus.base_menu import MenuBase, MenuOption
 from anipy_cli.prompts import search_show_prompt
 from anipy_cli.util import (DotSpinner, error, find_closest,
-                            get_configured_player, migrate_locallist)
+                            get_configured_player, migrate_locallist,
+                            prefetch_streams)
 from InquirerPy import inquirer
 from InquirerPy.base.control import Choice
 from InquirerPy.utils import get_style
@@ -282,44 +282,27 @@ class AniListMenu(MenuBase):
         else:
             print(f"Playing a total of {total_eps} episode(s)")
 
-        for anime, anilist_anime, lang, eps in picked:
-            for ep in eps:
-                with DotSpinner(
-                    "Extracting streams for ",
-                    colors.BLUE,
-                    f"{anime.name} ({lang})",
-                    colors.END,
-                    " Episode ",
-                    ep,
-                    "...",
-                ) as s:
-                    try:
-                        stream = anime.get_video(
-                            ep, lang, preferred_quality=self.options.quality
-                        )
-                    except LangTypeNotAvailableError:
-                        if lang == LanguageTypeEnum.SUB:
-                            new_lang = LanguageTypeEnum.DUB
-                        else:
-                            new_lang = LanguageTypeEnum.SUB
-
-                        error(f"Language {lang} not available, changing to {new_lang} for this episode!")
-
-                        stream = anime.get_video(
-                            ep, new_lang, preferred_quality=self.options.quality
-                        )
-
-                    s.ok("✔")
-
+        jobs = [
+            (anime, anilist_anime, lang, ep)
+            for anime, anilist_anime, lang, eps in picked
+            for ep in eps
+        ]
+        streams = prefetch_streams(
+            ((anime, ep, lang) for anime, _, lang, ep in jobs), self.options.quality
+        )
+        for (anime, anilist_anime, _, ep), (_, _, _, stream) in zip(jobs, streams):
+            if stream is None:
+                error("Could not find stream for requested episode, skipping")
+                continue
 
-                self.player.play_title(anime, stream)
-                self.player.wait()
+            self.player.play_title(anime, stream)
+            self.player.wait()
 
-                self.anilist_proxy.update_show(
-                    anilist_anime,
-                    status=AniListMyListStatusEnum.WATCHING,
-                    episode=int(ep),
-                )
+            self.anilist_proxy.update_show(
+                anilist_anime,
+                status=AniListMyListStatusEnum.WATCHING,
+                episode=int(ep),
+            )
 
     def manual_maps(self):
         mylist = self.anilist_proxy.get_list()
@@ -353,6 +336,7 @@ class AniListMenu(MenuBase):
         config = Config()
         mylist = self.anilist_proxy.get_list()
         mappings = self._create_maps_anilist(mylist)
+        updates = []
         with DotSpinner("Syncing AniList into Seasonals") as s:
             for k, v in mappings.items():
                 if config.tracker_dub_tag:
@@ -385,7 +369,9 @@ class AniListMenu(MenuBase):
                 else:
                     episode = find_closest(provider_episodes, episode)
 
-                self.seasonals_list.update(v, episode=episode, language=lang)
+                updates.append((v, {"episode": episode, "language": lang}))
+
+            self.seasonals_list.update_many(updates)
             s.ok("✔")
 
     def _choose_latest(
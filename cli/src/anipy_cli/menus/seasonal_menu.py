@@ -12,8 +12,8 @@ from anipy_cli.download_component import DownloadComponent
 from anipy_cli.menus.base_menu import MenuBase, MenuOption
 from anipy_cli.prompts import (lang_prompt, migrate_provider,
                                pick_episode_prompt, search_show_prompt)
-from anipy_cli.util import (DotSpinner, error, get_configured_player,
-                            migrate_locallist)
+from anipy_cli.util import (DotSpinner, error, fetch_episode_lists,
+                            get_configured_player, migrate_locallist)
 from InquirerPy import inquirer
 from InquirerPy.base.control import Choice
 from InquirerPy.utils import get_style
@@ -50,39 +50,45 @@ class SeasonalMenu(MenuBase):
         pass
 
     def _choose_latest(self) -> List[Tuple["Anime", LanguageTypeEnum, List["Episode"]]]:
-        with DotSpinner("Fetching status of shows in seasonals..."):
-            choices = []
-            for s in self.seasonal_list.get_all():
+        entries: List[Tuple[LocalListEntry, Anime]] = []
+        for s in self.seasonal_list.get_all():
+            try:
+                entries.append((s, Anime.from_local_list_entry(s)))
+            except ProviderNotAvailableError:
+                error(
+                    f"Can not load '{s.name}' because the configured provider"
+                    f" '{s.provider}' was not found, maybe try to migrate"
+                    " providers with 'm'."
+                )
+
+        with DotSpinner("Fetching status of shows in seasonals...") as spinner:
+            fetched = fetch_episode_lists(entries, spinner)
+
+        choices = []
+        for i, (s, anime) in enumerate(entries):
+            if i not in fetched:
+                continue
+
+            lang = s.language
+            episodes = fetched[i]
+
+            if s.episode == -1:
+                to_watch = episodes
+            else:
                 try:
-                    anime = Anime.from_local_list_entry(s)
-                except ProviderNotAvailableError:
+                    to_watch = episodes[episodes.index(s.episode) + 1 :]
+                except ValueError:
                     error(
-                        f"Can not load '{s.name}' because the configured provider"
-                        f" '{s.provider}' was not found, maybe try to migrate"
-                        " providers with 'm'."
+                        f'\nThe entry for anime "{anime}" is corrupt, please re-add (a) or delete (e) the anime!'
                     )
                     continue
 
-                lang = s.language
-                episodes = anime.get_episodes(lang)
-
-                if s.episode == -1:
-                    to_watch = episodes
-                else:
-                    try:
-                        to_watch = episodes[episodes.index(s.episode) + 1 :]
-                    except ValueError:
-                        error(
-                            f'\nThe entry for anime "{anime}" is corrupt, please re-add (a) or delete (e) the anime!'
-                        )
-                        continue
-
-                if len(to_watch) > 0:
-                    ch = Choice(
-                        value=(anime, lang, to_watch),
-                        name=f"{anime.name} (to watch: {len(to_watch)})",
-                    )
-                    choices.append(ch)
+            if len(to_watch) > 0:
+                ch = Choice(
+                    value=(anime, lang, to_watch),
+                    name=f"{anime.name} (to watch: {len(to_watch)})",
+                )
+                choices.append(ch)
 
         if self.options.auto_update:
             return [ch.value for ch in choices]
@@ -145,8 +151,9 @@ class SeasonalMenu(MenuBase):
             or []
         )
 
-        for e in entries:
-            self.seasonal_list.delete(e)
+        with self.seasonal_list.batch():
+            for e in entries:
+                self.seasonal_list.delete(e)
 
         self.print_options()
 
@@ -185,15 +192,16 @@ class SeasonalMenu(MenuBase):
         if not action:
             return
 
-        for e in entries:
-            if action == "Dub":
-                new_lang = LanguageTypeEnum.DUB
-            else:
-                new_lang = LanguageTypeEnum.SUB
-            if new_lang in e.languages or LanguageTypeEnum.UND in e.languages:
-                self.seasonal_list.update(e, language=new_lang)
-            else:
-                print(f"> {new_lang} is for {e.name} not available")
+        with self.seasonal_list.batch():
+            for e in entries:
+                if action == "Dub":
+                    new_lang = LanguageTypeEnum.DUB
+                else:
+                    new_lang = LanguageTypeEnum.SUB
+                if new_lang in e.languages or LanguageTypeEnum.UND in e.languages:
+                    self.seasonal_list.update(e, language=new_lang)
+                else:
+                    print(f"> {new_lang} is for {e.name} not available")
 
     def list_animes(self):
         all_seasonals = self.seasonal_list.get_all()
@@ -1,10 +1,11 @@
 import time
-from typing import TYPE_CHECKING, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
+import anipy_cli.logger as logger
 from anipy_api.anime import Anime
 from anipy_api.mal import MyAnimeListAdapter
 from anipy_api.provider import (BaseProvider, FilterCapabilities, Filters,
-                                LanguageTypeEnum, Season)
+                                LanguageTypeEnum, Season, search_providers)
 from anipy_cli.colors import colors
 from anipy_cli.config import Config
 from anipy_cli.util import (DotSpinner, convert_letter_to_season, error,
@@ -35,15 +36,7 @@ def search_show_prompt(
     if not (query and query.strip()):
         return None
 
-    with DotSpinner("Searching for ", colors.BLUE, query, "..."):
-        results: List[Anime] = []
-        for provider in get_prefered_providers(mode):
-            results.extend(
-                [
-                    Anime.from_search_result(provider, x)
-                    for x in provider.get_search(query)
-                ]
-            )
+    results = search_all_providers(mode, query)
 
     if len(results) == 0:
         error("no search results")
@@ -68,6 +61,32 @@ def search_show_prompt(
     return anime
 
 
+def search_all_providers(mode: str, query: str) -> List["Anime"]:
+    providers = list(get_prefered_providers(mode))
+    answered: Dict[str, List[Anime]] = {}
+
+    with DotSpinner("Searching for ", colors.BLUE, query, "...") as s:
+        for provider, results in search_providers(
+            providers,
+            query,
+            timeout=Config().provider_search_timeout,
+            error_callback=logger.warn,
+        ):
+            answered[provider.NAME] = [
+                Anime.from_search_result(provider, r) for r in results
+            ]
+            s.set_text(
+                "Searching for ",
+                colors.BLUE,
+                query,
+                colors.END,
+                f"... ({len(answered)}/{len(providers)} providers answered)",
+            )
+
+    # Keep the order of the preferred providers, no matter who answered first
+    return [a for p in providers for a in answered.get(p.NAME, [])]
+
+
 def _get_season_provider(mode: str) -> Optional["BaseProvider"]:
     season_provider = None
     for p in get_prefered_providers(mode):
@@ -297,15 +316,7 @@ def parse_auto_search(
     if not (ltype == "sub" or ltype == "dub"):
         ltype = Config().preferred_type
 
-    with DotSpinner("Searching for ", colors.BLUE, query, "..."):
-        results: List[Anime] = []
-        for provider in get_prefered_providers(mode):
-            results.extend(
-                [
-                    Anime.from_search_result(provider, x)
-                    for x in provider.get_search(query)
-                ]
-            )
+    results = search_all_providers(mode, query)
     if len(results) == 0:
         error(f"no anime found for query {query}", fatal=True)
 
@@ -341,10 +352,13 @@ def migrate_provider(mode: str, local_list: "LocalList"):
         print(f"Mapping: {s.name}")
 
         search_results: List[Anime] = []
-        for p in current_providers:
-            search_results.extend(
-                [Anime.from_search_result(p, r) for r in p.get_search(s.name)]
-            )
+        for p, results in search_providers(
+            current_providers,
+            s.name,
+            timeout=config.provider_search_timeout,
+            error_callback=logger.warn,
+        ):
+            search_results.extend([Anime.from_search_result(p, r) for r in results])
 
         best_anime = None
         best_ratio = 0
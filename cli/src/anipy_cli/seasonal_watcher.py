@@ -0,0 +1,209 @@
+import statistics
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import anipy_cli.logger as logger
+from anipy_api.anime import Anime
+from anipy_api.error import ProviderNotAvailableError
+from anipy_api.locallist import LocalListEntry
+from anipy_api.provider import Episode, LanguageTypeEnum
+from anipy_cli.colors import colors, cprint
+from anipy_cli.config import Config
+from anipy_cli.download_component import DownloadComponent
+from anipy_cli.util import DotSpinner, error, fetch_episode_lists
+
+if TYPE_CHECKING:
+    from anipy_cli.menus import SeasonalMenu
+
+
+@dataclass
+class WatchedShow:
+    """The polling state of a seasonal in the watcher.
+
+    Attributes:
+        entry: The seasonal entry
+        anime: The anime of the entry, it is kept so its provider
+            (and session) stays warm between polls
+        next_check: Unix time of the next poll
+        interval: Seconds between the last poll and the next one
+        episode_count: Length of the episode list at the last poll
+        releases: Unix times at which the episode list grew
+        failed: If the last download of this show failed
+    """
+
+    entry: LocalListEntry
+    anime: Anime
+    next_check: float = 0
+    interval: float = 0
+    episode_count: Optional[int] = None
+    releases: List[float] = field(default_factory=list)
+    failed: bool = False
+
+    @property
+    def cadence(self) -> Optional[float]:
+        """The observed seconds between two releases, if it is known."""
+        if len(self.releases) < 2:
+            return None
+
+        recent = self.releases[-5:]
+        return statistics.median(b - a for a, b in zip(recent, recent[1:]))
+
+
+class SeasonalWatcher:
+    """Watches the seasonals for new episodes and downloads them, until
+    it is interrupted.
+
+    Every show is polled on its own schedule: after a poll without new
+    episodes the interval doubles up to `seasonal_watch_max_interval`, once
+    the release cadence of a show is known (e.g. weekly) it is polled every
+    `seasonal_watch_interval` seconds around the time the next episode is
+    expected. Downloads are only started when the episode list grew.
+    """
+
+    # Start polling a bit before the next episode is expected
+    CADENCE_LEAD = 0.9
+    # Look at the seasonal list at least this often for added/removed shows
+    LIST_CHECK_INTERVAL = 60
+
+    def __init__(self, menu: "SeasonalMenu"):
+        self.menu = menu
+        self.seasonal_list = menu.seasonal_list
+
+        config = Config()
+        self.min_interval = config.seasonal_watch_interval
+        self.max_interval = max(config.seasonal_watch_max_interval, self.min_interval)
+
+        self.shows: Dict[str, WatchedShow] = {}
+
+    def run(self):
+        cprint(
+            colors.GREEN,
+            "Watching seasonals for new episodes, ",
+            colors.END,
+            "press ctrl+c to stop.",
+        )
+        while True:
+            self._sync_shows()
+
+            now = time.time()
+            due = [s for s in self.shows.values() if s.next_check <= now]
+            if due:
+                self._poll(due)
+
+            next_check = min(
+                [s.next_check for s in self.shows.values()],
+                default=now + self.LIST_CHECK_INTERVAL,
+            )
+            time.sleep(
+                min(max(next_check - time.time(), 1), self.LIST_CHECK_INTERVAL)
+            )
+
+    def _sync_shows(self):
+        """Add new seasonals and drop removed ones, the entries of the
+        others are updated (e.g. the episode after a download)."""
+        uids = {
+            f"{e.provider}:{e.identifier}": e for e in self.seasonal_list.get_all()
+        }
+
+        for uid in list(self.shows):
+            if uid not in uids:
+                del self.shows[uid]
+
+        for uid, entry in uids.items():
+            show = self.shows.get(uid)
+            if show is not None:
+                show.entry = entry
+                continue
+
+            try:
+                anime = Anime.from_local_list_entry(entry)
+            except ProviderNotAvailableError:
+                error(
+                    f"Can not watch '{entry.name}' because the configured provider"
+                    f" '{entry.provider}' was not found"
+                )
+                continue
+
+            self.shows[uid] = WatchedShow(entry, anime, interval=self.min_interval)
+
+    def _poll(self, due: List[WatchedShow]):
+        with DotSpinner(f"Checking {len(due)} seasonal(s) for new episodes...") as s:
+            fetched = fetch_episode_lists(
+                [(show.entry, show.anime) for show in due], s
+            )
+
+        now = time.time()
+        picked = []
+        for i, show in enumerate(due):
+            episodes = fetched.get(i)
+            if episodes is None:
+                # Fetching failed, try again later
+                self._schedule(show, now, grew=False)
+                continue
+
+            first_poll = show.episode_count is None
+            grew = not first_poll and len(episodes) > show.episode_count  # type: ignore
+            show.episode_count = len(episodes)
+            if grew:
+                show.releases.append(now)
+
+            to_watch = self._to_watch(show.entry, episodes)
+            if to_watch and (first_poll or grew or show.failed):
+                picked.append((show.anime, show.entry.language, to_watch))
+
+            self._schedule(show, now, grew)
+
+        if picked:
+            self._download(picked)
+
+    @staticmethod
+    def _to_watch(entry: LocalListEntry, episodes: List[Episode]) -> List[Episode]:
+        if entry.episode == -1:
+            return episodes
+        try:
+            return episodes[episodes.index(entry.episode) + 1 :]
+        except ValueError:
+            return []
+
+    def _schedule(self, show: WatchedShow, now: float, grew: bool):
+        if grew or show.failed:
+            show.interval = self.min_interval
+        else:
+            show.interval = min(show.interval * 2, self.max_interval)
+
+        next_check = now + show.interval
+        cadence = show.cadence
+        if cadence is not None:
+            expected = show.releases[-1] + cadence * self.CADENCE_LEAD
+            if now >= expected:
+                # The next episode is due, keep polling frequently
+                next_check = now + self.min_interval
+            else:
+                next_check = min(next_check, expected)
+
+        show.next_check = max(next_check, now + self.min_interval)
+        logger.info(
+            f"Next check of {show.entry.name} at "
+            f"{datetime.fromtimestamp(show.next_check).isoformat(timespec='minutes')}"
+        )
+
+    def _download(
+        self, picked: List[Tuple[Anime, LanguageTypeEnum, List[Episode]]]
+    ):
+        def on_successful_download(
+            anime: Anime, ep: Episode, lang: LanguageTypeEnum
+        ):
+            self.seasonal_list.update(anime, episode=ep, language=lang)
+
+        failed_series = DownloadComponent(
+            self.menu.options, self.menu.dl_path, "seasonal"
+        ).download_anime(picked, on_successful_download)
+
+        failed = {hash(anime) for anime, _ in failed_series}
+        for show in self.shows.values():
+            if any(show.anime is anime for anime, _, _ in picked):
+                show.failed = hash(show.anime) in failed
+                if show.failed:
+                    show.next_check = time.time() + self.min_interval
@@ -2,16 +2,23 @@ import logging
 import os
 import subprocess as sp
 import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import (TYPE_CHECKING, Any, Iterator, List, Literal, NoReturn,
-                    Optional, Union, overload)
+from queue import Empty, Queue
+from threading import Thread
+from typing import (TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Literal,
+                    NoReturn, Optional, Tuple, Union, overload)
 
 import anipy_cli.logger as logger
 from anipy_api.anime import Anime
 from anipy_api.download import Downloader, PostDownloadCallback
+from anipy_api.error import LangTypeNotAvailableError
 from anipy_api.locallist import LocalListData
-from anipy_api.player import get_player
-from anipy_api.provider import list_providers
+from anipy_api.player import PlayerBase, get_player
+from anipy_api.provider import LanguageTypeEnum, list_providers
+from anipy_api.provider.cache import bypass_cache
 from anipy_cli.colors import color, colors
 from anipy_cli.config import Config
 from anipy_cli.discord import DiscordPresence
@@ -20,7 +27,7 @@ from yaspin.core import Yaspin
 from yaspin.spinners import Spinners
 
 if TYPE_CHECKING:
-    from anipy_api.player import PlayerBase
+    from anipy_api.locallist import LocalListEntry
     from anipy_api.provider import BaseProvider, Episode, ProviderStream
 
 
@@ -212,6 +219,171 @@ def get_configured_player(player_override: Optional[str] = None) -> "PlayerBase"
     return get_player(player, args, discord_cb)
 
 
+def _resolve_stream(
+    anime: Anime,
+    episode: "Episode",
+    lang: LanguageTypeEnum,
+    quality: Optional[Union[str, int]],
+) -> Tuple[Optional["ProviderStream"], LanguageTypeEnum]:
+    try:
+        stream = anime.get_video(episode, lang, preferred_quality=quality)
+    except LangTypeNotAvailableError:
+        if lang == LanguageTypeEnum.SUB:
+            lang = LanguageTypeEnum.DUB
+        else:
+            lang = LanguageTypeEnum.SUB
+
+        stream = anime.get_video(episode, lang, preferred_quality=quality)
+
+    if stream is not None:
+        PlayerBase.prefetch_subtitles(stream)
+
+    return stream, lang
+
+
+def prefetch_streams(
+    episodes: Iterable[Tuple[Anime, "Episode", LanguageTypeEnum]],
+    quality: Optional[Union[str, int]] = None,
+) -> Iterator[Tuple[Anime, "Episode", LanguageTypeEnum, Optional["ProviderStream"]]]:
+    """Get the streams of episodes that are watched one after another.
+
+    While the caller plays an episode, the stream of the next one and its
+    subtitles are fetched in the background, so the next episode can start
+    right away. If a language is not available the other one is used.
+
+    Args:
+        episodes: The anime, episode and language of the episodes, in order
+        quality: The preferred quality
+
+    Yields:
+        The anime, episode, language that was used and the stream (None
+        if no stream was found) of every episode
+    """
+    episodes = list(episodes)
+    if not episodes:
+        return
+
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="anipy-prefetch")
+    try:
+        future = pool.submit(_resolve_stream, *episodes[0], quality)
+        for i, (anime, ep, lang) in enumerate(episodes):
+            with DotSpinner(
+                "Extracting streams for ",
+                colors.BLUE,
+                f"{anime.name} ({lang})",
+                colors.END,
+                " Episode ",
+                ep,
+                "...",
+            ) as s:
+                stream, used_lang = future.result()
+                s.ok("✔")
+
+            if i + 1 < len(episodes):
+                future = pool.submit(_resolve_stream, *episodes[i + 1], quality)
+
+            if used_lang != lang:
+                error(
+                    f"Language {lang} not available, changing to {used_lang} for this episode!"
+                )
+
+            yield anime, ep, used_lang, stream
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_episode_lists(
+    entries: List[Tuple["LocalListEntry", Anime]], spinner: DotSpinner
+) -> Dict[int, List["Episode"]]:
+    """Fetch the episode lists of local list entries (e.g. the seasonals)
+    concurrently, with at most `seasonal_fetch_parallelism` requests per
+    provider.
+
+    The lists are always fetched from the network, the provider response
+    cache is bypassed. Entries that fail or take longer than
+    `seasonal_fetch_timeout` are reported and skipped.
+
+    Args:
+        entries: The entries and their anime
+        spinner: The spinner that shows the progress
+
+    Returns:
+        The episode lists by index in `entries`
+    """
+    config = Config()
+    parallelism = config.seasonal_fetch_parallelism
+    timeout = config.seasonal_fetch_timeout
+
+    results: Queue = Queue()
+    queues: Dict[str, Queue] = defaultdict(Queue)
+    started: Dict[int, float] = {}
+
+    def work(queue: Queue):
+        while True:
+            try:
+                i = queue.get_nowait()
+            except Empty:
+                return
+
+            entry, anime = entries[i]
+            started[i] = time.monotonic()
+            try:
+                # The response cache could still hold an old list
+                anime.refresh()
+                with bypass_cache():
+                    eps = anime.get_episodes(entry.language)
+                results.put((i, eps, None))
+            except Exception as e:
+                results.put((i, None, e))
+
+    def start_worker(queue: Queue):
+        # Daemon threads, a request that hangs must not keep the cli alive
+        Thread(target=work, args=(queue,), daemon=True).start()
+
+    for i, (entry, _) in enumerate(entries):
+        queues[entry.provider].put(i)
+
+    for queue in queues.values():
+        for _ in range(min(parallelism, queue.qsize())):
+            start_worker(queue)
+
+    episodes: Dict[int, List["Episode"]] = {}
+    pending = set(range(len(entries)))
+    while pending:
+        try:
+            i, eps, exc = results.get(timeout=0.5)
+        except Empty:
+            now = time.monotonic()
+            for i in [i for i in pending if now - started.get(i, now) > timeout]:
+                entry, _ = entries[i]
+                pending.discard(i)
+                error(
+                    f"fetching the episodes of '{entry.name}' took longer"
+                    f" than {timeout} seconds, skipping it"
+                )
+                # The worker is stuck, replace it so the rest still runs
+                start_worker(queues[entry.provider])
+            continue
+
+        if i not in pending:
+            continue
+
+        pending.discard(i)
+        entry, _ = entries[i]
+        if exc is not None:
+            logger.error(f"Could not fetch episodes of {entry.name}", exc)
+            error(f"could not fetch the episodes of '{entry.name}': {exc}")
+        else:
+            episodes[i] = eps
+
+        spinner.set_text(
+            "Fetching status of shows in seasonals... ",
+            f"({len(entries) - len(pending)}/{len(entries)}) {entry.name}",
+        )
+
+    return episodes
+
+
 def get_anime_season(month: int):
     if 1 <= month <= 3:
         return "Winter"
@@ -0,0 +1,73 @@
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from typing import Callable, Dict, Iterator, Set
+
+import pytest
+from anipy_api.locallist import LocalListEntry
+from anipy_api.provider import LanguageTypeEnum
+
+
+class FileServer(ThreadingHTTPServer):
+    """A local http server that serves `files` by path, paths in `broken`
+    answer with 404 and paths in `delays` are answered that many seconds
+    later."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _FileHandler)
+        self.files: Dict[str, bytes] = {}
+        self.broken: Set[str] = set()
+        self.delays: Dict[str, float] = {}
+        self.requests: Dict[str, int] = {}
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+
+class _FileHandler(BaseHTTPRequestHandler):
+    server: FileServer
+
+    def do_GET(self):
+        self.server.requests[self.path] = self.server.requests.get(self.path, 0) + 1
+        time.sleep(self.server.delays.get(self.path, 0))
+        if self.path in self.server.broken or self.path not in self.server.files:
+            self.send_error(404)
+            return
+
+        content = self.server.files[self.path]
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *_):
+        pass
+
+
+@pytest.fixture
+def file_server() -> Iterator[FileServer]:
+    server = FileServer()
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _make_entry(identifier: str, episode: float = 1, timestamp: int = 0):
+    return LocalListEntry(
+        provider="allanime",
+        identifier=identifier,
+        name=f"Anime {identifier}",
+        episode=episode,
+        timestamp=timestamp,
+        language=LanguageTypeEnum.SUB,
+        languages={LanguageTypeEnum.SUB, LanguageTypeEnum.DUB},
+    )
+
+
+@pytest.fixture
+def make_entry() -> Callable[..., LocalListEntry]:
+    return _make_entry
@@ -0,0 +1,70 @@
+import pytest
+from anipy_api.provider.providers.animekai_provider import (_simple_eval,
+                                                            compile_expression,
+                                                            strict_decode,
+                                                            strict_encode)
+from simpleeval import MAX_POWER, InvalidExpression
+
+EXPRESSIONS = [
+    "n",
+    "(n + 17) ^ 0x5a",
+    "(n * 3 - 1) % 256",
+    "~n & 255",
+    "-n // 3 + (n << 2) - (n >> 1)",
+    "n ** 2 % 7",
+    "(n | 12) / 4",
+]
+
+STRING_EXPRESSIONS = [
+    "reverse_it(n)",
+    "base64_url_encode(reverse_it(n))",
+    "base64_url_decode(base64_url_encode(n))",
+    "substitute(n, 'abc', 'xyz')",
+    "transform('key', n)",
+    "strict_encode(n, 'n + 1;n ^ 7')",
+]
+
+
+@pytest.mark.parametrize("exp", EXPRESSIONS)
+@pytest.mark.parametrize("n", [0, 1, 7, 200, 255])
+def test_numeric_expressions_match_simpleeval(exp, n):
+    assert compile_expression(exp)(n) == _simple_eval(exp, n)
+
+
+@pytest.mark.parametrize("exp", STRING_EXPRESSIONS)
+def test_decoder_functions_match_simpleeval(exp):
+    n = "Hello, anipy!"
+    assert compile_expression(exp)(n) == _simple_eval(exp, n)
+
+
+@pytest.mark.parametrize(
+    "exp",
+    ["n.upper()", "[n, n]", "open('x')", "__import__('os')", "n if n else 1", "m + 1"],
+)
+def test_disallowed_expressions_fall_back_to_simpleeval(exp):
+    func = compile_expression(exp)
+
+    assert func.func is _simple_eval
+    assert func.args == (exp,)
+
+
+@pytest.mark.parametrize("exp", ["9 ** n", "n * 'x'", "'x' * n", "1 << n"])
+def test_operators_are_guarded(exp):
+    n = MAX_POWER * 10
+    with pytest.raises(InvalidExpression):
+        _simple_eval(exp, n)
+    with pytest.raises(InvalidExpression):
+        compile_expression(exp)(n)
+
+
+def test_expressions_are_compiled_once():
+    assert compile_expression("n + 1") is compile_expression("n + 1")
+
+
+@pytest.mark.parametrize("ops", ["n + 7;n ^ 42;n - 3", "n"])
+def test_strict_round_trip(ops):
+    inverse = {"n + 7": "n - 7", "n ^ 42": "n ^ 42", "n - 3": "n + 3", "n": "n"}
+    inverse_ops = ";".join(inverse[op] for op in ops.split(";"))
+    text = "".join(map(chr, range(256)))
+
+    assert strict_decode(strict_encode(text, ops), inverse_ops) == text
@@ -0,0 +1,184 @@
+import sqlite3
+import threading
+from types import SimpleNamespace
+
+import pytest
+from anipy_api.provider import cache
+from anipy_api.provider.cache import ResponseCache, bypass_cache
+from requests import Request, Response
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+class Sender:
+    """Sends a request by returning a new response every call."""
+
+    def __init__(self, status: int = 200, stream: bool = False):
+        self.status = status
+        self.stream = stream
+        self.calls = 0
+
+    def __call__(self) -> Response:
+        self.calls += 1
+        response = Response()
+        response.status_code = self.status
+        response.url = "https://example.org/search"
+        response.headers["Content-Type"] = "text/html"
+        response.encoding = "utf-8"
+        if not self.stream:
+            response._content = f"response {self.calls}".encode()
+            response._content_consumed = True
+        return response
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(cache, "time", SimpleNamespace(time=clock.time))
+    return clock
+
+
+@pytest.fixture
+def response_cache(tmp_path, clock) -> ResponseCache:
+    return ResponseCache(tmp_path / "cache.db", ttls={"get_search": 60}, stale_ttl=600)
+
+
+def prepare(url: str = "https://example.org/search?q=a"):
+    return Request("GET", url).prepare()
+
+
+def wait_for_refresh():
+    for thread in threading.enumerate():
+        if thread.name == "anipy-cache":
+            thread.join(5)
+
+
+def test_fresh_response_is_served_from_cache(response_cache, clock):
+    send = Sender()
+
+    first = response_cache.request(prepare(), send, "get_search")
+    clock.now += 59
+    second = response_cache.request(prepare(), send, "get_search")
+
+    assert send.calls == 1
+    assert second.text == first.text == "response 1"
+    assert second.headers["content-type"] == "text/html"
+
+
+def test_requests_are_cached_per_url_and_body(response_cache):
+    send = Sender()
+
+    response_cache.request(prepare(), send, "get_search")
+    response_cache.request(
+        prepare("https://example.org/search?q=b"), send, "get_search"
+    )
+    post = Request("POST", "https://example.org/search", data={"q": "a"}).prepare()
+    response_cache.request(post, send, "get_search")
+
+    assert send.calls == 3
+
+
+def test_methods_without_ttl_are_not_cached(response_cache):
+    send = Sender()
+
+    response_cache.request(prepare(), send, "get_video")
+    response_cache.request(prepare(), send, "get_video")
+    response_cache.request(prepare(), send, None)
+
+    assert send.calls == 3
+
+
+def test_stale_response_is_served_and_refreshed(response_cache, clock):
+    send = Sender()
+    response_cache.request(prepare(), send, "get_search")
+
+    clock.now += 120
+    stale = response_cache.request(prepare(), send, "get_search")
+    wait_for_refresh()
+
+    assert stale.text == "response 1"
+    assert send.calls == 2
+    assert response_cache.request(prepare(), send, "get_search").text == "response 2"
+    assert send.calls == 2
+
+
+def test_expired_response_is_not_served(response_cache, clock):
+    send = Sender()
+    response_cache.request(prepare(), send, "get_search")
+
+    clock.now += 60 + 601
+    response = response_cache.request(prepare(), send, "get_search")
+
+    assert response.text == "response 2"
+    assert send.calls == 2
+
+
+def test_never_stale_methods_go_to_the_network(tmp_path, clock):
+    response_cache = ResponseCache(tmp_path / "cache.db", stale_ttl=600)
+    send = Sender()
+    ttl = ResponseCache.DEFAULT_TTLS["get_episodes"]
+    response_cache.request(prepare(), send, "get_episodes")
+
+    clock.now += ttl + 1
+    response = response_cache.request(prepare(), send, "get_episodes")
+
+    assert response.text == "response 2"
+
+
+def test_bypass_cache_refreshes_the_cache(response_cache):
+    send = Sender()
+    response_cache.request(prepare(), send, "get_search")
+
+    with bypass_cache():
+        assert response_cache.request(prepare(), send, "get_search").text == (
+            "response 2"
+        )
+
+    assert response_cache.request(prepare(), send, "get_search").text == "response 2"
+    assert send.calls == 2
+
+
+@pytest.mark.parametrize("send", [Sender(status=500), Sender(stream=True)])
+def test_errors_and_streams_are_not_cached(response_cache, send):
+    response_cache.request(prepare(), send, "get_search")
+    response_cache.request(prepare(), send, "get_search")
+
+    assert send.calls == 2
+
+
+def test_the_cache_is_shared_through_the_database(tmp_path, clock):
+    send = Sender()
+    ResponseCache(tmp_path / "cache.db").request(prepare(), send, "get_search")
+    ResponseCache(tmp_path / "cache.db").request(prepare(), send, "get_search")
+
+    assert send.calls == 1
+
+
+def test_locked_database_falls_back_to_the_network(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(ResponseCache, "BUSY_TIMEOUT", 0.01)
+    messages = []
+    response_cache = ResponseCache(
+        tmp_path / "cache.db",
+        info_callback=lambda message, exc_info=None: messages.append(message),
+    )
+    send = Sender()
+    response_cache.request(prepare(), send, "get_search")
+
+    # Another process holds the write lock
+    other = sqlite3.connect(tmp_path / "cache.db", isolation_level=None)
+    other.execute("BEGIN EXCLUSIVE")
+    try:
+        with bypass_cache():
+            response = response_cache.request(prepare(), send, "get_search")
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+
+    assert response.text == "response 2"
+    assert messages == ["Could not write the response cache"]
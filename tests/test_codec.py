@@ -0,0 +1,137 @@
+import json
+
+import pytest
+from anipy_api.anilist import AniListPagingResource
+from anipy_api.codec import loads
+from anipy_api.locallist import LocalListData, LocalListEntry
+from anipy_api.mal import MALMyListStatusEnum, MALPagingResource
+from anipy_api.provider import LanguageTypeEnum
+from dataclasses_json import DataClassJsonMixin
+
+MAL_PAGE = {
+    "data": [
+        {
+            "node": {
+                "id": 1,
+                "title": "Cowboy Bebop",
+                "media_type": "tv",
+                "num_episodes": 26,
+                "alternative_titles": {
+                    "en": "Cowboy Bebop",
+                    "ja": "カウボーイビバップ",
+                    "synonyms": [],
+                },
+                "start_season": {"season": "spring", "year": 1998},
+                "my_list_status": {
+                    "num_episodes_watched": 3,
+                    "tags": ["space"],
+                    "status": "watching",
+                    "score": 9,
+                },
+            }
+        },
+        {
+            "node": {
+                "id": 2,
+                "title": "Trigun",
+                "media_type": "tv",
+                "num_episodes": 26,
+            }
+        },
+    ],
+    "paging": {"next": "https://api.myanimelist.net/v2/users/@me/animelist?offset=2"},
+}
+
+ANILIST_PAGE = {
+    "page_info": {"current_page": 1, "has_next_page": False},
+    "media": [
+        {
+            "id": 1,
+            "title": {"user_preferred": "Cowboy Bebop"},
+            "media_type": "TV",
+            "num_episodes": 26,
+            "alternative_titles": {"english": "Cowboy Bebop", "native": None},
+            "year": 1998,
+            "season": "SPRING",
+            "my_list_status": {
+                "entry_id": 7,
+                "notes": None,
+                "num_episodes_watched": 3,
+                "status": "CURRENT",
+                "score": 90,
+            },
+        }
+    ],
+}
+
+
+def reference_from_dict(cls, kvs):
+    """Decode with dataclasses_json itself."""
+    return DataClassJsonMixin.from_dict.__func__(cls, kvs)
+
+
+def test_locallist_data_round_trip(make_entry):
+    data = LocalListData(
+        {"allanime:a": make_entry("a", 3, 100), "allanime:b": make_entry("b", 1.5)}
+    )
+
+    encoded = data.to_json()
+    assert json.loads(encoded) == DataClassJsonMixin.to_dict(data, encode_json=True)
+    assert LocalListData.from_json(encoded) == data
+    assert reference_from_dict(LocalListData, loads(encoded)) == data
+
+
+def test_locallist_entry_uses_field_names(make_entry):
+    entry = make_entry("a", 3, 100)
+    encoded = entry.to_dict(encode_json=True)
+
+    assert encoded["pv"] == "allanime"
+    assert encoded["ep"] == 3
+    assert encoded["lg"] == "sub"
+    assert sorted(encoded["ls"]) == ["dub", "sub"]
+    assert LocalListEntry.from_dict(encoded) == entry
+
+
+def test_field_name_wins_over_encoded_name(make_entry):
+    encoded = make_entry("a", 3).to_dict(encode_json=True)
+    encoded["episode"] = 4
+    encoded["language"] = LanguageTypeEnum.DUB
+
+    entry = LocalListEntry.from_dict(encoded)
+
+    assert entry.episode == 4
+    assert entry.language == LanguageTypeEnum.DUB
+
+
+def test_missing_field_raises(make_entry):
+    encoded = make_entry("a").to_dict(encode_json=True)
+    del encoded["ts"]
+
+    with pytest.raises(KeyError):
+        LocalListEntry.from_dict(encoded)
+
+
+@pytest.mark.parametrize(
+    "cls, page", [(MALPagingResource, MAL_PAGE), (AniListPagingResource, ANILIST_PAGE)]
+)
+def test_matches_dataclasses_json(cls, page):
+    decoded = cls.from_dict(page)
+
+    assert decoded == reference_from_dict(cls, page)
+    assert decoded.to_dict(encode_json=True) == DataClassJsonMixin.to_dict(
+        decoded, encode_json=True
+    )
+    assert cls.from_json(decoded.to_json()) == decoded
+
+
+def test_nested_enums_and_defaults():
+    page = MALPagingResource.from_json(json.dumps(MAL_PAGE))
+
+    status = page.data[0].node.my_list_status
+    assert status is not None and status.status == MALMyListStatusEnum.WATCHING
+    assert page.data[1].node.my_list_status is None
+    assert page.paging.previous is None
+
+
+def test_loads_accepts_bytes():
+    assert loads(b'{"a": [1, 2.5, "x", null]}') == {"a": [1, 2.5, "x", None]}
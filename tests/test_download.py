@@ -0,0 +1,246 @@
+import json
+import zlib
+from types import SimpleNamespace
+
+import pytest
+from anipy_api import download
+from anipy_api.download import (ConcurrencyController, Downloader,
+                                RangeManifest, SegmentManifest)
+from anipy_api.error import DownloadError
+from anipy_api.provider import LanguageTypeEnum, ProviderStream
+
+SEGMENTS = [bytes([i]) * (1000 + i) for i in range(20)]
+
+
+def write_manifest(file, segments, count=None, stream_id="stream"):
+    with SegmentManifest(file, count or len(segments), stream_id) as manifest:
+        for content in segments:
+            manifest.add(content)
+
+
+def test_segment_manifest_resumes_intact_prefix(tmp_path):
+    output = tmp_path / "out.ts"
+    output.write_bytes(b"".join(SEGMENTS[:5]) + b"half a segment")
+    write_manifest(tmp_path / "out.manifest", SEGMENTS[:5], count=20)
+
+    manifest = SegmentManifest(tmp_path / "out.manifest", 20, "stream")
+
+    assert manifest.resume(output) == 5
+    assert output.read_bytes() == b"".join(SEGMENTS[:5])
+
+
+def test_segment_manifest_truncates_at_corrupted_segment(tmp_path):
+    output = tmp_path / "out.ts"
+    content = bytearray(b"".join(SEGMENTS[:5]))
+    content[sum(len(s) for s in SEGMENTS[:3]) + 10] ^= 0xFF
+    output.write_bytes(content)
+    write_manifest(tmp_path / "out.manifest", SEGMENTS[:5], count=20)
+
+    manifest = SegmentManifest(tmp_path / "out.manifest", 20, "stream")
+
+    assert manifest.resume(output) == 3
+    assert output.read_bytes() == b"".join(SEGMENTS[:3])
+
+
+@pytest.mark.parametrize("count, stream_id", [(21, "stream"), (20, "other")])
+def test_segment_manifest_of_other_stream_is_discarded(tmp_path, count, stream_id):
+    output = tmp_path / "out.ts"
+    output.write_bytes(b"".join(SEGMENTS[:5]))
+    write_manifest(tmp_path / "out.manifest", SEGMENTS[:5], count=20)
+
+    manifest = SegmentManifest(tmp_path / "out.manifest", count, stream_id)
+
+    assert manifest.resume(output) == 0
+    assert output.read_bytes() == b""
+
+
+def test_segment_manifest_ignores_broken_lines(tmp_path):
+    file = tmp_path / "out.manifest"
+    write_manifest(file, SEGMENTS[:3], count=20)
+    with file.open("a") as fp:
+        fp.write('{"i": 3, "si')
+    output = tmp_path / "out.ts"
+    output.write_bytes(b"".join(SEGMENTS[:4]))
+
+    assert SegmentManifest(file, 20, "stream").resume(output) == 3
+
+
+def test_segment_manifest_is_rewritten_on_resume(tmp_path):
+    file = tmp_path / "out.manifest"
+    write_manifest(file, SEGMENTS[:5], count=20)
+    output = tmp_path / "out.ts"
+    output.write_bytes(b"".join(SEGMENTS[:2]))
+
+    manifest = SegmentManifest(file, 20, "stream")
+    manifest.resume(output)
+    with manifest:
+        manifest.add(SEGMENTS[2])
+
+    lines = [json.loads(line) for line in file.read_text().splitlines()]
+    assert lines[0] == {"segments": 20, "stream": "stream"}
+    assert lines[1:] == [
+        {"i": i, "size": len(s), "crc": zlib.crc32(s)}
+        for i, s in enumerate(SEGMENTS[:3])
+    ]
+
+
+def test_stream_id_ignores_query_strings():
+    urls = [f"https://cdn.example.org/a/seg{i}.ts?token=1" for i in range(3)]
+    same = [f"https://cdn.example.org/a/seg{i}.ts?token=2" for i in range(3)]
+    other = [f"https://cdn.example.org/b/seg{i}.ts?token=1" for i in range(3)]
+
+    assert SegmentManifest.stream_id(urls) == SegmentManifest.stream_id(same)
+    assert SegmentManifest.stream_id(urls) != SegmentManifest.stream_id(other)
+
+
+@pytest.fixture
+def hls_stream(file_server) -> ProviderStream:
+    playlist = ["#EXTM3U", "#EXT-X-TARGETDURATION:1"]
+    for i, content in enumerate(SEGMENTS):
+        playlist += ["#EXTINF:1.0,", f"seg{i}.ts"]
+        file_server.files[f"/hls/seg{i}.ts"] = content
+    playlist.append("#EXT-X-ENDLIST")
+    file_server.files["/hls/index.m3u8"] = "\n".join(playlist).encode()
+
+    return ProviderStream(
+        url=file_server.url("/hls/index.m3u8"),
+        resolution=1080,
+        episode=1,
+        language=LanguageTypeEnum.SUB,
+    )
+
+
+def test_m3u8_segments_are_merged_in_order(tmp_path, file_server, hls_stream):
+    # The first segments arrive last
+    for i in range(4):
+        file_server.delays[f"/hls/seg{i}.ts"] = 0.1 * (4 - i)
+
+    path = Downloader().m3u8_download(hls_stream, tmp_path / "episode")
+
+    assert path == tmp_path / "episode.ts"
+    assert path.read_bytes() == b"".join(SEGMENTS)
+    assert not (tmp_path / "temp").exists()
+
+
+def test_m3u8_download_resumes_after_failure(tmp_path, file_server, hls_stream):
+    file_server.broken.add("/hls/seg12.ts")
+    with pytest.raises(DownloadError):
+        Downloader().m3u8_download(hls_stream, tmp_path / "episode")
+
+    partial = tmp_path / "temp" / "episode" / "episode.ts"
+    assert partial.read_bytes() == b"".join(SEGMENTS[:12])
+
+    file_server.broken.clear()
+    file_server.requests.clear()
+    path = Downloader().m3u8_download(hls_stream, tmp_path / "episode")
+
+    assert path.read_bytes() == b"".join(SEGMENTS)
+    assert set(file_server.requests) == {"/hls/index.m3u8"} | {
+        f"/hls/seg{i}.ts" for i in range(12, 20)
+    }
+
+
+def test_range_manifest_split(tmp_path):
+    manifest = RangeManifest(tmp_path / "out.ranges", 100)
+
+    manifest.split(10, 4, 30)
+
+    assert manifest.ranges == [[10, 10, 39], [40, 40, 69], [70, 70, 99]]
+    assert manifest.downloaded == 10
+
+
+def test_range_manifest_split_nothing_remaining(tmp_path):
+    manifest = RangeManifest(tmp_path / "out.ranges", 100)
+
+    manifest.split(100, 4, 20)
+
+    assert manifest.ranges == []
+    assert manifest.downloaded == 100
+
+
+def test_range_manifest_resume(tmp_path):
+    manifest = RangeManifest(tmp_path / "out.ranges", 100)
+    manifest.split(0, 2, 10)
+    manifest.advance(0, 20)
+    manifest.advance(1, 5)
+    manifest.write()
+
+    resumed = RangeManifest(tmp_path / "out.ranges", 100)
+
+    assert resumed.ranges == [[0, 20, 49], [50, 55, 99]]
+    assert resumed.downloaded == 25
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"total": 200, "ranges": [[0, 0, 99]]},
+        {"total": 100, "ranges": [[0, 60, 49]]},
+        {"total": 100, "ranges": [[0, 0, 100]]},
+        {"total": 100, "ranges": [[0, 0]]},
+        {"total": 100},
+    ],
+)
+def test_range_manifest_discards_invalid_manifest(tmp_path, data):
+    (tmp_path / "out.ranges").write_text(json.dumps(data))
+
+    assert RangeManifest(tmp_path / "out.ranges", 100).ranges == []
+
+
+def test_concurrency_grows_additively():
+    controller = ConcurrencyController(4, 32)
+    start = controller.limit
+
+    # The limit grows by 1 / limit per request
+    for _ in range(start + 1):
+        controller.record_success(0.1, 100_000)
+
+    assert controller.limit == start + 1
+    assert controller.failure_rate == 0
+
+
+def test_concurrency_is_halved_once_per_round_trip():
+    controller = ConcurrencyController(4, 32)
+    controller.record_success(0.1, 100_000)
+    start = controller.limit
+
+    controller.record_failure()
+    controller.record_failure()
+
+    assert controller.limit == start // 2
+    assert controller.failure_rate == pytest.approx(2 / 3)
+
+
+def test_concurrency_shrinks_when_saturated():
+    controller = ConcurrencyController(4, 32)
+    controller.record_success(0.1, 1_000_000)
+
+    # The moving average takes a few requests to fall below the ratio
+    for _ in range(4):
+        controller.record_success(1.0, 100_000)
+    start = controller.limit
+    for _ in range(start * 2):
+        controller.record_success(1.0, 100_000)
+
+    assert controller.limit < start
+
+
+def test_concurrency_stays_in_bounds(monkeypatch):
+    controller = ConcurrencyController(4, 16)
+    assert controller.limit == 12
+
+    for _ in range(1000):
+        controller.record_success(0.1, 100_000)
+    assert controller.limit == 16
+
+    # Every failure in a new round trip
+    now = [0.0]
+
+    def monotonic():
+        now[0] += 10
+        return now[0]
+
+    monkeypatch.setattr(download, "time", SimpleNamespace(monotonic=monotonic))
+    for _ in range(10):
+        controller.record_failure()
+    assert controller.limit == 4
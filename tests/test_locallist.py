@@ -0,0 +1,155 @@
+import json
+import multiprocessing
+
+import pytest
+from anipy_api.locallist import LocalList, LocalListData, LocalListEntry
+from anipy_api.provider import LanguageTypeEnum
+
+
+def add(local_list, entry, episode=1):
+    return local_list.update(entry, episode=episode, language=LanguageTypeEnum.SUB)
+
+
+def episodes(local_list):
+    return {e.identifier: e.episode for e in local_list.get_all()}
+
+
+def test_journal_is_replayed_by_other_instances(tmp_path, make_entry):
+    file = tmp_path / "history.json"
+    first = LocalList(file)
+    second = LocalList(file)
+
+    add(first, make_entry("a"), 1)
+    add(first, make_entry("b"), 2)
+    assert episodes(second) == {"a": 1, "b": 2}
+
+    second.update(make_entry("a"), episode=3)
+    second.delete(make_entry("b"))
+    assert episodes(first) == {"a": 3}
+
+    # Until the journal is merged the file alone is stale
+    assert first.journal.is_file()
+    assert LocalListData.from_json(file.read_text()).data == {}
+
+
+def test_compaction_merges_the_journal(tmp_path, make_entry, monkeypatch):
+    monkeypatch.setattr(LocalList, "COMPACT_AFTER", 3)
+    file = tmp_path / "history.json"
+    local_list = LocalList(file)
+
+    add(local_list, make_entry("a"), 1)
+    add(local_list, make_entry("b"), 1)
+    local_list.update(make_entry("a"), episode=2)
+    assert local_list.journal.is_file()
+
+    # More records than COMPACT_AFTER and than entries
+    local_list.update(make_entry("a"), episode=3)
+    assert not local_list.journal.is_file()
+
+    data = LocalListData.from_json(file.read_text())
+    assert {e.identifier: e.episode for e in data.data.values()} == {"a": 3, "b": 1}
+    assert episodes(LocalList(file)) == {"a": 3, "b": 1}
+
+
+def test_explicit_compaction(tmp_path, make_entry):
+    file = tmp_path / "history.json"
+    first = LocalList(file)
+    add(first, make_entry("a"), 1)
+
+    second = LocalList(file)
+    second.compact()
+
+    assert not first.journal.is_file()
+    assert len(json.loads(file.read_text())["data"]) == 1
+    # The other instance notices the replaced file
+    add(first, make_entry("b"), 2)
+    assert episodes(second) == {"a": 1, "b": 2}
+
+
+def test_partial_journal_record_is_ignored(tmp_path, make_entry):
+    file = tmp_path / "history.json"
+    local_list = LocalList(file)
+    add(local_list, make_entry("a"))
+
+    with local_list.journal.open("ab") as f:
+        f.write(b'{"op": "set", "uid": "allanime:b", "ent')
+
+    assert episodes(LocalList(file)) == {"a": 1}
+
+
+def test_batch_is_written_on_exit(tmp_path, make_entry):
+    file = tmp_path / "history.json"
+    local_list = LocalList(file)
+    other = LocalList(file)
+
+    with local_list.batch():
+        add(local_list, make_entry("a"))
+        add(local_list, make_entry("b"))
+        assert episodes(local_list) == {"a": 1, "b": 1}
+        assert episodes(other) == {}
+
+    assert episodes(other) == {"a": 1, "b": 1}
+
+
+def test_batch_is_discarded_on_error(tmp_path, make_entry):
+    file = tmp_path / "history.json"
+    local_list = LocalList(file)
+    add(local_list, make_entry("a"))
+
+    with pytest.raises(RuntimeError):
+        with local_list.batch():
+            add(local_list, make_entry("b"))
+            local_list.delete(make_entry("a"))
+            raise RuntimeError
+
+    assert episodes(local_list) == {"a": 1}
+    assert episodes(LocalList(file)) == {"a": 1}
+
+
+def test_batch_skips_changes_that_do_not_apply(tmp_path, make_entry):
+    file = tmp_path / "history.json"
+    local_list = LocalList(file)
+    other = LocalList(file)
+    add(local_list, make_entry("a"))
+
+    with local_list.batch():
+        local_list.update(make_entry("a"), episode=2)
+        add(local_list, make_entry("b"), 5)
+        other.delete(make_entry("a"))
+
+    assert episodes(local_list) == {"b": 5}
+    assert episodes(other) == {"b": 5}
+
+
+def _add_many(file, prefix, count):
+    local_list = LocalList(file)
+    for i in range(count):
+        entry = LocalListEntry(
+            provider="allanime",
+            identifier=f"{prefix}{i}",
+            name=f"Anime {prefix}{i}",
+            episode=1,
+            timestamp=0,
+            language=LanguageTypeEnum.SUB,
+            languages={LanguageTypeEnum.SUB},
+        )
+        add(local_list, entry)
+
+
+def test_processes_share_a_list(tmp_path, monkeypatch):
+    # Compact often, so the processes also replace the file under each other
+    monkeypatch.setattr(LocalList, "COMPACT_AFTER", 10)
+    file = tmp_path / "history.json"
+    LocalList(file)
+
+    processes = [
+        multiprocessing.Process(target=_add_many, args=(file, prefix, 50))
+        for prefix in "abcd"
+    ]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join(60)
+        assert p.exitcode == 0
+
+    assert len(LocalList(file).get_all()) == 200